@@ -1,17 +1,334 @@
 import sqlite3
 import bcrypt
 import json
+import base64
+import queue
+import threading
+import time
+import calendar
+from contextlib import contextmanager
 from datetime import datetime
 import uuid
+from write_behind import WriteBehindBuffer
+
+# Columns of network_stats that are downsampled into network_stats_rollups
+STATS_METRICS = ('download_speed', 'upload_speed', 'total_devices', 'active_devices', 'network_usage', 'ping_latency')
+
+# Rollup bucket sizes in seconds: 1 minute, 1 hour, 1 day
+ROLLUP_RESOLUTIONS = (60, 3600, 86400)
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def _rollup_columns():
+    return ',\n'.join(
+        f'{m}_min REAL, {m}_max REAL, {m}_sum REAL DEFAULT 0, {m}_count INTEGER DEFAULT 0'
+        for m in STATS_METRICS
+    )
+
+
+def _rollup_upsert_sql():
+    columns = ', '.join(f'{m}_min, {m}_max, {m}_sum, {m}_count' for m in STATS_METRICS)
+    values = ', '.join(f':{m}, :{m}, coalesce(:{m}, 0), :{m} IS NOT NULL' for m in STATS_METRICS)
+    updates = ',\n'.join(
+        f'{m}_min = coalesce(min({m}_min, excluded.{m}_min), {m}_min, excluded.{m}_min), '
+        f'{m}_max = coalesce(max({m}_max, excluded.{m}_max), {m}_max, excluded.{m}_max), '
+        f'{m}_sum = {m}_sum + excluded.{m}_sum, '
+        f'{m}_count = {m}_count + excluded.{m}_count'
+        for m in STATS_METRICS
+    )
+    return f'''
+        INSERT INTO network_stats_rollups (resolution, bucket_start, samples, {columns})
+        VALUES (:resolution, :bucket_start, 1, {values})
+        ON CONFLICT(resolution, bucket_start) DO UPDATE SET
+        samples = samples + 1,
+        {updates}
+    '''
+
+
+def _rollup_backfill_sql():
+    columns = ', '.join(f'{m}_min, {m}_max, {m}_sum, {m}_count' for m in STATS_METRICS)
+    aggregates = ', '.join(f'min({m}), max({m}), total({m}), count({m})' for m in STATS_METRICS)
+    return f'''
+        INSERT OR IGNORE INTO network_stats_rollups (resolution, bucket_start, samples, {columns})
+        SELECT :resolution, CAST(strftime('%s', timestamp) AS INTEGER) / :resolution * :resolution, count(*), {aggregates}
+        FROM network_stats
+        GROUP BY 2
+    '''
+
+
+# Tables whose changes are counted for conditional GETs and "changes since" queries
+VERSIONED_TABLES = ('network_stats', 'alerts', 'devices')
+
+
+def _version_triggers_sql(table):
+    """Triggers that bump the table's version and stamp it on the written row
+    
+    The update trigger skips updates that only set row_version, which is
+    what the insert trigger itself does.
+    """
+    bump = f'''
+        UPDATE table_versions SET version = version + 1, modified_at = CURRENT_TIMESTAMP
+        WHERE table_name = '{table}';
+        UPDATE {table} SET row_version = (SELECT version FROM table_versions WHERE table_name = '{table}')
+        WHERE rowid = NEW.rowid;
+    '''
+    return (
+        f'''
+        CREATE TRIGGER IF NOT EXISTS {table}_version_insert AFTER INSERT ON {table}
+        BEGIN {bump} END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS {table}_version_update AFTER UPDATE ON {table}
+        WHEN NEW.row_version IS OLD.row_version
+        BEGIN {bump} END
+        '''
+    )
+
+
+def _to_epoch(value):
+    """Accept epoch seconds, a datetime or a stored timestamp string"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, datetime):
+        return calendar.timegm(value.utctimetuple())
+    return calendar.timegm(time.strptime(value, TIMESTAMP_FORMAT))
+
+
+def _format_epoch(epoch):
+    """Epoch seconds in the stored timestamp format (UTC, like CURRENT_TIMESTAMP)"""
+    return time.strftime(TIMESTAMP_FORMAT, time.gmtime(epoch))
+
+
+def _format_device(row):
+    return {
+        'ip': row[0],
+        'mac': row[1],
+        'vendor': row[2],
+        'hostname': row[3],
+        'connection_type': row[4],
+        'is_blocked': bool(row[5]),
+        'first_seen': row[6],
+        'last_seen': row[7],
+        'total_bandwidth': row[8],
+        'is_online': bool(row[9]),
+        'interface': row[10],
+        'subnet': row[11]
+    }
+
+
+def _format_alert(row):
+    return {
+        'id': row[0],
+        'type': row[1],
+        'message': row[2],
+        'severity': row[3],
+        'timestamp': row[4],
+        'is_read': bool(row[5]),
+        'device_ip': row[6],
+        'additional_data': json.loads(row[7]) if row[7] else None
+    }
+
+
+def _format_network_stats(row):
+    return {
+        'timestamp': row[0],
+        'download_speed': row[1],
+        'upload_speed': row[2],
+        'total_devices': row[3],
+        'active_devices': row[4],
+        'network_usage': row[5],
+        'ping_latency': row[6]
+    }
+
+
+# Columns each change feed selects, in the order its formatter expects
+_CHANGE_FEED_FORMATS = {
+    'devices': (
+        'ip_address, mac_address, vendor, hostname, connection_type, is_blocked, '
+        'first_seen, last_seen, total_bandwidth, is_online, interface, subnet',
+        _format_device
+    ),
+    'alerts': (
+        'id, alert_type, message, severity, timestamp, is_read, device_ip, additional_data',
+        _format_alert
+    ),
+    'network_stats': (
+        'timestamp, ' + ', '.join(STATS_METRICS),
+        _format_network_stats
+    ),
+}
+
 
 class DatabaseManager:
-    def __init__(self, db_path='network_monitor.db'):
+    # Applied to every pooled connection. WAL lets API readers run while the
+    # monitor thread writes; NORMAL sync is durable across app crashes in WAL.
+    CONNECTION_PRAGMAS = (
+        'PRAGMA synchronous = NORMAL',
+        'PRAGMA mmap_size = 268435456',
+        'PRAGMA cache_size = -16000',
+        'PRAGMA temp_store = MEMORY',
+        'PRAGMA foreign_keys = ON',
+    )
+    
+    # Unchanged devices still get last_seen refreshed at this interval (seconds)
+    LAST_SEEN_REFRESH = 60
+    
+    # Default retention in days for raw stats and each rollup resolution (None keeps forever)
+    RAW_STATS_RETENTION_DAYS = 30
+    ROLLUP_RETENTION_DAYS = {60: 90, 3600: 730, 86400: None}
+    
+    # Seconds between raw network_stats samples, used when picking a resolution
+    RAW_STATS_INTERVAL = 5
+    
+    # Per-device bandwidth is accumulated into buckets of this many seconds
+    BANDWIDTH_BUCKET = 300
+    BANDWIDTH_RETENTION_DAYS = 90
+    
+    def __init__(self, db_path='network_monitor.db', busy_timeout=5.0, cached_statements=256,
+                 pool_size=8, checkout_timeout=10.0):
         self.db_path = db_path
+        self.busy_timeout = busy_timeout
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._connections = {}
+        self._connections_lock = threading.Lock()
+        # Connections checked out per request by API callers, at most pool_size
+        self.pool_size = pool_size
+        self.checkout_timeout = checkout_timeout
+        self._pool = queue.LifoQueue()
+        self._pool_opened = 0
         self.init_database()
         self.create_default_admin()
+        
+        # Stats, alert and bandwidth rows are group-committed off the caller's thread
+        self.write_buffer = WriteBehindBuffer(self._write_batch)
+        self.write_buffer.start()
     
     def get_connection(self):
-        return sqlite3.connect(self.db_path)
+        """The connection checked out by this thread, else its own long-lived one
+        
+        Request handlers run inside ``checkout`` (see ``init_app``) and share
+        the bounded pool. Long-lived threads such as the monitor loop and the
+        write-behind flusher keep a per-thread connection, opened on first use.
+        """
+        conn = getattr(self._local, 'checked_out', None)
+        if conn is not None:
+            return conn
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._open_connection()
+            self._local.conn = conn
+            with self._connections_lock:
+                self._close_dead_thread_connections()
+                self._connections[threading.get_ident()] = (threading.current_thread(), conn)
+        return conn
+    
+    def _open_connection(self):
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout,
+            cached_statements=self.cached_statements,
+            check_same_thread=False
+        )
+        conn.execute('PRAGMA journal_mode = WAL')
+        for pragma in self.CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
+    @contextmanager
+    def checkout(self):
+        """Borrow a connection from the bounded pool for the duration of the block
+        
+        ``get_connection`` returns it while the block runs, so the existing
+        methods use it unchanged. Nested checkouts on one thread reuse the
+        outer connection. Waits up to ``checkout_timeout`` seconds for a free
+        connection, then raises sqlite3.OperationalError.
+        """
+        if getattr(self._local, 'checked_out', None) is not None:
+            yield self._local.checked_out
+            return
+        
+        conn = self._take_from_pool()
+        self._local.checked_out = conn
+        try:
+            yield conn
+        finally:
+            self._local.checked_out = None
+            self._return_to_pool(conn)
+    
+    def _take_from_pool(self):
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
+        with self._connections_lock:
+            if self._pool_opened < self.pool_size:
+                self._pool_opened += 1
+                opened = True
+            else:
+                opened = False
+        if opened:
+            try:
+                return self._open_connection()
+            except Exception:
+                with self._connections_lock:
+                    self._pool_opened -= 1
+                raise
+        try:
+            return self._pool.get(timeout=self.checkout_timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError(
+                f"No pooled database connection free after {self.checkout_timeout}s"
+            )
+    
+    def _return_to_pool(self, conn):
+        try:
+            # Don't hand an open transaction to the next request
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            conn.close()
+            with self._connections_lock:
+                self._pool_opened -= 1
+            return
+        self._pool.put(conn)
+    
+    def init_app(self, app):
+        """Check a pooled connection out for each Flask request and return it on teardown"""
+        def open_request_connection():
+            self._local.request_checkout = self.checkout()
+            self._local.request_checkout.__enter__()
+        
+        def close_request_connection(exc=None):
+            request_checkout = getattr(self._local, 'request_checkout', None)
+            if request_checkout is not None:
+                self._local.request_checkout = None
+                request_checkout.__exit__(None, None, None)
+        
+        app.before_request(open_request_connection)
+        app.teardown_request(close_request_connection)
+    
+    def _close_dead_thread_connections(self):
+        # Threads come and go; reclaim the connections they left behind
+        for ident, (thread, conn) in list(self._connections.items()):
+            if not thread.is_alive():
+                conn.close()
+                del self._connections[ident]
+    
+    def close_all(self):
+        """Close every per-thread connection and every idle pooled one"""
+        with self._connections_lock:
+            for thread, conn in self._connections.values():
+                conn.close()
+            self._connections.clear()
+            while True:
+                try:
+                    self._pool.get_nowait().close()
+                except queue.Empty:
+                    break
+                self._pool_opened -= 1
+        self._local = threading.local()
     
     def init_database(self):
         conn = self.get_connection()
@@ -88,8 +405,115 @@ class DatabaseManager:
             )
         ''')
         
+        # One row per device and BANDWIDTH_BUCKET instead of one per capture drain;
+        # rows written before buckets existed are folded into them once
+        if self._add_column_if_missing(cursor, 'bandwidth_usage', 'bucket_start', 'INTEGER'):
+            cursor.execute('''
+                INSERT INTO bandwidth_usage
+                (device_ip, bucket_start, timestamp, bytes_sent, bytes_received, packets_sent, packets_received)
+                SELECT device_ip, bucket, datetime(bucket, 'unixepoch'),
+                       total(bytes_sent), total(bytes_received), total(packets_sent), total(packets_received)
+                FROM (
+                    SELECT *, CAST(strftime('%s', timestamp) AS INTEGER) / ?1 * ?1 AS bucket
+                    FROM bandwidth_usage WHERE bucket_start IS NULL
+                )
+                GROUP BY device_ip, bucket
+            ''', (self.BANDWIDTH_BUCKET,))
+            cursor.execute('DELETE FROM bandwidth_usage WHERE bucket_start IS NULL')
+        cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_bandwidth_usage_device_bucket ON bandwidth_usage(device_ip, bucket_start)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_bandwidth_usage_bucket ON bandwidth_usage(bucket_start)')
+        
+        # Range queries and retention scan network_stats by time
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_network_stats_timestamp ON network_stats(timestamp)')
+        
+        # Network stats rollups: min/max/sum/count per metric and time bucket
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'network_stats_rollups'")
+        rollups_exist = cursor.fetchone() is not None
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS network_stats_rollups (
+                resolution INTEGER NOT NULL,
+                bucket_start INTEGER NOT NULL,
+                samples INTEGER NOT NULL DEFAULT 0,
+                {_rollup_columns()},
+                PRIMARY KEY (resolution, bucket_start)
+            ) WITHOUT ROWID
+        ''')
+        
+        # Databases created before rollups existed get their history downsampled once
+        if not rollups_exist:
+            for resolution in ROLLUP_RESOLUTIONS:
+                cursor.execute(_rollup_backfill_sql(), {'resolution': resolution})
+        
+        # Presence sessions: one row per continuous online period, open while online_to is NULL
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS device_sessions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                device_ip TEXT NOT NULL,
+                online_from TIMESTAMP NOT NULL,
+                online_to TIMESTAMP
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_device_sessions_device_from ON device_sessions(device_ip, online_from)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_device_sessions_from ON device_sessions(online_from)')
+        
+        # Outage incidents update their alerts in place instead of adding rows
+        self._add_column_if_missing(cursor, 'alerts', 'incident_id', 'TEXT')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_alerts_incident ON alerts(incident_id) WHERE incident_id IS NOT NULL')
+        
+        # Alert pages are keyed on (timestamp, id); rowid rides along in every index
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_alerts_timestamp ON alerts(timestamp)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_alerts_is_read_timestamp ON alerts(is_read, timestamp)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_alerts_device_timestamp ON alerts(device_ip, timestamp)')
+        
+        # Per-table change counters, kept by triggers so every write path counts
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS table_versions (
+                table_name TEXT PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0,
+                modified_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        for table in VERSIONED_TABLES:
+            cursor.execute('INSERT OR IGNORE INTO table_versions (table_name) VALUES (?)', (table,))
+            if self._add_column_if_missing(cursor, table, 'row_version', 'INTEGER'):
+                # Rows from before change tracking all count as version 1, so
+                # a client starting from 0 still gets them in its first pull
+                cursor.execute(f'UPDATE {table} SET row_version = 1 WHERE row_version IS NULL')
+                cursor.execute(
+                    'UPDATE table_versions SET version = MAX(version, 1) WHERE table_name = ?',
+                    (table,)
+                )
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_row_version ON {table}(row_version)')
+            for trigger in _version_triggers_sql(table):
+                cursor.execute(trigger)
+        
+        # Hourly top-K talker snapshots
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS top_talker_snapshots (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp TIMESTAMP NOT NULL,
+                window TEXT NOT NULL,
+                rank INTEGER NOT NULL,
+                device_ip TEXT NOT NULL,
+                bytes_sent REAL,
+                bytes_received REAL
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_top_talker_snapshots_window_timestamp ON top_talker_snapshots(window, timestamp)')
+        
+        # Where discovery last saw each device
+        self._add_column_if_missing(cursor, 'devices', 'interface', 'TEXT')
+        self._add_column_if_missing(cursor, 'devices', 'subnet', 'TEXT')
+        
         conn.commit()
-        conn.close()
+    
+    def _add_column_if_missing(self, cursor, table, column, definition):
+        """Add ``column`` to ``table`` unless it exists; returns whether it was added"""
+        cursor.execute(f'PRAGMA table_info({table})')
+        if column in {row[1] for row in cursor.fetchall()}:
+            return False
+        cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+        return True
     
     def create_default_admin(self):
         conn = self.get_connection()
@@ -106,8 +530,6 @@ class DatabaseManager:
             ''', ('admin', password_hash.decode('utf-8'), 'superadmin'))
             conn.commit()
             print("Default admin user created: username='admin', password='admin123'")
-        
-        conn.close()
     
     # User management methods
     def create_user(self, username, password, role='normal'):
@@ -123,9 +545,8 @@ class DatabaseManager:
             conn.commit()
             return True
         except sqlite3.IntegrityError:
+            conn.rollback()
             return False
-        finally:
-            conn.close()
     
     def authenticate_user(self, username, password):
         conn = self.get_connection()
@@ -137,7 +558,6 @@ class DatabaseManager:
         ''', (username,))
         
         user = cursor.fetchone()
-        conn.close()
         
         if user and user[4]:  # is_active
             if bcrypt.checkpw(password.encode('utf-8'), user[2].encode('utf-8')):
@@ -158,7 +578,6 @@ class DatabaseManager:
         ''')
         
         users = cursor.fetchall()
-        conn.close()
         
         return [
             {
@@ -174,17 +593,62 @@ class DatabaseManager:
     
     # Device management methods
     def add_or_update_device(self, ip, mac=None, vendor=None, hostname=None, connection_type=None):
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        self.upsert_devices([{
+            'ip': ip,
+            'mac': mac,
+            'vendor': vendor,
+            'hostname': hostname,
+            'connection_type': connection_type
+        }])
+    
+    def upsert_devices(self, devices):
+        """Write a whole scan result in one transaction
         
-        cursor.execute('''
-            INSERT OR REPLACE INTO devices 
-            (ip_address, mac_address, vendor, hostname, connection_type, last_seen, is_online)
-            VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP, 1)
-        ''', (ip, mac, vendor, hostname, connection_type))
+        Existing rows are updated in place, so first_seen, is_blocked and
+        total_bandwidth survive. Rows whose details are unchanged are only
+        touched once last_seen is older than LAST_SEEN_REFRESH seconds.
+        is_online is left to the presence sessions. A device without an
+        interface/subnet tag keeps the one from its last discovery.
+        """
+        refresh = f'-{self.LAST_SEEN_REFRESH} seconds'
+        rows = [
+            (
+                device['ip'],
+                device.get('mac'),
+                device.get('vendor'),
+                device.get('hostname'),
+                device.get('connection_type'),
+                refresh,
+                device.get('interface'),
+                device.get('subnet')
+            )
+            for device in devices
+        ]
+        if not rows:
+            return
         
-        conn.commit()
-        conn.close()
+        conn = self.get_connection()
+        with conn:
+            conn.executemany('''
+                INSERT INTO devices
+                (ip_address, mac_address, vendor, hostname, connection_type, last_seen, is_online, interface, subnet)
+                VALUES (?1, ?2, ?3, ?4, ?5, CURRENT_TIMESTAMP, 0, ?7, ?8)
+                ON CONFLICT(ip_address) DO UPDATE SET
+                    mac_address = excluded.mac_address,
+                    vendor = excluded.vendor,
+                    hostname = excluded.hostname,
+                    connection_type = excluded.connection_type,
+                    last_seen = excluded.last_seen,
+                    interface = COALESCE(excluded.interface, devices.interface),
+                    subnet = COALESCE(excluded.subnet, devices.subnet)
+                WHERE devices.mac_address IS NOT excluded.mac_address
+                   OR devices.vendor IS NOT excluded.vendor
+                   OR devices.hostname IS NOT excluded.hostname
+                   OR devices.connection_type IS NOT excluded.connection_type
+                   OR devices.interface IS NOT COALESCE(excluded.interface, devices.interface)
+                   OR devices.subnet IS NOT COALESCE(excluded.subnet, devices.subnet)
+                   OR devices.last_seen < datetime('now', ?6)
+            ''', rows)
     
     def get_all_devices(self):
         conn = self.get_connection()
@@ -192,28 +656,12 @@ class DatabaseManager:
         
         cursor.execute('''
             SELECT ip_address, mac_address, vendor, hostname, connection_type,
-                   is_blocked, first_seen, last_seen, total_bandwidth, is_online
+                   is_blocked, first_seen, last_seen, total_bandwidth, is_online,
+                   interface, subnet
             FROM devices ORDER BY last_seen DESC
         ''')
         
-        devices = cursor.fetchall()
-        conn.close()
-        
-        return [
-            {
-                'ip': device[0],
-                'mac': device[1],
-                'vendor': device[2],
-                'hostname': device[3],
-                'connection_type': device[4],
-                'is_blocked': bool(device[5]),
-                'first_seen': device[6],
-                'last_seen': device[7],
-                'total_bandwidth': device[8],
-                'is_online': bool(device[9])
-            }
-            for device in devices
-        ]
+        return [_format_device(device) for device in cursor.fetchall()]
     
     def block_device(self, ip_address, block=True):
         conn = self.get_connection()
@@ -224,23 +672,347 @@ class DatabaseManager:
         ''', (block, ip_address))
         
         conn.commit()
-        conn.close()
+    
+    # Change tracking methods
+    def get_table_versions(self, tables=VERSIONED_TABLES):
+        """{table: {'version', 'modified_at'}} from the change counters only
+        
+        Cheap enough to run on every request: the API compares the result
+        with If-None-Match / If-Modified-Since and answers 304 without
+        reading the tables themselves.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        placeholders = ', '.join('?' for _ in tables)
+        cursor.execute(f'''
+            SELECT table_name, version, modified_at FROM table_versions
+            WHERE table_name IN ({placeholders})
+        ''', tuple(tables))
+        
+        return {
+            table_name: {'version': version, 'modified_at': modified_at}
+            for table_name, version, modified_at in cursor.fetchall()
+        }
+    
+    def get_cache_validators(self, *tables):
+        """ETag and Last-Modified (HTTP date) for a response built from ``tables``"""
+        versions = self.get_table_versions(tables)
+        etag = '"' + '-'.join(f'{table}.{versions[table]["version"]}' for table in tables) + '"'
+        last_modified = max(_to_epoch(versions[table]['modified_at']) for table in tables)
+        return {
+            'etag': etag,
+            'last_modified': time.strftime('%a, %d %b %Y %H:%M:%S GMT', time.gmtime(last_modified))
+        }
+    
+    def get_changes_since(self, table, version, limit=1000):
+        """Rows of ``table`` written after ``version``, oldest change first
+        
+        Rows have the same shape as the table's regular reader (devices as
+        in get_all_devices, and so on) plus their row_version. Returns the
+        rows plus the version to ask from next time; has_more is set when
+        ``limit`` cut the result short.
+        """
+        if table not in VERSIONED_TABLES:
+            raise ValueError(f"Unknown table {table!r}")
+        
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        # One read transaction: a flush committing between the row read and the
+        # counter read would move next_version past rows this caller never got
+        cursor.execute('BEGIN')
+        try:
+            columns, format_row = _CHANGE_FEED_FORMATS[table]
+            cursor.execute(f'''
+                SELECT {columns}, row_version FROM {table}
+                WHERE row_version > ?
+                ORDER BY row_version
+                LIMIT ?
+            ''', (version, limit + 1))
+            rows = [dict(format_row(row[:-1]), row_version=row[-1]) for row in cursor.fetchall()]
+            
+            cursor.execute('SELECT version FROM table_versions WHERE table_name = ?', (table,))
+            current_version = cursor.fetchone()[0]
+        finally:
+            cursor.execute('COMMIT')
+        
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        if has_more:
+            next_version = rows[-1]['row_version']
+        else:
+            next_version = max(version, current_version)
+        
+        return {
+            'table': table,
+            'since': version,
+            'version': next_version,
+            'has_more': has_more,
+            'rows': rows
+        }
+    
+    # Buffered write methods
+    def _timestamp(self):
+        # Same format as CURRENT_TIMESTAMP, taken when the row is queued
+        return datetime.utcnow().strftime(TIMESTAMP_FORMAT)
+    
+    def _write_batch(self, batch):
+        """Write one write-behind batch in a single transaction"""
+        conn = self.get_connection()
+        with conn:
+            if batch.get('network_stats'):
+                conn.executemany('''
+                    INSERT INTO network_stats
+                    (timestamp, download_speed, upload_speed, total_devices, active_devices, network_usage, ping_latency)
+                    VALUES (:timestamp, :download_speed, :upload_speed, :total_devices, :active_devices, :network_usage, :ping_latency)
+                ''', batch['network_stats'])
+                self._update_rollups(conn, batch['network_stats'])
+            
+            if batch.get('alerts'):
+                conn.executemany('''
+                    INSERT INTO alerts (timestamp, alert_type, message, severity, device_ip, additional_data, incident_id)
+                    VALUES (:timestamp, :type, :message, :severity, :device_ip, :additional_data, :incident_id)
+                ''', batch['alerts'])
+            
+            if batch.get('alert_updates'):
+                conn.executemany('''
+                    UPDATE alerts SET
+                        message = :message,
+                        additional_data = :additional_data,
+                        is_read = CASE WHEN :reopen THEN 0 ELSE is_read END
+                    WHERE incident_id = :incident_id AND alert_type = :type
+                ''', batch['alert_updates'])
+            
+            if batch.get('bandwidth_usage'):
+                conn.executemany('''
+                    INSERT INTO bandwidth_usage
+                    (bucket_start, timestamp, device_ip, bytes_sent, bytes_received, packets_sent, packets_received)
+                    VALUES (:bucket_start, :timestamp, :device_ip, :bytes_sent, :bytes_received, :packets_sent, :packets_received)
+                    ON CONFLICT(device_ip, bucket_start) DO UPDATE SET
+                        bytes_sent = bytes_sent + excluded.bytes_sent,
+                        bytes_received = bytes_received + excluded.bytes_received,
+                        packets_sent = packets_sent + excluded.packets_sent,
+                        packets_received = packets_received + excluded.packets_received
+                ''', batch['bandwidth_usage'])
+            
+            if batch.get('device_bandwidth'):
+                conn.executemany('''
+                    UPDATE devices SET total_bandwidth = total_bandwidth + :bytes
+                    WHERE ip_address = :device_ip
+                ''', batch['device_bandwidth'])
+            
+            # Opens before closes: a close names the session's online_from,
+            # so a device that left and came back in one batch stays correct
+            if batch.get('session_open'):
+                conn.executemany('''
+                    INSERT INTO device_sessions (device_ip, online_from) VALUES (:device_ip, :online_from)
+                ''', batch['session_open'])
+                conn.executemany('''
+                    UPDATE devices SET is_online = 1 WHERE ip_address = :device_ip
+                ''', batch['session_open'])
+            
+            if batch.get('session_close'):
+                conn.executemany('''
+                    UPDATE device_sessions SET online_to = :online_to
+                    WHERE device_ip = :device_ip AND online_from = :online_from AND online_to IS NULL
+                ''', batch['session_close'])
+                conn.executemany('''
+                    UPDATE devices SET is_online = 0
+                    WHERE ip_address = :device_ip
+                      AND NOT EXISTS (
+                          SELECT 1 FROM device_sessions
+                          WHERE device_ip = :device_ip AND online_to IS NULL
+                      )
+                ''', batch['session_close'])
+            
+            if batch.get('top_talkers'):
+                conn.executemany('''
+                    INSERT INTO top_talker_snapshots (timestamp, window, rank, device_ip, bytes_sent, bytes_received)
+                    VALUES (:timestamp, :window, :rank, :device_ip, :bytes_sent, :bytes_received)
+                ''', batch['top_talkers'])
+    
+    def _update_rollups(self, conn, stats_rows):
+        """Fold new raw stats rows into every rollup resolution"""
+        rollup_rows = []
+        for row in stats_rows:
+            epoch = _to_epoch(row['timestamp'])
+            for resolution in ROLLUP_RESOLUTIONS:
+                rollup_row = dict(row)
+                rollup_row['resolution'] = resolution
+                rollup_row['bucket_start'] = epoch - epoch % resolution
+                rollup_rows.append(rollup_row)
+        conn.executemany(_rollup_upsert_sql(), rollup_rows)
+    
+    def flush_writes(self):
+        """Commit everything waiting in the write-behind buffer"""
+        return self.write_buffer.flush()
+    
+    def close(self):
+        """Flush buffered writes and close all pooled connections"""
+        self.write_buffer.stop()
+        self.close_all()
     
     # Network stats methods
     def add_network_stats(self, download_speed, upload_speed, total_devices, active_devices, network_usage, ping_latency):
+        self.write_buffer.put('network_stats', {
+            'timestamp': self._timestamp(),
+            'download_speed': download_speed,
+            'upload_speed': upload_speed,
+            'total_devices': total_devices,
+            'active_devices': active_devices,
+            'network_usage': network_usage,
+            'ping_latency': ping_latency
+        })
+    
+    def add_bandwidth_usage(self, device_ip, bytes_sent, bytes_received, packets_sent, packets_received):
+        """Add to the device's usage in the current BANDWIDTH_BUCKET"""
+        now = int(time.time())
+        bucket_start = now - now % self.BANDWIDTH_BUCKET
+        self.write_buffer.put('bandwidth_usage', {
+            'bucket_start': bucket_start,
+            'timestamp': _format_epoch(bucket_start),
+            'device_ip': device_ip,
+            'bytes_sent': bytes_sent,
+            'bytes_received': bytes_received,
+            'packets_sent': packets_sent,
+            'packets_received': packets_received
+        })
+    
+    def add_device_bandwidth(self, device_ip, total_bytes):
+        self.write_buffer.put('device_bandwidth', {
+            'device_ip': device_ip,
+            'bytes': total_bytes
+        })
+    
+    # Presence session methods
+    def open_device_sessions(self, sessions):
+        for session in sessions:
+            self.write_buffer.put('session_open', {
+                'device_ip': session['device_ip'],
+                'online_from': _format_epoch(session['online_from'])
+            })
+    
+    def close_device_sessions(self, sessions):
+        for session in sessions:
+            self.write_buffer.put('session_close', {
+                'device_ip': session['device_ip'],
+                'online_from': _format_epoch(session['online_from']),
+                'online_to': _format_epoch(session['online_to'])
+            })
+    
+    def close_stale_device_sessions(self):
+        """End sessions left open by a previous run at the device's last_seen"""
+        conn = self.get_connection()
+        with conn:
+            cursor = conn.execute('''
+                UPDATE device_sessions SET online_to = coalesce(
+                    (SELECT max(last_seen, device_sessions.online_from) FROM devices
+                     WHERE devices.ip_address = device_sessions.device_ip),
+                    online_from
+                )
+                WHERE online_to IS NULL
+            ''')
+            conn.execute('UPDATE devices SET is_online = 0 WHERE is_online = 1')
+        return cursor.rowcount
+    
+    def get_device_sessions(self, start, end=None, device_ip=None):
+        """Sessions overlapping start..end, optionally for one device
+        
+        Open sessions are returned with online_to None.
+        """
+        # Snapshot the buffer first: a flush during the query then shows up in
+        # both places (and is de-duplicated) instead of in neither
+        pending_opens = self.write_buffer.get_pending('session_open')
+        pending_closes = {
+            (row['device_ip'], row['online_from']): row['online_to']
+            for row in self.write_buffer.get_pending('session_close')
+        }
+        
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        params = {
+            'start': _format_epoch(_to_epoch(start)),
+            'end': _format_epoch(_to_epoch(end) if end is not None else time.time()),
+            'device_ip': device_ip
+        }
+        device_filter = 'device_ip = :device_ip AND' if device_ip else ''
+        cursor.execute(f'''
+            SELECT device_ip, online_from, online_to
+            FROM device_sessions
+            WHERE {device_filter} online_from <= :end
+              AND (online_to IS NULL OR online_to >= :start)
+            ORDER BY online_from
+        ''', params)
+        
+        sessions = list(cursor.fetchall())
+        # Sessions still waiting in the write-behind buffer
+        known = {(row[0], row[1]) for row in sessions}
+        for row in pending_opens:
+            key = (row['device_ip'], row['online_from'])
+            if key not in known and (not device_ip or row['device_ip'] == device_ip) and row['online_from'] <= params['end']:
+                sessions.append((row['device_ip'], row['online_from'], None))
+        
+        result = []
+        for ip, online_from, online_to in sorted(sessions, key=lambda row: row[1]):
+            online_to = online_to or pending_closes.get((ip, online_from))
+            if online_to is not None and online_to < params['start']:
+                continue
+            result.append({
+                'device_ip': ip,
+                'online_from': online_from,
+                'online_to': online_to,
+                'duration': (_to_epoch(online_to) if online_to else time.time()) - _to_epoch(online_from)
+            })
+        return result
+    
+    # Top talker methods
+    def add_top_talkers_snapshot(self, window, talkers):
+        timestamp = self._timestamp()
+        for rank, talker in enumerate(talkers, 1):
+            self.write_buffer.put('top_talkers', {
+                'timestamp': timestamp,
+                'window': window,
+                'rank': rank,
+                'device_ip': talker['device_ip'],
+                'bytes_sent': talker['bytes_sent'],
+                'bytes_received': talker['bytes_received']
+            })
+    
+    def get_top_talker_snapshots(self, start, end=None, window='1h'):
+        """Persisted top-K snapshots between start and end, grouped by snapshot time"""
         conn = self.get_connection()
         cursor = conn.cursor()
         
+        start = _format_epoch(_to_epoch(start))
+        end = _format_epoch(_to_epoch(end) if end is not None else time.time())
         cursor.execute('''
-            INSERT INTO network_stats 
-            (download_speed, upload_speed, total_devices, active_devices, network_usage, ping_latency)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (download_speed, upload_speed, total_devices, active_devices, network_usage, ping_latency))
+            SELECT timestamp, rank, device_ip, bytes_sent, bytes_received
+            FROM top_talker_snapshots
+            WHERE window = ? AND timestamp >= ? AND timestamp <= ?
+            ORDER BY timestamp, rank
+        ''', (window, start, end))
         
-        conn.commit()
-        conn.close()
+        snapshots = []
+        for timestamp, rank, device_ip, bytes_sent, bytes_received in cursor.fetchall():
+            if not snapshots or snapshots[-1]['timestamp'] != timestamp:
+                snapshots.append({'timestamp': timestamp, 'window': window, 'talkers': []})
+            snapshots[-1]['talkers'].append({
+                'rank': rank,
+                'device_ip': device_ip,
+                'bytes_sent': bytes_sent,
+                'bytes_received': bytes_received,
+                'total_bytes': (bytes_sent or 0) + (bytes_received or 0)
+            })
+        
+        return snapshots
     
     def get_recent_network_stats(self, limit=100):
+        # Snapshot the buffer before the query, as in get_device_sessions
+        pending = self.write_buffer.get_pending('network_stats')
+        
         conn = self.get_connection()
         cursor = conn.cursor()
         
@@ -252,67 +1024,279 @@ class DatabaseManager:
             LIMIT ?
         ''', (limit,))
         
-        stats = cursor.fetchall()
-        conn.close()
+        results = [_format_network_stats(stat) for stat in cursor.fetchall()]
         
-        return [
-            {
-                'timestamp': stat[0],
-                'download_speed': stat[1],
-                'upload_speed': stat[2],
-                'total_devices': stat[3],
-                'active_devices': stat[4],
-                'network_usage': stat[5],
-                'ping_latency': stat[6]
-            }
-            for stat in stats
-        ]
+        # Include rows still waiting in the write-behind buffer, minus any a
+        # flush committed while the query ran
+        if pending:
+            committed = {frozenset(row.items()) for row in results}
+            pending = [row for row in pending if frozenset(row.items()) not in committed]
+            results = sorted(pending, key=lambda s: s['timestamp'], reverse=True) + results
+            results = results[:limit]
+        
+        return results
     
-    # Alert methods
-    def add_alert(self, alert_type, message, severity='info', device_ip=None, additional_data=None):
+    def _pick_stats_resolution(self, start, end, max_points):
+        """Coarsest source (0 = raw rows) that still yields max_points over the range"""
+        target = (end - start) / max(1, max_points)
+        now = time.time()
+        
+        candidates = [0] + list(ROLLUP_RESOLUTIONS)
+        chosen = 0
+        for resolution in candidates:
+            if max(resolution, self.RAW_STATS_INTERVAL) <= target:
+                chosen = resolution
+        
+        # Skip sources whose retention no longer covers the start of the range
+        retention = dict(self.ROLLUP_RETENTION_DAYS)
+        retention[0] = self.RAW_STATS_RETENTION_DAYS
+        for resolution in candidates[candidates.index(chosen):]:
+            days = retention.get(resolution)
+            if days is None or start >= now - days * 86400:
+                return resolution
+        return candidates[-1]
+    
+    def get_network_stats_history(self, start, end=None, max_points=500, metrics=None):
+        """Bucketed min/max/avg per metric between start and end, as column arrays
+        
+        The source is the coarsest resolution that can still fill max_points,
+        and the bucketing itself runs in SQL, so the payload is at most
+        max_points entries per column whatever the range. ``metrics`` limits
+        the response to a subset of the network_stats columns.
+        """
+        start = _to_epoch(start)
+        end = _to_epoch(end) if end is not None else int(time.time())
+        max_points = max(1, int(max_points))
+        metrics = [m for m in STATS_METRICS if metrics is None or m in metrics] or list(STATS_METRICS)
+        resolution = self._pick_stats_resolution(start, end, max_points)
+        
+        # Bucket width: enough to fit max_points, and a whole number of source buckets
+        step = resolution or 1
+        width = max(step, -(-(end - start) // max_points))
+        width = -(-width // step) * step
+        
         conn = self.get_connection()
         cursor = conn.cursor()
         
-        cursor.execute('''
-            INSERT INTO alerts (alert_type, message, severity, device_ip, additional_data)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (alert_type, message, severity, device_ip, json.dumps(additional_data) if additional_data else None))
+        if resolution == 0:
+            aggregates = ', '.join(f'min({m}), max({m}), avg({m})' for m in metrics)
+            cursor.execute(f'''
+                SELECT CAST(strftime('%s', timestamp) AS INTEGER) / :width * :width AS bucket, {aggregates}
+                FROM network_stats
+                WHERE timestamp >= :start AND timestamp <= :end
+                GROUP BY bucket
+                ORDER BY bucket
+            ''', {
+                'width': width,
+                'start': time.strftime(TIMESTAMP_FORMAT, time.gmtime(start)),
+                'end': time.strftime(TIMESTAMP_FORMAT, time.gmtime(end))
+            })
+        else:
+            aggregates = ', '.join(
+                f'min({m}_min), max({m}_max), total({m}_sum) / nullif(total({m}_count), 0)'
+                for m in metrics
+            )
+            cursor.execute(f'''
+                SELECT bucket_start / :width * :width AS bucket, {aggregates}
+                FROM network_stats_rollups
+                WHERE resolution = :resolution AND bucket_start >= :start AND bucket_start <= :end
+                GROUP BY bucket
+                ORDER BY bucket
+            ''', {
+                'width': width,
+                'resolution': resolution,
+                'start': start - start % resolution,
+                'end': end
+            })
         
-        conn.commit()
-        conn.close()
+        rows = cursor.fetchall()
+        
+        result = {
+            'start': start,
+            'end': end,
+            'resolution': resolution,
+            'bucket_seconds': width,
+            'timestamps': [row[0] for row in rows]
+        }
+        for i, metric in enumerate(metrics):
+            result[metric] = {
+                'min': [row[1 + i * 3] for row in rows],
+                'max': [row[2 + i * 3] for row in rows],
+                'avg': [row[3 + i * 3] for row in rows]
+            }
+        return result
     
-    def get_recent_alerts(self, limit=50):
+    def prune_network_stats(self, raw_retention_days=None, rollup_retention_days=None, batch_size=1000, pause=0.01):
+        """Delete stats past their retention in small batches; returns rows removed"""
+        raw_retention_days = raw_retention_days or self.RAW_STATS_RETENTION_DAYS
+        rollup_retention_days = rollup_retention_days or self.ROLLUP_RETENTION_DAYS
         conn = self.get_connection()
-        cursor = conn.cursor()
+        removed = 0
         
-        cursor.execute('''
+        cutoff = time.strftime(TIMESTAMP_FORMAT, time.gmtime(time.time() - raw_retention_days * 86400))
+        while True:
+            # Ids grow with time, so the oldest rows are found without a timestamp scan
+            with conn:
+                cursor = conn.execute('''
+                    DELETE FROM network_stats WHERE id IN (
+                        SELECT id FROM network_stats WHERE timestamp < ? ORDER BY id LIMIT ?
+                    )
+                ''', (cutoff, batch_size))
+            removed += cursor.rowcount
+            if cursor.rowcount < batch_size:
+                break
+            # Let the monitor thread's writes interleave with a long prune
+            time.sleep(pause)
+        
+        for resolution, days in rollup_retention_days.items():
+            if days is None:
+                continue
+            cutoff_epoch = int(time.time() - days * 86400)
+            while True:
+                with conn:
+                    cursor = conn.execute('''
+                        DELETE FROM network_stats_rollups WHERE resolution = ? AND bucket_start IN (
+                            SELECT bucket_start FROM network_stats_rollups
+                            WHERE resolution = ? AND bucket_start < ? LIMIT ?
+                        )
+                    ''', (resolution, resolution, cutoff_epoch, batch_size))
+                removed += cursor.rowcount
+                if cursor.rowcount < batch_size:
+                    break
+                time.sleep(pause)
+        
+        return removed
+    
+    def prune_bandwidth_usage(self, retention_days=None, batch_size=1000, pause=0.01):
+        """Delete bandwidth buckets past their retention in small batches; returns rows removed"""
+        retention_days = retention_days or self.BANDWIDTH_RETENTION_DAYS
+        cutoff = int(time.time() - retention_days * 86400)
+        conn = self.get_connection()
+        removed = 0
+        
+        while True:
+            with conn:
+                cursor = conn.execute('''
+                    DELETE FROM bandwidth_usage WHERE id IN (
+                        SELECT id FROM bandwidth_usage WHERE bucket_start < ? LIMIT ?
+                    )
+                ''', (cutoff, batch_size))
+            removed += cursor.rowcount
+            if cursor.rowcount < batch_size:
+                break
+            time.sleep(pause)
+        
+        return removed
+    
+    # Alert methods
+    def add_alert(self, alert_type, message, severity='info', device_ip=None, additional_data=None, incident_id=None):
+        # Alerts are queued but flushed right away, off the caller's thread
+        self.write_buffer.put('alerts', {
+            'timestamp': self._timestamp(),
+            'type': alert_type,
+            'message': message,
+            'severity': severity,
+            'device_ip': device_ip,
+            'additional_data': json.dumps(additional_data) if additional_data else None,
+            'incident_id': incident_id
+        }, urgent=True)
+    
+    def update_incident_alert(self, incident_id, alert_type, message, additional_data=None, reopen=False):
+        """Rewrite the alert of an ongoing incident; ``reopen`` marks it unread again"""
+        self.write_buffer.put('alert_updates', {
+            'incident_id': incident_id,
+            'type': alert_type,
+            'message': message,
+            'additional_data': json.dumps(additional_data) if additional_data else None,
+            'reopen': reopen
+        }, urgent=True)
+    
+    def _alert_filters(self, severity=None, alert_type=None, is_read=None, device_ip=None, until=None):
+        """WHERE clauses and parameters for the alert filters; list values match any"""
+        clauses = []
+        params = []
+        for column, value in (('severity', severity), ('alert_type', alert_type), ('device_ip', device_ip)):
+            if value is None:
+                continue
+            if isinstance(value, (list, tuple, set)):
+                clauses.append(f'{column} IN (SELECT value FROM json_each(?))')
+                params.append(json.dumps(list(value)))
+            else:
+                clauses.append(f'{column} = ?')
+                params.append(value)
+        if is_read is not None:
+            clauses.append('is_read = ?')
+            params.append(1 if is_read else 0)
+        if until is not None:
+            clauses.append('timestamp <= ?')
+            params.append(_format_epoch(_to_epoch(until)))
+        return clauses, params
+    
+    def get_alerts(self, limit=50, cursor=None, severity=None, alert_type=None, is_read=None, device_ip=None):
+        """One page of alerts, newest first, with a cursor for the next page
+        
+        Paging is keyset-based on (timestamp, id): the cursor names the last
+        alert returned and the next page starts right after it, so deep
+        pages cost the same as the first and new alerts don't shift them.
+        """
+        clauses, params = self._alert_filters(severity, alert_type, is_read, device_ip)
+        if cursor:
+            last_timestamp, last_id = self._decode_alert_cursor(cursor)
+            clauses.append('(timestamp, id) < (?, ?)')
+            params.extend((last_timestamp, last_id))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        
+        conn = self.get_connection()
+        db_cursor = conn.cursor()
+        
+        db_cursor.execute(f'''
             SELECT id, alert_type, message, severity, timestamp, is_read, device_ip, additional_data
-            FROM alerts 
-            ORDER BY timestamp DESC 
+            FROM alerts
+            {where}
+            ORDER BY timestamp DESC, id DESC
             LIMIT ?
-        ''', (limit,))
+        ''', params + [limit + 1])
         
-        alerts = cursor.fetchall()
-        conn.close()
+        alerts = db_cursor.fetchall()
+        has_more = len(alerts) > limit
+        alerts = alerts[:limit]
         
-        return [
-            {
-                'id': alert[0],
-                'type': alert[1],
-                'message': alert[2],
-                'severity': alert[3],
-                'timestamp': alert[4],
-                'is_read': bool(alert[5]),
-                'device_ip': alert[6],
-                'additional_data': json.loads(alert[7]) if alert[7] else None
-            }
-            for alert in alerts
-        ]
+        return {
+            'alerts': [_format_alert(alert) for alert in alerts],
+            'next_cursor': self._encode_alert_cursor(alerts[-1][4], alerts[-1][0]) if has_more else None
+        }
     
-    def mark_alert_read(self, alert_id):
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def _encode_alert_cursor(self, timestamp, alert_id):
+        return base64.urlsafe_b64encode(f'{timestamp}|{alert_id}'.encode()).decode()
+    
+    def _decode_alert_cursor(self, cursor):
+        try:
+            timestamp, alert_id = base64.urlsafe_b64decode(cursor.encode()).decode().rsplit('|', 1)
+            return timestamp, int(alert_id)
+        except (ValueError, UnicodeDecodeError):
+            raise ValueError(f"Invalid alerts cursor {cursor!r}")
+    
+    def get_recent_alerts(self, limit=50):
+        return self.get_alerts(limit)['alerts']
+    
+    def acknowledge_alerts(self, ids=None, severity=None, alert_type=None, device_ip=None, until=None):
+        """Mark alerts read in one statement, by id list or by filter
         
-        cursor.execute('UPDATE alerts SET is_read = 1 WHERE id = ?', (alert_id,))
-        conn.commit()
-        conn.close()
+        With ``ids`` only those alerts are touched; otherwise every unread
+        alert matching the filters (and at or before ``until``, if given)
+        is. Returns the number of alerts acknowledged.
+        """
+        if ids is not None:
+            clauses = ['id IN (SELECT value FROM json_each(?))']
+            params = [json.dumps([int(alert_id) for alert_id in ids])]
+        else:
+            clauses, params = self._alert_filters(severity, alert_type, None, device_ip, until)
+        clauses.append('is_read = 0')
+        
+        conn = self.get_connection()
+        with conn:
+            cursor = conn.execute(f"UPDATE alerts SET is_read = 1 WHERE {' AND '.join(clauses)}", params)
+        return cursor.rowcount
+    
+    def mark_alert_read(self, alert_id):
+        self.acknowledge_alerts(ids=[alert_id])
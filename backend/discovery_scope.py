@@ -0,0 +1,112 @@
+import fnmatch
+import ipaddress
+
+
+class DiscoveryScope:
+    """Which interfaces and subnets device discovery covers
+
+    Interface filters are shell-style patterns on the interface name
+    (``'docker*'``, ``'veth*'``); CIDR filters are networks. Without include
+    lists every interface and subnet is in scope, and exclusions always
+    win. Discovered devices are tagged with the interface and subnet they
+    were seen on, and a device seen on several interfaces is kept once.
+    """
+
+    def __init__(self, include_interfaces=None, exclude_interfaces=(), include_cidrs=None, exclude_cidrs=()):
+        self.include_interfaces = list(include_interfaces) if include_interfaces else None
+        self.exclude_interfaces = list(exclude_interfaces)
+        self.include_cidrs = [ipaddress.ip_network(cidr, strict=False) for cidr in include_cidrs] if include_cidrs else None
+        self.exclude_cidrs = [ipaddress.ip_network(cidr, strict=False) for cidr in exclude_cidrs]
+
+    def interface_allowed(self, name):
+        if any(fnmatch.fnmatch(name, pattern) for pattern in self.exclude_interfaces):
+            return False
+        return self.include_interfaces is None or any(
+            fnmatch.fnmatch(name, pattern) for pattern in self.include_interfaces
+        )
+
+    def address_allowed(self, ip):
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            return False
+        if any(address in network for network in self.exclude_cidrs if network.version == address.version):
+            return False
+        return self.include_cidrs is None or any(
+            address in network for network in self.include_cidrs if network.version == address.version
+        )
+
+    def _network_allowed(self, network):
+        if any(network.subnet_of(excluded) for excluded in self.exclude_cidrs if excluded.version == network.version):
+            return False
+        return self.include_cidrs is None or any(
+            network.overlaps(included) for included in self.include_cidrs if included.version == network.version
+        )
+
+    def subnets(self, interfaces):
+        """(interface name, IPv4 network) for every address of the up, in-scope interfaces
+
+        ``interfaces`` is the dict from ``NetworkMonitor.get_network_interfaces``.
+        Loopback and link-local networks are left out.
+        """
+        subnets = []
+        for name, info in interfaces.items():
+            if not info.get('is_up') or not self.interface_allowed(name):
+                continue
+            for address in info.get('addresses', ()):
+                try:
+                    interface = ipaddress.IPv4Interface(f"{address['ip']}/{address['netmask']}")
+                except (ValueError, TypeError):
+                    continue
+                if interface.ip.is_loopback or interface.ip.is_link_local:
+                    continue
+                if self._network_allowed(interface.network) and (name, interface.network) not in subnets:
+                    subnets.append((name, interface.network))
+        return subnets
+
+    def locate(self, ip, subnets, interface=None):
+        """The (interface, subnet) ``ip`` was seen on, preferring ``interface`` when known"""
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            return interface, None
+        matches = [(name, network) for name, network in subnets if address.version == network.version and address in network]
+        for name, network in matches:
+            if interface is None or name == interface:
+                return name, str(network)
+        return interface, None
+
+    def tag(self, devices, subnets):
+        """Tag devices with their interface and subnet and drop the ones out of scope
+
+        With include filters a device must be on an included interface and
+        subnet; devices on excluded interfaces or in excluded CIDRs are always
+        dropped.
+        """
+        filtered = self.include_interfaces is not None or self.include_cidrs is not None
+        tagged = []
+        for device in devices:
+            interface, subnet = self.locate(device['ip'], subnets, device.get('interface'))
+            if interface is not None and not self.interface_allowed(interface):
+                continue
+            if not self.address_allowed(device['ip']) or (filtered and subnet is None):
+                continue
+            tagged.append(dict(device, interface=interface, subnet=subnet))
+        return tagged
+
+    def merge(self, devices):
+        """One record per IP; known MAC/vendor/hostname win over 'Unknown' placeholders
+
+        Records with a resolved MAC (from a neighbor table) go first, so their
+        interface and subnet tags are the ones kept.
+        """
+        merged = {}
+        for device in sorted(devices, key=lambda device: device.get('mac') in (None, 'Unknown')):
+            existing = merged.get(device['ip'])
+            if existing is None:
+                merged[device['ip']] = dict(device)
+                continue
+            for field, value in device.items():
+                if existing.get(field) in (None, 'Unknown', existing['ip']) and value not in (None, 'Unknown'):
+                    existing[field] = value
+        return list(merged.values())
@@ -0,0 +1,113 @@
+import socket
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait
+
+
+class HostnameResolver:
+    """Cached reverse-DNS lookups on a bounded worker pool
+
+    Answers are kept in an LRU with a TTL (shorter for failures), and
+    concurrent lookups for the same address share one in-flight query.
+    Callers never wait longer than their deadline; a lookup that misses it
+    keeps running and lands in the cache for the next caller.
+    """
+
+    def __init__(self, max_entries=4096, ttl=3600, negative_ttl=300, workers=8, timeout=0.5):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.timeout = timeout
+        self.cache = OrderedDict()
+        self.inflight = {}
+        # Re-entrant: a lookup that finishes immediately runs its completion
+        # callback while the submitting thread still holds the lock
+        self.lock = threading.RLock()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='rdns')
+
+    def _lookup(self, ip):
+        try:
+            return socket.gethostbyaddr(ip)[0]
+        except (socket.herror, socket.gaierror, OSError):
+            return None
+
+    def _get_cached(self, ip):
+        entry = self.cache.get(ip)
+        if entry is None:
+            return False, None
+        expires_at, hostname = entry
+        if expires_at <= time.monotonic():
+            del self.cache[ip]
+            return False, None
+        self.cache.move_to_end(ip)
+        return True, hostname
+
+    def _store(self, ip, hostname):
+        ttl = self.ttl if hostname else self.negative_ttl
+        self.cache[ip] = (time.monotonic() + ttl, hostname)
+        self.cache.move_to_end(ip)
+        while len(self.cache) > self.max_entries:
+            self.cache.popitem(last=False)
+
+    def _submit(self, ip):
+        """Return the future for ``ip``, starting a lookup only if none is running"""
+        future = self.inflight.get(ip)
+        if future is None:
+            future = self.executor.submit(self._lookup, ip)
+            self.inflight[ip] = future
+            future.add_done_callback(lambda f, ip=ip: self._complete(ip, f))
+        return future
+
+    def _complete(self, ip, future):
+        with self.lock:
+            self.inflight.pop(ip, None)
+            self._store(ip, None if future.exception() else future.result())
+
+    def resolve(self, ip, timeout=None):
+        """Return the hostname for ``ip``, or ``ip`` itself if unknown or too slow"""
+        return self.resolve_many([ip], timeout)[ip]
+
+    def resolve_many(self, ips, timeout=None):
+        """Resolve a batch of addresses sharing one deadline"""
+        timeout = self.timeout if timeout is None else timeout
+        results = {}
+        futures = {}
+
+        with self.lock:
+            for ip in ips:
+                hit, hostname = self._get_cached(ip)
+                if hit:
+                    results[ip] = hostname or ip
+                else:
+                    futures[ip] = self._submit(ip)
+
+        if futures:
+            wait(list(futures.values()), timeout=timeout)
+            for ip, future in futures.items():
+                try:
+                    hostname = future.result(timeout=0)
+                except (FutureTimeoutError, Exception):
+                    hostname = None
+                results[ip] = hostname or ip
+
+        return results
+
+    def prefetch(self, ips):
+        """Start lookups for uncached addresses without waiting for them"""
+        with self.lock:
+            for ip in ips:
+                hit, _ = self._get_cached(ip)
+                if not hit:
+                    self._submit(ip)
+
+    def invalidate(self, ip=None):
+        """Forget one cached address, or the whole cache"""
+        with self.lock:
+            if ip is None:
+                self.cache.clear()
+            else:
+                self.cache.pop(ip, None)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
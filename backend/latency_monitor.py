@@ -0,0 +1,169 @@
+import asyncio
+import bisect
+import math
+import threading
+import time
+
+
+class LatencyHistogram:
+    """Streaming RTT histogram with fixed, log-spaced buckets
+
+    Percentiles are answered from bucket counts, so memory is constant no
+    matter how many samples are recorded.
+    """
+
+    def __init__(self, min_ms=0.05, max_ms=10000.0, buckets=96):
+        ratio = (max_ms / min_ms) ** (1.0 / (buckets - 1))
+        self.bounds = [min_ms * ratio ** i for i in range(buckets)]
+        self.counts = [0] * (buckets + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+        self.min_seen = None
+        self.max_seen = None
+
+    def record(self, rtt_ms):
+        """Add one RTT sample in milliseconds"""
+        self.counts[bisect.bisect_left(self.bounds, rtt_ms)] += 1
+        self.total += 1
+        self.sum_ms += rtt_ms
+        if self.min_seen is None or rtt_ms < self.min_seen:
+            self.min_seen = rtt_ms
+        if self.max_seen is None or rtt_ms > self.max_seen:
+            self.max_seen = rtt_ms
+
+    def percentile(self, p):
+        """Estimate the ``p``-th percentile (0-100) in milliseconds"""
+        if not self.total:
+            return None
+
+        rank = max(1, math.ceil(self.total * p / 100.0))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                break
+
+        # Report the bucket's upper bound, clamped to what was actually seen
+        upper = self.bounds[min(index, len(self.bounds) - 1)]
+        return max(self.min_seen, min(upper, self.max_seen))
+
+    def mean(self):
+        return self.sum_ms / self.total if self.total else None
+
+    def reset(self):
+        self.counts = [0] * len(self.counts)
+        self.total = 0
+        self.sum_ms = 0.0
+        self.min_seen = None
+        self.max_seen = None
+
+
+def summarize_burst(rtts_ms, sent):
+    """min/avg/max RTT, jitter and loss for one probe burst"""
+    received = len(rtts_ms)
+    summary = {
+        'sent': sent,
+        'received': received,
+        'loss': (sent - received) / sent if sent else 0.0,
+        'min': None,
+        'avg': None,
+        'max': None,
+        'jitter': None
+    }
+
+    if received:
+        summary['min'] = min(rtts_ms)
+        summary['avg'] = sum(rtts_ms) / received
+        summary['max'] = max(rtts_ms)
+        # Mean absolute difference between consecutive samples (RFC 3550 style)
+        if received > 1:
+            diffs = [abs(b - a) for a, b in zip(rtts_ms, rtts_ms[1:])]
+            summary['jitter'] = sum(diffs) / len(diffs)
+        else:
+            summary['jitter'] = 0.0
+
+    return summary
+
+
+class LatencyMonitor:
+    """Measures RTT, jitter and packet loss to a set of targets with probe bursts
+
+    A burst ends at ``deadline`` seconds however many probes time out; the
+    probes it didn't get to count as lost, so a dead link can't stretch one
+    measurement past its schedule.
+    """
+
+    PERCENTILES = (50, 90, 95, 99)
+
+    def __init__(self, prober, targets=('8.8.8.8', '1.1.1.1'), burst_size=5, burst_spacing=0.05, timeout=1.0, deadline=2.0):
+        self.prober = prober
+        self.targets = list(targets)
+        self.burst_size = burst_size
+        self.burst_spacing = burst_spacing
+        self.timeout = timeout
+        self.deadline = deadline
+        self.histograms = {target: LatencyHistogram() for target in self.targets}
+        self.last_results = {}
+        self.last_measured = None
+        self.lock = threading.Lock()
+
+    def measure(self):
+        """Send one burst to every target and record the results"""
+        results = asyncio.run(self._measure_all())
+
+        with self.lock:
+            for target, (rtts_ms, summary) in results.items():
+                histogram = self.histograms.setdefault(target, LatencyHistogram())
+                for rtt_ms in rtts_ms:
+                    histogram.record(rtt_ms)
+                self.last_results[target] = summary
+            self.last_measured = time.time()
+
+        return {target: summary for target, (_, summary) in results.items()}
+
+    async def _measure_all(self):
+        bursts = await asyncio.gather(*(self._burst(target) for target in self.targets))
+        return dict(zip(self.targets, bursts))
+
+    async def _burst(self, target):
+        rtts_ms = []
+        deadline = time.monotonic() + self.deadline
+        for i in range(self.burst_size):
+            if i:
+                await asyncio.sleep(self.burst_spacing)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            # ICMP or one fixed TCP port: never a port sweep of a public host
+            result = await self.prober.ping(target, min(self.timeout, remaining))
+            if result['alive']:
+                rtts_ms.append(result['rtt'] * 1000.0)
+        return rtts_ms, summarize_burst(rtts_ms, self.burst_size)
+
+    def get_ping_latency(self):
+        """Average RTT in ms of the last burst, using the first target that answered"""
+        with self.lock:
+            for target in self.targets:
+                summary = self.last_results.get(target)
+                if summary and summary['avg'] is not None:
+                    return summary['avg']
+        return None
+
+    def get_summary(self):
+        """Last burst results plus histogram percentiles for every target"""
+        with self.lock:
+            targets = {}
+            for target in self.targets:
+                histogram = self.histograms[target]
+                targets[target] = {
+                    'last': self.last_results.get(target),
+                    'percentiles': {
+                        f'p{p}': histogram.percentile(p) for p in self.PERCENTILES
+                    },
+                    'samples': histogram.total
+                }
+
+            return {
+                'measured_at': self.last_measured,
+                'targets': targets
+            }
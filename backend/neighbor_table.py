@@ -0,0 +1,80 @@
+import os
+import threading
+
+PROC_NET_ARP = '/proc/net/arp'
+
+# ATF_COM: the entry has a resolved hardware address
+ATF_COM = 0x02
+
+EMPTY_MAC = '00:00:00:00:00:00'
+
+
+def parse_proc_net_arp(text):
+    """Parse the contents of /proc/net/arp into {ip: entry}
+
+    Incomplete entries (no resolved hardware address) are skipped.
+    """
+    entries = {}
+    lines = text.splitlines()
+
+    for line in lines[1:]:
+        parts = line.split()
+        if len(parts) < 6:
+            continue
+
+        ip, _, flags, mac, _, interface = parts[:6]
+        try:
+            flags = int(flags, 16)
+        except ValueError:
+            continue
+        if not flags & ATF_COM or mac == EMPTY_MAC:
+            continue
+
+        entries[ip] = {
+            'ip': ip,
+            'mac': mac.upper(),
+            'interface': interface,
+            'flags': flags
+        }
+
+    return entries
+
+
+def diff_snapshots(previous, current):
+    """Compare two neighbor snapshots and return added/removed/changed entries"""
+    added = [entry for ip, entry in current.items() if ip not in previous]
+    removed = [entry for ip, entry in previous.items() if ip not in current]
+    changed = [
+        entry for ip, entry in current.items()
+        if ip in previous and previous[ip] != entry
+    ]
+    return {'added': added, 'removed': removed, 'changed': changed}
+
+
+class NeighborTable:
+    """Reads the Linux kernel neighbor (ARP) table and tracks changes between scans"""
+
+    def __init__(self, path=PROC_NET_ARP):
+        self.path = path
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def is_available(self):
+        return os.path.exists(self.path)
+
+    def read_snapshot(self):
+        """Read the current neighbor table"""
+        with open(self.path, 'r') as f:
+            return parse_proc_net_arp(f.read())
+
+    def scan(self):
+        """Read the table and return only what changed since the previous scan"""
+        current = self.read_snapshot()
+        with self.lock:
+            changes = diff_snapshots(self.entries, current)
+            self.entries = current
+        return changes
+
+    def get_entries(self):
+        with self.lock:
+            return dict(self.entries)
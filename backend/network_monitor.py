@@ -1,22 +1,97 @@
+import os
 import psutil
 import socket
 import subprocess
 import platform
 import time
 import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 import json
 import sqlite3
 from database import DatabaseManager
+from throughput_sampler import ThroughputSampler
+from reachability_prober import ReachabilityProber
+from latency_monitor import LatencyMonitor
+from neighbor_table import NeighborTable
+from hostname_resolver import HostnameResolver
+from oui_database import OuiDatabase
+from timeseries_store import TimeSeriesStore
+from shared_capture import SharedMemoryCapture
+from flow_table import FlowTable
+from top_talkers import TopTalkers
+from presence_tracker import PresenceTracker
+from state_stream import StateStream
+from outage_detector import OutageDetector
+from task_scheduler import TaskScheduler
+from subnet_sweeper import SubnetSweeper
+from discovery_scope import DiscoveryScope
+import ipaddress
 
 class NetworkMonitor:
-    def __init__(self, db_manager):
+    # name: (interval, jitter, timeout, priority, first-run delay) in seconds;
+    # lower priority values are dispatched first when tasks are due together
+    SCHEDULE = {
+        'speed': (1, 0, 2, 0, 0),
+        'latency': (5, 0.5, 5, 1, 0),
+        'outage_check': (5, 0, 5, 1, 0),
+        'stats': (5, 0, 10, 2, 5),
+        'neighbor_scan': (30, 3, 60, 3, 0),
+        'top_talkers_snapshot': (3600, 0, 60, 4, 3600),
+        'dns_refresh': (3600, 60, 60, 5, 3600),
+        'retention': (3600, 60, 900, 6, 60),
+        # Only scheduled when the monitor is created with active_sweep=True
+        'subnet_sweep': (900, 30, 900, 7, 10)
+    }
+    # A status snapshot younger than this is served without rescanning
+    STATUS_MAX_AGE = 15
+    
+    def __init__(self, db_manager, sample_interval=0.25, capture_interface=None, capture_file=None, active_sweep=False,
+                 include_interfaces=None, exclude_interfaces=(), include_cidrs=None, exclude_cidrs=(),
+                 timeseries_dir=None):
         self.db_manager = db_manager
+        self.throughput_sampler = ThroughputSampler(interval=sample_interval)
+        self.prober = ReachabilityProber()
+        self.latency_monitor = LatencyMonitor(self.prober)
+        self.neighbor_table = NeighborTable()
+        self.hostname_resolver = HostnameResolver()
+        self.oui_database = OuiDatabase.load()
+        # Chunks that age out of memory spill next to the database by default
+        self.timeseries = TimeSeriesStore(spill_dir=timeseries_dir or os.path.join(
+            os.path.dirname(os.path.abspath(db_manager.db_path)), 'timeseries'
+        ))
+        self.capture_interface = capture_interface
+        self.capture_file = capture_file
+        self.packet_capture = None
+        self.capture_stats = {}
+        self.flow_table = FlowTable()
+        self.bandwidth_totals = {}
+        self.bandwidth_lock = threading.Lock()
+        self.neighbor_devices = {}
+        # Interface name patterns and CIDRs that device discovery covers
+        self.discovery_scope = DiscoveryScope(include_interfaces, exclude_interfaces, include_cidrs, exclude_cidrs)
+        self.active_sweep = active_sweep
+        self.subnet_sweeper = SubnetSweeper(self.prober)
+        # Hosts that answered the last active sweep: {ip: probe result}
+        self.swept_hosts = {}
+        # Set by stop_monitoring so long-running tasks (the sweep) end early
+        self.stop_event = threading.Event()
         self.monitoring = False
-        self.monitor_thread = None
-        self.last_network_status = True
-        self.network_down_time = None
-        
+        self.scheduler = None
+        # Latest readings, each replaced whole by the task that produces it
+        self.latest_speed = None
+        self.latest_devices = []
+        self.latest_ping_latency = None
+        self.top_talkers = TopTalkers()
+        self.presence = PresenceTracker()
+        self.state_stream = StateStream()
+        self.listeners = []
+        # (monotonic time, wall time, status), replaced as one object
+        self.status_snapshot = None
+        self.status_refresh = None
+        self.status_lock = threading.Lock()
+        self.outage_detector = OutageDetector(self.prober)
+    
     def get_network_interfaces(self):
         """Get all network interfaces with their details"""
         interfaces = {}
@@ -26,13 +101,17 @@ class NetworkMonitor:
                 'ip': None,
                 'mac': None,
                 'netmask': None,
+                'addresses': [],
                 'is_up': psutil.net_if_stats()[interface].isup
             }
             
             for addr in addrs:
                 if addr.family == socket.AF_INET:
-                    interface_info['ip'] = addr.address
-                    interface_info['netmask'] = addr.netmask
+                    # ip/netmask keep the primary address; every address is in 'addresses'
+                    if interface_info['ip'] is None:
+                        interface_info['ip'] = addr.address
+                        interface_info['netmask'] = addr.netmask
+                    interface_info['addresses'].append({'ip': addr.address, 'netmask': addr.netmask})
                 elif addr.family == psutil.AF_LINK:
                     interface_info['mac'] = addr.address
             
@@ -40,26 +119,16 @@ class NetworkMonitor:
         
         return interfaces
     
-    def get_network_speed(self):
-        """Get current network speed (upload/download)"""
+    def get_network_speed(self, seconds=1.0):
+        """Get current network speed (upload/download) from the background sampler"""
         try:
-            # Get initial stats
-            initial_stats = psutil.net_io_counters()
-            time.sleep(1)
-            final_stats = psutil.net_io_counters()
-            
-            # Calculate speed in bytes per second
-            download_speed = final_stats.bytes_recv - initial_stats.bytes_recv
-            upload_speed = final_stats.bytes_sent - initial_stats.bytes_sent
+            if not self.throughput_sampler.running:
+                self.throughput_sampler.start()
             
-            return {
-                'download_speed': max(0, download_speed),
-                'upload_speed': max(0, upload_speed),
-                'bytes_sent': final_stats.bytes_sent,
-                'bytes_recv': final_stats.bytes_recv,
-                'packets_sent': final_stats.packets_sent,
-                'packets_recv': final_stats.packets_recv
-            }
+            speed = self.throughput_sampler.get_speed(seconds)
+            if speed is None:
+                raise RuntimeError("no counter samples available")
+            return speed
         except Exception as e:
             print(f"Error getting network speed: {e}")
             return {
@@ -72,31 +141,23 @@ class NetworkMonitor:
             }
     
     def ping_test(self, host="8.8.8.8", timeout=3):
-        """Test network connectivity by pinging a host"""
+        """Test network connectivity by probing a host"""
         try:
-            param = "-n" if platform.system().lower() == "windows" else "-c"
-            command = ["ping", param, "1", "-w", str(timeout * 1000), host]
-            
-            result = subprocess.run(command, capture_output=True, text=True, timeout=timeout + 1)
-            return result.returncode == 0
+            return self.prober.is_alive(host, timeout=timeout, use_cache=False)
         except:
             return False
     
     def get_connected_devices(self):
-        """Scan network for connected devices"""
+        """Scan every in-scope interface for connected devices
+        
+        Each device is tagged with the interface and subnet it was seen on
+        and listed once, however many interfaces it shows up on. Liveness is
+        probed per interface in parallel.
+        """
         devices = []
         try:
-            # Get local network range
-            local_ip = None
-            for interface, addrs in psutil.net_if_addrs().items():
-                for addr in addrs:
-                    if addr.family == socket.AF_INET and not addr.address.startswith('127.'):
-                        local_ip = addr.address
-                        break
-                if local_ip:
-                    break
-            
-            if not local_ip:
+            subnets = self.discovery_scope.subnets(self.get_network_interfaces())
+            if not subnets:
                 return devices
             
             # Simple ARP scan for Windows
@@ -124,12 +185,15 @@ class NetworkMonitor:
                                     'mac': mac,
                                     'vendor': vendor,
                                     'hostname': hostname,
-                                    'connection_type': 'LAN',
-                                    'is_online': self.ping_test(ip, timeout=1)
+                                    'connection_type': 'LAN'
                                 })
                 except:
                     pass
             
+            # Read the kernel neighbor table directly on Linux
+            elif self.neighbor_table.is_available():
+                devices.extend(self._scan_neighbor_table())
+            
             # Fallback: use socket to detect active connections
             active_connections = psutil.net_connections()
             unique_ips = set()
@@ -139,141 +203,220 @@ class NetworkMonitor:
                     if conn.raddr:
                         unique_ips.add(conn.raddr.ip)
             
-            for ip in unique_ips:
-                if not ip.startswith('127.') and not ip.startswith('192.168.'):
-                    continue
-                    
+            # Hosts found by the active sweep that aren't in the neighbor table (yet)
+            unique_ips.update(self.swept_hosts)
+            
+            # Only peers on one of the scanned subnets are local devices
+            known_ips = {d['ip'] for d in devices}
+            peer_ips = [
+                ip for ip in unique_ips
+                if ip not in known_ips and self.discovery_scope.locate(ip, subnets)[1] is not None
+            ]
+            hostnames = self.hostname_resolver.resolve_many(peer_ips)
+            
+            for ip in peer_ips:
                 devices.append({
                     'ip': ip,
                     'mac': 'Unknown',
                     'vendor': 'Unknown',
-                    'hostname': self.get_hostname(ip),
-                    'connection_type': 'LAN',
-                    'is_online': self.ping_test(ip, timeout=1)
+                    'hostname': hostnames[ip],
+                    'connection_type': 'LAN'
                 })
-                
+            
+            devices = self.discovery_scope.merge(self.discovery_scope.tag(devices, subnets))
+            
+            # Probe each interface's hosts in its own concurrent batch, all interfaces at once
+            by_interface = {}
+            for device in devices:
+                by_interface.setdefault(device['interface'], []).append(device['ip'])
+            results = {}
+            with ThreadPoolExecutor(max_workers=max(len(by_interface), 1), thread_name_prefix='discovery') as pool:
+                batches = [pool.submit(self.prober.probe_hosts, ips, 1) for ips in by_interface.values()]
+                for batch in batches:
+                    results.update(batch.result())
+            for device in devices:
+                device['is_online'] = results[device['ip']]['alive']
+        
         except Exception as e:
             print(f"Error scanning devices: {e}")
         
         return devices
     
+    def _scan_neighbor_table(self):
+        """Apply neighbor table changes and return the current neighbor devices"""
+        changes = self.neighbor_table.scan()
+        
+        for entry in changes['removed']:
+            self.neighbor_devices.pop(entry['ip'], None)
+        
+        # Only new or changed neighbors need a vendor lookup
+        for entry in changes['added'] + changes['changed']:
+            self.neighbor_devices[entry['ip']] = {
+                'ip': entry['ip'],
+                'mac': entry['mac'],
+                'vendor': self.get_vendor_from_mac(entry['mac']),
+                'hostname': entry['ip'],
+                'connection_type': 'LAN',
+                'interface': entry['interface']
+            }
+        
+        # Hostnames are re-read for every neighbor: mostly cache hits, and a
+        # lookup that missed an earlier scan's deadline is picked up once it lands
+        hostnames = self.hostname_resolver.resolve_many(list(self.neighbor_devices))
+        for ip, device in self.neighbor_devices.items():
+            device['hostname'] = hostnames[ip]
+        
+        return [dict(device) for device in self.neighbor_devices.values()]
+    
     def get_vendor_from_mac(self, mac):
         """Get vendor information from MAC address"""
         try:
-            # Simple MAC vendor lookup (you can enhance this with a MAC vendor database)
-            mac_prefix = mac.replace(':', '').replace('-', '').upper()[:6]
-            # This is a simplified version - in production, use a proper MAC vendor database
-            vendor_map = {
-                '00:1A:79': 'Apple',
-                'B8:27:EB': 'Raspberry Pi',
-                'DC:A6:32': 'Raspberry Pi',
-                '00:0D:4B': 'Intel',
-                '00:50:56': 'VMware',
-                '08:00:27': 'VirtualBox',
-                '00:15:5D': 'Microsoft',
-                '00:25:90': 'Microsoft',
-                '00:1F:3B': 'Dell',
-                '00:1B:63': 'Dell',
-                '00:22:19': 'Hewlett-Packard',
-                '00:26:55': 'Hewlett-Packard',
-                '00:1E:65': 'Netgear',
-                '00:1F:33': 'Netgear',
-                '00:0F:B5': 'Linksys',
-                '00:14:BF': 'Linksys',
-                '00:1C:10': 'ASUS',
-                '00:22:15': 'ASUS',
-                '00:1E:58': 'TP-Link',
-                '00:25:86': 'TP-Link',
-                '00:1F:A7': 'Samsung',
-                '00:26:CB': 'Samsung',
-                '00:1B:77': 'Sony',
-                '00:26:F2': 'Sony',
-                '00:1F:5B': 'LG Electronics',
-                '00:26:9E': 'LG Electronics',
-                '00:1A:E8': 'Nintendo',
-                '00:23:CC': 'Nintendo',
-                '00:1F:AF': 'Amazon Technologies',
-                '00:26:82': 'Amazon Technologies',
-                '00:1B:EA': 'Google',
-                '00:26:BB': 'Google',
-                '00:1F:F3': 'Facebook',
-                '00:26:F3': 'Facebook',
-                '00:1A:11': 'Cisco',
-                '00:1B:D4': 'Cisco',
-                '00:1F:CA': 'Juniper Networks',
-                '00:26:99': 'Juniper Networks',
-                '00:1B:21': 'Aruba Networks',
-                '00:26:73': 'Aruba Networks',
-                '00:1F:45': 'Ubiquiti Networks',
-                '00:26:AC': 'Ubiquiti Networks',
-                '00:1A:2B': 'Ruckus Wireless',
-                '00:26:5A': 'Ruckus Wireless',
-                '00:1F:6C': 'Aerohive Networks',
-                '00:26:E8': 'Aerohive Networks',
-                '00:1B:63': 'Dell',
-                '00:26:55': 'Hewlett-Packard',
-                '00:1F:33': 'Netgear',
-                '00:14:BF': 'Linksys',
-                '00:22:15': 'ASUS',
-                '00:25:86': 'TP-Link',
-                '00:26:CB': 'Samsung',
-                '00:26:F2': 'Sony',
-                '00:26:9E': 'LG Electronics',
-                '00:23:CC': 'Nintendo',
-                '00:26:82': 'Amazon Technologies',
-                '00:26:BB': 'Google',
-                '00:26:F3': 'Facebook',
-                '00:26:99': 'Juniper Networks',
-                '00:26:73': 'Aruba Networks',
-                '00:26:AC': 'Ubiquiti Networks',
-                '00:26:5A': 'Ruckus Wireless',
-                '00:26:E8': 'Aerohive Networks'
-            }
-            
-            for prefix, vendor in vendor_map.items():
-                if mac.upper().startswith(prefix):
-                    return vendor
-            
-            return 'Unknown'
+            return self.oui_database.lookup(mac) or 'Unknown'
         except:
             return 'Unknown'
     
     def get_hostname(self, ip):
         """Get hostname for an IP address"""
         try:
-            hostname = socket.gethostbyaddr(ip)[0]
-            return hostname
+            return self.hostname_resolver.resolve(ip)
         except:
             return ip
     
     def get_bandwidth_usage_by_device(self):
-        """Get bandwidth usage per device"""
-        # This is a simplified version - in production, use packet sniffing
-        usage = {}
+        """Get bandwidth usage per device, counted by packet capture since monitoring started"""
+        with self.bandwidth_lock:
+            return {ip: dict(usage) for ip, usage in self.bandwidth_totals.items()}
+    
+    def _record_bandwidth(self):
+        """Move captured per-IP counters into bandwidth_usage and devices.total_bandwidth"""
+        if not self.packet_capture:
+            return
         
-        try:
-            # Get network connections
-            connections = psutil.net_connections()
+        ip_usage, _ = self.packet_capture.drain()
+        local_usage = {}
+        for ip, usage in ip_usage.items():
+            # Only local devices are tracked; remote peers would grow the tables unbounded
+            address = ipaddress.ip_address(ip)
+            if not (address.is_private or address.is_link_local) or address.is_loopback:
+                continue
+            local_usage[ip] = usage
             
-            for conn in connections:
-                if conn.raddr and conn.status == 'ESTABLISHED':
-                    ip = conn.raddr.ip
-                    if ip not in usage:
-                        usage[ip] = {
-                            'bytes_sent': 0,
-                            'bytes_received': 0,
-                            'packets_sent': 0,
-                            'packets_received': 0
-                        }
-                    
-                    # This is approximate - real implementation would use packet capture
-                    usage[ip]['bytes_sent'] += conn.raddr.port if conn.raddr else 0
-                    usage[ip]['bytes_received'] += conn.laddr.port if conn.laddr else 0
+            self.db_manager.add_bandwidth_usage(
+                ip,
+                usage['bytes_sent'],
+                usage['bytes_received'],
+                usage['packets_sent'],
+                usage['packets_received']
+            )
+            self.db_manager.add_device_bandwidth(ip, usage['bytes_sent'] + usage['bytes_received'])
+            
+            with self.bandwidth_lock:
+                totals = self.bandwidth_totals.setdefault(ip, {
+                    'bytes_sent': 0,
+                    'bytes_received': 0,
+                    'packets_sent': 0,
+                    'packets_received': 0
+                })
+                for key, value in usage.items():
+                    totals[key] += value
         
-        except Exception as e:
-            print(f"Error getting bandwidth usage: {e}")
+        self.top_talkers.record(local_usage)
+    
+    def _handle_outage_events(self, events):
+        """One alert pair per outage incident; flaps update it instead of adding rows"""
+        for event in events:
+            incident = event['incident']
+            data = {
+                'incident_id': incident['incident_id'],
+                'started_at': datetime.utcfromtimestamp(incident['started_at']).isoformat() + 'Z',
+                'flaps': incident['flaps'],
+                'downtime': round(incident['downtime'], 1)
+            }
+            
+            if event['event'] == 'down':
+                self.db_manager.add_alert(
+                    'network_down',
+                    'Network connectivity lost',
+                    'critical',
+                    additional_data=data,
+                    incident_id=incident['incident_id']
+                )
+            elif event['event'] == 'flap':
+                self.db_manager.update_incident_alert(
+                    incident['incident_id'],
+                    'network_down',
+                    f"Network connectivity lost (unstable, dropped {incident['flaps'] + 1} times)",
+                    additional_data=data,
+                    reopen=True
+                )
+            elif event['event'] == 'up':
+                message = f"Network connectivity restored (downtime: {incident['downtime']:.1f}s)"
+                if not incident['flaps']:
+                    self.db_manager.add_alert(
+                        'network_up',
+                        message,
+                        'info',
+                        additional_data=data,
+                        incident_id=incident['incident_id']
+                    )
+                else:
+                    self.db_manager.update_incident_alert(
+                        incident['incident_id'],
+                        'network_up',
+                        f"{message}, dropped {incident['flaps'] + 1} times",
+                        additional_data=data
+                    )
+    
+    def get_outage_status(self):
+        """Current outage detector state, open incident and per-target reachability"""
+        return self.outage_detector.get_status()
+    
+    def add_listener(self, callback):
+        """Call ``callback(message)`` with every network_data delta, e.g. to emit it over Socket.IO"""
+        self.listeners.append(callback)
+    
+    def _publish(self, status):
+        message = self.state_stream.publish(status)
+        for callback in self.listeners:
+            try:
+                callback(message)
+            except Exception as e:
+                print(f"Error publishing network data: {e}")
+    
+    def get_stream_snapshot(self):
+        """Full network_data state for a client that just connected"""
+        return self.state_stream.snapshot()
+    
+    def resync_stream(self, last_seq):
+        """Deltas (or a snapshot) for a client that missed messages after last_seq
         
-        return usage
+        The list is the acknowledgement of the client's network_resync
+        request; useNetworkStream applies it in order, like live messages.
+        """
+        return self.state_stream.resync(last_seq)
+    
+    def _update_presence(self, devices):
+        """Turn one scan into presence session starts and ends"""
+        seen = {device['ip'] for device in devices if device.get('is_online')}
+        opened, closed = self.presence.update(seen)
+        if opened:
+            self.db_manager.open_device_sessions(opened)
+        if closed:
+            self.db_manager.close_device_sessions(closed)
+    
+    def get_device_presence(self, start, end=None, device_ip=None):
+        """Online sessions overlapping start..end, e.g. when a device was on the network last week"""
+        return self.db_manager.get_device_sessions(start, end, device_ip)
+    
+    def get_top_talkers(self, window='1m', limit=None):
+        """Devices using the most bandwidth over the last 1m, 15m, 1h or 24h"""
+        return self.top_talkers.get_top_talkers(window, limit)
+    
+    def _snapshot_top_talkers(self):
+        """Persist the ranking for the hour that just ended"""
+        talkers = self.top_talkers.get_top_talkers('1h')
+        if talkers:
+            self.db_manager.add_top_talkers_snapshot('1h', talkers)
     
     def start_monitoring(self):
         """Start continuous network monitoring"""
@@ -281,83 +424,205 @@ class NetworkMonitor:
             return
         
         self.monitoring = True
-        self.monitor_thread = threading.Thread(target=self._monitor_loop)
-        self.monitor_thread.daemon = True
-        self.monitor_thread.start()
+        self.stop_event.clear()
+        self.throughput_sampler.start()
+        
+        # Sessions from a previous run can't be continued; end them where they were last seen
+        self.db_manager.close_stale_device_sessions()
+        
+        # Per-device accounting needs a live capture socket (root) or a pcap to replay.
+        # Frames are decoded in a worker process so parsing never holds this process's GIL
+        self.packet_capture = SharedMemoryCapture.create(self.capture_interface, self.capture_file, self.flow_table)
+        if self.packet_capture:
+            self.packet_capture.start()
+        
+        # Each collector runs at its own rate, so a slow scan never delays throughput samples
+        self.scheduler = self._build_scheduler()
+        self.scheduler.start()
     
     def stop_monitoring(self):
         """Stop network monitoring"""
         self.monitoring = False
-        if self.monitor_thread:
-            self.monitor_thread.join()
+        self.stop_event.set()
+        if self.scheduler:
+            self.scheduler.stop()
+            self.scheduler = None
+        self.throughput_sampler.stop()
+        
+        if self.packet_capture:
+            # Stops the worker process, drains the ring and frees the shared memory
+            self.packet_capture.stop()
+            self._record_bandwidth()
+            self.capture_stats = self.packet_capture.get_stats()
+            self.packet_capture = None
+        
+        # Devices' state is unknown once we stop looking
+        self.db_manager.close_device_sessions(self.presence.close_all())
+        
+        # Don't lose stats and alerts still waiting in the write-behind buffer
+        self.db_manager.flush_writes()
+    
+    def _sample_speed(self):
+        """1s: throughput, also fed to the in-memory store used for chart analytics"""
+        network_stats = self.get_network_speed()
+        self.latest_speed = network_stats
+        devices = self.latest_devices
+        self.timeseries.append({
+            'download_speed': network_stats['download_speed'],
+            'upload_speed': network_stats['upload_speed'],
+            'total_devices': len(devices),
+            'active_devices': sum(1 for d in devices if d['is_online']),
+            'ping_latency': self.latest_ping_latency
+        })
+    
+    def _measure_latency(self):
+        """5s: RTT, jitter and loss; a burst is capped at 2s even when every probe times out"""
+        self.latency_monitor.measure()
+        self.latest_ping_latency = self.latency_monitor.get_ping_latency()
+    
+    def _check_outage(self):
+        """5s: debounced connectivity to several targets, separate so a slow burst can't delay it"""
+        self._handle_outage_events(self.outage_detector.check())
+    
+    def _scan_devices(self):
+        """30s: device discovery, stored in one transaction, plus presence sessions"""
+        devices = self.get_connected_devices()
+        self.db_manager.upsert_devices(devices)
+        self._update_presence(devices)
+        self.latest_devices = devices
+    
+    def _write_stats(self):
+        """5s: persist the latest readings and publish them to the API and dashboards"""
+        network_stats = self.latest_speed
+        if network_stats is None:
+            return
+        devices = self.latest_devices
+        active_devices = sum(1 for d in devices if d['is_online'])
+        ping_latency = self.latest_ping_latency
+        
+        self.db_manager.add_network_stats(
+            network_stats['download_speed'],
+            network_stats['upload_speed'],
+            len(devices),
+            active_devices,
+            network_stats['bytes_sent'] + network_stats['bytes_recv'],
+            ping_latency
+        )
+        
+        # Per-device traffic counted by the capture since the last run
+        self._record_bandwidth()
+        
+        # Serve API status from these readings and push what changed to dashboards
+        status = {
+            'is_online': self.outage_detector.is_online,
+            'download_speed': network_stats['download_speed'],
+            'upload_speed': network_stats['upload_speed'],
+            'total_devices': len(devices),
+            'active_devices': active_devices,
+            'ping_latency': ping_latency,
+            'latency': self.latency_monitor.get_summary(),
+            'devices': devices
+        }
+        self._publish_status(status)
+        self._publish(status)
+    
+    def _refresh_hostnames(self):
+        """Hourly: drop cached reverse-DNS answers and re-resolve known devices"""
+        self.hostname_resolver.invalidate()
+        self.hostname_resolver.prefetch([device['ip'] for device in self.latest_devices])
+    
+    def _sweep_subnets(self):
+        """Probe every address of the local subnets; answers also populate the ARP cache"""
+        interval = self.SCHEDULE['subnet_sweep'][0]
+        subnets = self.subnet_sweeper.sweepable(self.discovery_scope.subnets(self.get_network_interfaces()))
+        self.swept_hosts = self.subnet_sweeper.sweep(subnets, deadline=interval, stop_event=self.stop_event)
+    
+    def get_sweep_stats(self):
+        """Per-subnet probed/alive counts and duration of the last active sweep"""
+        return self.subnet_sweeper.get_stats()
+    
+    def _apply_retention(self):
+        """Hourly: drop stats and per-device bandwidth buckets past their retention"""
+        self.db_manager.prune_network_stats()
+        self.db_manager.prune_bandwidth_usage()
+    
+    def _build_scheduler(self):
+        scheduler = TaskScheduler()
+        handlers = {
+            'speed': self._sample_speed,
+            'latency': self._measure_latency,
+            'outage_check': self._check_outage,
+            'stats': self._write_stats,
+            'neighbor_scan': self._scan_devices,
+            'dns_refresh': self._refresh_hostnames,
+            'retention': self._apply_retention,
+            'top_talkers_snapshot': self._snapshot_top_talkers,
+            'subnet_sweep': self._sweep_subnets
+        }
+        for name, (interval, jitter, timeout, priority, delay) in self.SCHEDULE.items():
+            if name == 'subnet_sweep' and not self.active_sweep:
+                continue
+            scheduler.add(name, handlers[name], interval, jitter, timeout, priority, delay)
+        return scheduler
+    
+    def get_scheduler_stats(self):
+        """Per-task runs, overruns, timeouts and durations"""
+        return self.scheduler.get_stats() if self.scheduler else {}
+    
+    def _publish_status(self, status):
+        # A single assignment, so readers see either the old or the new snapshot
+        self.status_snapshot = (time.monotonic(), time.time(), status)
+    
+    def get_current_status(self, max_age=None):
+        """Get current network status summary
+        
+        Served from the snapshot the monitor loop publishes every tick. If
+        it is older than ``max_age`` seconds (or there is none yet), one
+        caller rescans while concurrent callers wait for that same result.
+        ``snapshot_age`` tells the caller how old the data is, and ``stale``
+        is set when a failed refresh left only an old snapshot to serve.
+        """
+        max_age = self.STATUS_MAX_AGE if max_age is None else max_age
+        snapshot = self.status_snapshot
+        if snapshot is None or time.monotonic() - snapshot[0] > max_age:
+            snapshot = self._refresh_status(snapshot)
+        
+        published, published_at, status = snapshot
+        age = time.monotonic() - published
+        return dict(
+            status,
+            snapshot_time=datetime.utcfromtimestamp(published_at).isoformat() + 'Z',
+            snapshot_age=round(age, 3),
+            stale=age > max_age
+        )
     
-    def _monitor_loop(self):
-        """Main monitoring loop"""
-        while self.monitoring:
+    def _refresh_status(self, fallback):
+        """Single-flight rescan: the first caller collects, the others wait on its future"""
+        with self.status_lock:
+            future = self.status_refresh
+            owner = future is None
+            if owner:
+                future = self.status_refresh = Future()
+        
+        if owner:
             try:
-                # Get network stats
-                network_stats = self.get_network_speed()
-                
-                # Check network connectivity
-                is_online = self.ping_test()
-                
-                # Handle network status changes
-                if is_online != self.last_network_status:
-                    if not is_online and self.last_network_status:
-                        # Network went down
-                        self.network_down_time = datetime.now()
-                        self.db_manager.add_alert(
-                            'network_down',
-                            'Network connectivity lost',
-                            'critical'
-                        )
-                    elif is_online and not self.last_network_status:
-                        # Network came back up
-                        downtime = None
-                        if self.network_down_time:
-                            downtime = (datetime.now() - self.network_down_time).total_seconds()
-                        
-                        self.db_manager.add_alert(
-                            'network_up',
-                            f'Network connectivity restored (downtime: {downtime:.1f}s)' if downtime else 'Network connectivity restored',
-                            'info'
-                        )
-                        self.network_down_time = None
-                
-                self.last_network_status = is_online
-                
-                # Get connected devices
-                devices = self.get_connected_devices()
-                
-                # Update database
-                self.db_manager.add_network_stats(
-                    network_stats['download_speed'],
-                    network_stats['upload_speed'],
-                    len(devices),
-                    sum(1 for d in devices if d['is_online']),
-                    network_stats['bytes_sent'] + network_stats['bytes_recv'],
-                    0  # ping_latency - would need actual ping measurement
-                )
-                
-                # Update device information
-                for device in devices:
-                    self.db_manager.add_or_update_device(
-                        device['ip'],
-                        device['mac'],
-                        device['vendor'],
-                        device['hostname'],
-                        device['connection_type']
-                    )
-                
-                # Wait before next check
-                time.sleep(5)  # Check every 5 seconds
-                
+                self._publish_status(self._collect_status())
+                future.set_result(self.status_snapshot)
             except Exception as e:
-                print(f"Error in monitoring loop: {e}")
-                time.sleep(5)
+                future.set_exception(e)
+            finally:
+                with self.status_lock:
+                    self.status_refresh = None
+        
+        try:
+            return future.result()
+        except Exception as e:
+            if fallback is None:
+                raise
+            print(f"Error refreshing network status, serving last snapshot: {e}")
+            return fallback
     
-    def get_current_status(self):
-        """Get current network status summary"""
+    def _collect_status(self):
         devices = self.get_connected_devices()
         network_stats = self.get_network_speed()
         
@@ -367,5 +632,32 @@ class NetworkMonitor:
             'upload_speed': network_stats['upload_speed'],
             'total_devices': len(devices),
             'active_devices': sum(1 for d in devices if d['is_online']),
+            'ping_latency': self.latency_monitor.get_ping_latency(),
+            'latency': self.latency_monitor.get_summary(),
             'devices': devices
         }
+    
+    def get_stats_analytics(self, seconds=3600, interval=60):
+        """Throughput analytics over the recent window, served from memory"""
+        return {
+            'summary': self.timeseries.summary(seconds),
+            'download_moving_average': self.timeseries.moving_average('download_speed', seconds),
+            'upload_moving_average': self.timeseries.moving_average('upload_speed', seconds),
+            'download_rate_of_change': self.timeseries.rate_of_change('download_speed', seconds),
+            'top_download_intervals': self.timeseries.top_intervals('download_speed', seconds, interval),
+            'top_upload_intervals': self.timeseries.top_intervals('upload_speed', seconds, interval)
+        }
+    
+    def get_top_flows(self, limit=10):
+        """Largest flows currently tracked by the packet capture"""
+        return self.flow_table.top_flows(limit)
+    
+    def get_flow_exports(self):
+        """Per-flow records exported (idle, active, evicted) since the last call"""
+        return self.flow_table.drain_exports()
+    
+    def get_capture_stats(self):
+        """Packets aggregated and dropped by the capture pipeline"""
+        if self.packet_capture:
+            return self.packet_capture.get_stats()
+        return dict(self.capture_stats)
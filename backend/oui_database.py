@@ -0,0 +1,181 @@
+import bisect
+import csv
+import os
+import re
+from array import array
+
+REGISTRY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'oui')
+
+# IEEE registries: MA-L (24-bit), MA-M (28-bit) and MA-S (36-bit) assignments
+REGISTRIES = (
+    ('oui36.csv', 36, 'https://standards-oui.ieee.org/oui36/oui36.csv'),
+    ('mam.csv', 28, 'https://standards-oui.ieee.org/oui28/mam.csv'),
+    ('oui.csv', 24, 'https://standards-oui.ieee.org/oui/oui.csv'),
+)
+
+# Used when the IEEE registry files have not been downloaded
+BUILTIN_VENDORS = {
+    '001A79': 'Apple',
+    'B827EB': 'Raspberry Pi',
+    'DCA632': 'Raspberry Pi',
+    '000D4B': 'Intel',
+    '005056': 'VMware',
+    '080027': 'VirtualBox',
+    '00155D': 'Microsoft',
+    '002590': 'Microsoft',
+    '001F3B': 'Dell',
+    '001B63': 'Dell',
+    '002219': 'Hewlett-Packard',
+    '002655': 'Hewlett-Packard',
+    '001E65': 'Netgear',
+    '001F33': 'Netgear',
+    '000FB5': 'Linksys',
+    '0014BF': 'Linksys',
+    '001C10': 'ASUS',
+    '002215': 'ASUS',
+    '001E58': 'TP-Link',
+    '002586': 'TP-Link',
+    '001FA7': 'Samsung',
+    '0026CB': 'Samsung',
+    '001B77': 'Sony',
+    '0026F2': 'Sony',
+    '001F5B': 'LG Electronics',
+    '00269E': 'LG Electronics',
+    '001AE8': 'Nintendo',
+    '0023CC': 'Nintendo',
+    '001FAF': 'Amazon Technologies',
+    '002682': 'Amazon Technologies',
+    '001BEA': 'Google',
+    '0026BB': 'Google',
+    '001FF3': 'Facebook',
+    '0026F3': 'Facebook',
+    '001A11': 'Cisco',
+    '001BD4': 'Cisco',
+    '001FCA': 'Juniper Networks',
+    '002699': 'Juniper Networks',
+    '001B21': 'Aruba Networks',
+    '002673': 'Aruba Networks',
+    '001F45': 'Ubiquiti Networks',
+    '0026AC': 'Ubiquiti Networks',
+    '001A2B': 'Ruckus Wireless',
+    '00265A': 'Ruckus Wireless',
+    '001F6C': 'Aerohive Networks',
+    '0026E8': 'Aerohive Networks'
+}
+
+NON_HEX = re.compile(r'[^0-9A-Fa-f]')
+
+
+def mac_to_int(mac):
+    """Convert a MAC in any common notation to a 48-bit integer, or None"""
+    digits = NON_HEX.sub('', mac or '')
+    if len(digits) != 12:
+        return None
+    return int(digits, 16)
+
+
+class PrefixIndex:
+    """Sorted prefix values of one length with parallel vendor ids"""
+
+    def __init__(self, bits):
+        self.bits = bits
+        self.prefixes = array('Q')
+        self.vendor_ids = array('I')
+
+    def build(self, entries):
+        entries.sort()
+        self.prefixes = array('Q', (prefix for prefix, _ in entries))
+        self.vendor_ids = array('I', (vendor_id for _, vendor_id in entries))
+
+    def find(self, mac_value):
+        prefix = mac_value >> (48 - self.bits)
+        index = bisect.bisect_left(self.prefixes, prefix)
+        if index < len(self.prefixes) and self.prefixes[index] == prefix:
+            return self.vendor_ids[index]
+        return None
+
+    def __len__(self):
+        return len(self.prefixes)
+
+
+class OuiDatabase:
+    """Longest-prefix MAC vendor lookup over the IEEE MA-L/MA-M/MA-S registries
+
+    The index is built once: each assignment size gets a sorted array of
+    prefixes, and a lookup is one binary search per size, longest first.
+    """
+
+    def __init__(self):
+        self.vendors = []
+        self.vendor_ids = {}
+        self.indexes = [PrefixIndex(bits) for _, bits, _ in REGISTRIES]
+
+    @classmethod
+    def load(cls, registry_dir=REGISTRY_DIR):
+        """Build the index from the registry CSVs, falling back to the built-in table"""
+        database = cls()
+        entries = {bits: [] for _, bits, _ in REGISTRIES}
+
+        for filename, bits, _ in REGISTRIES:
+            path = os.path.join(registry_dir, filename)
+            if not os.path.exists(path):
+                continue
+            try:
+                for assignment, vendor in database._read_registry(path):
+                    if len(assignment) * 4 == bits:
+                        entries[bits].append((int(assignment, 16), database._vendor_id(vendor)))
+            except Exception as e:
+                print(f"Error loading OUI registry {path}: {e}")
+
+        if not any(entries.values()):
+            for assignment, vendor in BUILTIN_VENDORS.items():
+                entries[24].append((int(assignment, 16), database._vendor_id(vendor)))
+
+        for index in database.indexes:
+            index.build(entries[index.bits])
+
+        return database
+
+    def _read_registry(self, path):
+        with open(path, newline='', encoding='utf-8', errors='replace') as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            for row in reader:
+                if len(row) >= 3:
+                    yield row[1].strip().upper(), row[2].strip()
+
+    def _vendor_id(self, vendor):
+        vendor_id = self.vendor_ids.get(vendor)
+        if vendor_id is None:
+            vendor_id = self.vendor_ids[vendor] = len(self.vendors)
+            self.vendors.append(vendor)
+        return vendor_id
+
+    def lookup(self, mac):
+        """Return the vendor for ``mac`` or None"""
+        mac_value = mac_to_int(mac)
+        if mac_value is None:
+            return None
+
+        for index in self.indexes:
+            vendor_id = index.find(mac_value)
+            if vendor_id is not None:
+                return self.vendors[vendor_id]
+        return None
+
+    def __len__(self):
+        return sum(len(index) for index in self.indexes)
+
+
+def update_registries(registry_dir=REGISTRY_DIR):
+    """Download the current IEEE registry CSVs into ``registry_dir``"""
+    import requests
+
+    os.makedirs(registry_dir, exist_ok=True)
+    for filename, _, url in REGISTRIES:
+        response = requests.get(url, timeout=60)
+        response.raise_for_status()
+        path = os.path.join(registry_dir, filename)
+        with open(path + '.tmp', 'wb') as f:
+            f.write(response.content)
+        os.replace(path + '.tmp', path)
@@ -0,0 +1,124 @@
+import threading
+import time
+
+UP, SUSPECT_DOWN, DOWN, SUSPECT_UP = 'up', 'suspect_down', 'down', 'suspect_up'
+
+
+class OutageDetector:
+    """Debounced internet outage detection over several targets
+
+    Each check probes all targets in parallel; the link counts as reachable
+    when at least ``quorum`` of them answer (a majority by default), so one
+    unreachable resolver is not an outage. State changes are held back:
+    the link must be unreachable for ``down_hold`` seconds before it is
+    declared down, and reachable for ``up_hold`` seconds before it is
+    declared up again.
+
+    A drop that starts within ``flap_window`` seconds of the last recovery
+    belongs to the same incident: it bumps the incident's flap count instead
+    of opening a new one, so an unstable link produces one incident rather
+    than an alert every few seconds.
+    """
+
+    def __init__(self, prober, targets=('8.8.8.8', '1.1.1.1', '9.9.9.9'), quorum=None,
+                 down_hold=15, up_hold=10, flap_window=300, timeout=1.0):
+        self.prober = prober
+        self.targets = tuple(targets)
+        self.quorum = quorum or len(self.targets) // 2 + 1
+        self.down_hold = down_hold
+        self.up_hold = up_hold
+        self.flap_window = flap_window
+        self.timeout = timeout
+        self.state = UP
+        self.state_since = time.time()
+        # Where a suspected change started from, to return to if it doesn't hold
+        self.stable_since = self.state_since
+        self.incident = None
+        self.last_results = {}
+        self.lock = threading.Lock()
+
+    @property
+    def is_online(self):
+        # Suspected outages still count as online until the hold time passes
+        return self.state in (UP, SUSPECT_DOWN)
+
+    def check(self, now=None):
+        """Probe the targets once and advance the state machine; returns events"""
+        results = self.prober.ping_hosts(self.targets, timeout=self.timeout)
+        reachable = sum(1 for result in results.values() if result['alive'])
+        self.last_results = results
+        return self.observe(reachable >= self.quorum, now)
+
+    def observe(self, reachable, now=None):
+        """Advance the state machine with one observation
+
+        Returns a list of events, each {'event': 'down' | 'flap' | 'up',
+        'incident': {...}}. 'down' opens an incident, 'flap' means an open
+        incident went down again, and 'up' reports a recovery.
+        """
+        now = time.time() if now is None else now
+        events = []
+        with self.lock:
+            # An incident that stayed recovered for the whole flap window is over
+            incident = self.incident
+            if incident and self.state == UP and now - incident['recovered_at'] >= self.flap_window:
+                self.incident = None
+
+            if self.state == UP and not reachable:
+                self.stable_since = self.state_since
+                self._set_state(SUSPECT_DOWN, now)
+            elif self.state == SUSPECT_DOWN:
+                if reachable:
+                    self._set_state(UP, self.stable_since)
+                elif now - self.state_since >= self.down_hold:
+                    events.append(self._went_down(self.state_since))
+                    self._set_state(DOWN, self.state_since)
+            elif self.state == DOWN and reachable:
+                self.stable_since = self.state_since
+                self._set_state(SUSPECT_UP, now)
+            elif self.state == SUSPECT_UP:
+                if not reachable:
+                    self._set_state(DOWN, self.stable_since)
+                elif now - self.state_since >= self.up_hold:
+                    events.append(self._came_up(self.state_since))
+                    self._set_state(UP, self.state_since)
+        return events
+
+    def _set_state(self, state, since):
+        self.state = state
+        self.state_since = since
+
+    def _went_down(self, since):
+        if self.incident is None:
+            self.incident = {
+                'incident_id': f'outage-{int(since)}',
+                'started_at': since,
+                'down_since': since,
+                'recovered_at': None,
+                'flaps': 0,
+                'downtime': 0.0
+            }
+            event = 'down'
+        else:
+            self.incident['flaps'] += 1
+            self.incident['down_since'] = since
+            event = 'flap'
+        return {'event': event, 'incident': dict(self.incident)}
+
+    def _came_up(self, since):
+        incident = self.incident
+        incident['downtime'] += since - incident['down_since']
+        incident['recovered_at'] = since
+        return {'event': 'up', 'incident': dict(incident)}
+
+    def get_status(self):
+        with self.lock:
+            return {
+                'state': self.state,
+                'since': self.state_since,
+                'is_online': self.is_online,
+                'incident': dict(self.incident) if self.incident else None,
+                'targets': {
+                    host: result['alive'] for host, result in self.last_results.items()
+                }
+            }
@@ -0,0 +1,305 @@
+import ipaddress
+import socket
+import struct
+import threading
+import time
+from flow_table import flow_key
+
+ETH_P_ALL = 0x0003
+ETHERTYPE_IPV4 = 0x0800
+ETHERTYPE_IPV6 = 0x86DD
+ETHERTYPE_VLAN = (0x8100, 0x88A8)
+
+# Protocols whose first four payload bytes are source and destination ports
+PORT_PROTOCOLS = (6, 17, 132)
+
+LINKTYPE_ETHERNET = 1
+
+PCAP_MAGIC = {
+    b'\xd4\xc3\xb2\xa1': ('<', 1e-6),
+    b'\xa1\xb2\xc3\xd4': ('>', 1e-6),
+    b'\x4d\x3c\xb2\xa1': ('<', 1e-9),
+    b'\xa1\xb2\x3c\x4d': ('>', 1e-9),
+}
+
+# Counter slots: [bytes_sent, bytes_received, packets_sent, packets_received]
+BYTES_SENT, BYTES_RECEIVED, PACKETS_SENT, PACKETS_RECEIVED = range(4)
+
+
+UNPACK_ETHERTYPE = struct.Struct('!H').unpack_from
+UNPACK_PORTS = struct.Struct('!HH').unpack_from
+
+
+def format_mac(raw):
+    return ':'.join(f'{b:02X}' for b in raw)
+
+
+def decode_frame(frame):
+    """Header fields of an Ethernet frame, or None if it is too short
+
+    Returns (src port, dst port, protocol, IP version, src MAC, dst MAC,
+    src IP, dst IP), the field order of a packet record after its timestamp
+    and length. For non-IP frames the version, protocol and ports are 0 and
+    the addresses empty; ports are 0 unless the protocol carries them.
+    """
+    if len(frame) < 14:
+        return None
+    ethertype = UNPACK_ETHERTYPE(frame, 12)[0]
+    offset = 14
+    while ethertype in ETHERTYPE_VLAN and len(frame) >= offset + 4:
+        ethertype = UNPACK_ETHERTYPE(frame, offset + 2)[0]
+        offset += 4
+
+    version = protocol = src_port = dst_port = 0
+    src_ip = dst_ip = b''
+    if ethertype == ETHERTYPE_IPV4 and len(frame) >= offset + 20:
+        version = 4
+        src_ip = bytes(frame[offset + 12:offset + 16])
+        dst_ip = bytes(frame[offset + 16:offset + 20])
+        protocol = frame[offset + 9]
+        offset += (frame[offset] & 0x0F) * 4
+    elif ethertype == ETHERTYPE_IPV6 and len(frame) >= offset + 40:
+        version = 6
+        src_ip = bytes(frame[offset + 8:offset + 24])
+        dst_ip = bytes(frame[offset + 24:offset + 40])
+        protocol = frame[offset + 6]
+        offset += 40
+    if protocol in PORT_PROTOCOLS and len(frame) >= offset + 4:
+        src_port, dst_port = UNPACK_PORTS(frame, offset)
+    return src_port, dst_port, protocol, version, bytes(frame[6:12]), bytes(frame[0:6]), src_ip, dst_ip
+
+
+def count_packets(records, ip_counters, mac_counters, update_flow=None):
+    """Add packet records to per-IP/per-MAC counters and, optionally, a flow table
+
+    ``records`` are (timestamp, length) followed by the ``decode_frame``
+    fields; IPv4 addresses may be zero-padded to 16 bytes, as they are in
+    the shared-memory ring. Returns (packets, timestamp of the last one).
+    """
+    packets = 0
+    timestamp = None
+    for timestamp, length, src_port, dst_port, protocol, version, src_mac, dst_mac, src_ip, dst_ip in records:
+        packets += 1
+        counters = mac_counters.get(src_mac)
+        if counters is None:
+            counters = mac_counters[src_mac] = [0, 0, 0, 0]
+        counters[BYTES_SENT] += length
+        counters[PACKETS_SENT] += 1
+        counters = mac_counters.get(dst_mac)
+        if counters is None:
+            counters = mac_counters[dst_mac] = [0, 0, 0, 0]
+        counters[BYTES_RECEIVED] += length
+        counters[PACKETS_RECEIVED] += 1
+
+        if not version:
+            continue
+        if version == 4:
+            src_ip = src_ip[:4]
+            dst_ip = dst_ip[:4]
+        if update_flow:
+            update_flow(flow_key(src_ip, dst_ip, src_port, dst_port, protocol), src_ip, dst_ip, length, timestamp)
+        counters = ip_counters.get(src_ip)
+        if counters is None:
+            counters = ip_counters[src_ip] = [0, 0, 0, 0]
+        counters[BYTES_SENT] += length
+        counters[PACKETS_SENT] += 1
+        counters = ip_counters.get(dst_ip)
+        if counters is None:
+            counters = ip_counters[dst_ip] = [0, 0, 0, 0]
+        counters[BYTES_RECEIVED] += length
+        counters[PACKETS_RECEIVED] += 1
+    return packets, timestamp
+
+
+class PcapFileSource:
+    """Replays an Ethernet pcap file as (timestamp, wire_length, frame) tuples"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def packets(self):
+        with open(self.path, 'rb') as f:
+            header = f.read(24)
+            if len(header) < 24 or header[:4] not in PCAP_MAGIC:
+                raise ValueError(f"{self.path} is not a pcap file")
+            endian, resolution = PCAP_MAGIC[header[:4]]
+            linktype = struct.unpack(endian + 'I', header[20:24])[0]
+            if linktype != LINKTYPE_ETHERNET:
+                raise ValueError(f"Unsupported pcap link type {linktype}")
+
+            record = struct.Struct(endian + 'IIII')
+            data = f.read()
+
+        view = memoryview(data)
+        offset = 0
+        end = len(data)
+        while offset + 16 <= end:
+            seconds, fraction, captured, wire_length = record.unpack_from(data, offset)
+            offset += 16
+            yield seconds + fraction * resolution, wire_length, view[offset:offset + captured]
+            offset += captured
+
+    def close(self):
+        pass
+
+
+class AfPacketSource:
+    """Reads frames from a Linux AF_PACKET socket (requires CAP_NET_RAW)"""
+
+    def __init__(self, interface=None, buffer_size=4 * 1024 * 1024, timeout=0.5):
+        self.sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(ETH_P_ALL))
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, buffer_size)
+        self.sock.settimeout(timeout)
+        self.timeout = timeout
+        if interface:
+            self.sock.bind((interface, 0))
+        self.closed = False
+
+    def packets(self):
+        buffer = bytearray(65536)
+        view = memoryview(buffer)
+        recv_into = self.sock.recv_into
+        while not self.closed:
+            try:
+                length = recv_into(buffer)
+            except socket.timeout:
+                # Lets the capture loop notice a stop request
+                yield None, 0, None
+                continue
+            except OSError:
+                if self.closed:
+                    return
+                raise
+            yield time.time(), length, view[:length]
+
+    def close(self):
+        self.closed = True
+        self.sock.close()
+
+
+class PacketCapture:
+    """Per-IP and per-MAC byte and packet counters from captured Ethernet frames
+
+    Only the Ethernet, VLAN and IP address fields are decoded. Addresses are
+    kept as raw bytes on the hot path and only formatted when the counters
+    are drained. With a ``flow_table`` the protocol and ports are decoded as
+    well and every packet is also counted against its flow.
+    """
+
+    def __init__(self, source, flow_table=None):
+        self.source = source
+        self.flow_table = flow_table
+        self.ip_counters = {}
+        self.mac_counters = {}
+        self.packets_seen = 0
+        self.lock = threading.Lock()
+        self.running = False
+        self.capture_thread = None
+
+    @classmethod
+    def create(cls, interface=None, pcap_path=None, flow_table=None):
+        """Build a capture from a pcap file or a live interface, or None if unavailable"""
+        try:
+            if pcap_path:
+                return cls(PcapFileSource(pcap_path), flow_table)
+            if hasattr(socket, 'AF_PACKET'):
+                return cls(AfPacketSource(interface), flow_table)
+        except (OSError, PermissionError) as e:
+            print(f"Packet capture unavailable: {e}")
+        return None
+
+    def start(self):
+        """Start capturing on a background thread"""
+        if self.running:
+            return
+
+        self.running = True
+        self.capture_thread = threading.Thread(target=self._capture_loop)
+        self.capture_thread.daemon = True
+        self.capture_thread.start()
+
+    def stop(self):
+        """Stop capturing and release the source"""
+        self.running = False
+        self.source.close()
+        if self.capture_thread:
+            self.capture_thread.join()
+            self.capture_thread = None
+        if self.flow_table:
+            self.flow_table.expire_all()
+
+    def _capture_loop(self):
+        try:
+            self.run()
+        except Exception as e:
+            print(f"Error in packet capture: {e}")
+        finally:
+            self.running = False
+
+    def run(self, batch_size=1024):
+        """Consume the source until it ends or the capture is stopped"""
+        flow_table = self.flow_table
+        update_flow = flow_table.update if flow_table else None
+        records = []
+
+        for timestamp, length, frame in self.source.packets():
+            if frame is not None:
+                decoded = decode_frame(frame)
+                if decoded is not None:
+                    records.append((timestamp, length) + decoded)
+
+            # Publish in batches so the shared lock isn't taken per packet
+            if len(records) >= batch_size or (frame is None and records):
+                self._count(records, update_flow)
+                records = []
+            elif frame is None and flow_table:
+                # Idle link: idle flows still need to time out
+                flow_table.expire(time.time())
+
+            if not self.running and frame is None:
+                break
+
+        if records:
+            self._count(records, update_flow)
+
+    def _count(self, records, update_flow):
+        ip_counters = {}
+        mac_counters = {}
+        packets, timestamp = count_packets(records, ip_counters, mac_counters, update_flow)
+        self._merge(ip_counters, mac_counters, packets)
+        if self.flow_table and timestamp is not None:
+            self.flow_table.expire(timestamp)
+        return packets
+
+    def _merge(self, ip_counters, mac_counters, packets):
+        with self.lock:
+            for target, source in ((self.ip_counters, ip_counters), (self.mac_counters, mac_counters)):
+                for key, values in source.items():
+                    counters = target.get(key)
+                    if counters is None:
+                        target[key] = values
+                    else:
+                        counters[0] += values[0]
+                        counters[1] += values[1]
+                        counters[2] += values[2]
+                        counters[3] += values[3]
+            self.packets_seen += packets
+
+    def drain(self):
+        """Return and reset the counters as ({ip: usage}, {mac: usage})"""
+        with self.lock:
+            ip_counters, self.ip_counters = self.ip_counters, {}
+            mac_counters, self.mac_counters = self.mac_counters, {}
+
+        return (
+            {str(ipaddress.ip_address(ip)): self._usage(values) for ip, values in ip_counters.items()},
+            {format_mac(mac): self._usage(values) for mac, values in mac_counters.items()}
+        )
+
+    def _usage(self, values):
+        return {
+            'bytes_sent': values[BYTES_SENT],
+            'bytes_received': values[BYTES_RECEIVED],
+            'packets_sent': values[PACKETS_SENT],
+            'packets_received': values[PACKETS_RECEIVED]
+        }
@@ -0,0 +1,94 @@
+import threading
+import time
+
+
+class PresenceTracker:
+    """Online/offline state per device with hysteresis, from successive scans
+
+    A device comes online after ``online_after_hits`` consecutive scans that
+    see it, and goes offline only after it has been missed by
+    ``offline_after_misses`` consecutive scans *and* has not been seen for
+    ``offline_after_seconds``. A single lost probe therefore never splits a
+    session. Each transition is reported once, as the start or end of a
+    session: a session starts at the first sighting of the streak and ends
+    at the last sighting before the device disappeared.
+    """
+
+    def __init__(self, online_after_hits=1, offline_after_misses=3, offline_after_seconds=90):
+        self.online_after_hits = online_after_hits
+        self.offline_after_misses = offline_after_misses
+        self.offline_after_seconds = offline_after_seconds
+        self.devices = {}
+        self.lock = threading.Lock()
+
+    def update(self, seen, timestamp=None):
+        """Apply one scan; returns (sessions opened, sessions closed)
+
+        ``seen`` is the set of device IPs that answered in this scan. Opened
+        sessions are {'device_ip', 'online_from'} and closed sessions also
+        carry 'online_to'; times are epoch seconds.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        opened = []
+        closed = []
+        with self.lock:
+            for ip in seen:
+                state = self.devices.get(ip)
+                if state is None:
+                    state = self.devices[ip] = {
+                        'online': False,
+                        'hits': 0,
+                        'misses': 0,
+                        'streak_start': timestamp,
+                        'last_seen': timestamp
+                    }
+                if not state['online'] and not state['hits']:
+                    state['streak_start'] = timestamp
+                state['hits'] += 1
+                state['misses'] = 0
+                state['last_seen'] = timestamp
+                if not state['online'] and state['hits'] >= self.online_after_hits:
+                    state['online'] = True
+                    opened.append({'device_ip': ip, 'online_from': state['streak_start']})
+
+            for ip, state in list(self.devices.items()):
+                if ip in seen:
+                    continue
+                state['hits'] = 0
+                state['misses'] += 1
+                if state['misses'] < self.offline_after_misses or timestamp - state['last_seen'] < self.offline_after_seconds:
+                    continue
+                if state['online']:
+                    closed.append({
+                        'device_ip': ip,
+                        'online_from': state['streak_start'],
+                        'online_to': state['last_seen']
+                    })
+                # Offline devices are forgotten until they show up again
+                del self.devices[ip]
+
+        return opened, closed
+
+    def close_all(self):
+        """End every open session at its last sighting, e.g. when monitoring stops"""
+        with self.lock:
+            closed = [
+                {
+                    'device_ip': ip,
+                    'online_from': state['streak_start'],
+                    'online_to': state['last_seen']
+                }
+                for ip, state in self.devices.items()
+                if state['online']
+            ]
+            self.devices = {}
+        return closed
+
+    def is_online(self, ip):
+        state = self.devices.get(ip)
+        return bool(state and state['online'])
+
+    def get_online_devices(self):
+        """{ip: online since (epoch seconds)} for devices currently online"""
+        with self.lock:
+            return {ip: state['streak_start'] for ip, state in self.devices.items() if state['online']}
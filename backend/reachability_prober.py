@@ -0,0 +1,387 @@
+import asyncio
+import ipaddress
+import os
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+import socket
+import struct
+import threading
+import time
+from collections import deque
+
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+
+# Ports that a live host commonly answers on, either with a completed
+# handshake or an immediate RST. Both prove the host is up.
+DEFAULT_TCP_PORTS = (80, 443, 22, 445, 139, 53)
+
+# Share of the process's descriptor limit that probes may hold at once;
+# the rest is left to the API server, SQLite and capture
+SOCKET_SHARE = 0.25
+MAX_SOCKETS = 1024
+
+
+def socket_budget(share=SOCKET_SHARE, cap=MAX_SOCKETS):
+    """Sockets probes may have open at once, derived from RLIMIT_NOFILE"""
+    if resource is None:
+        return cap
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft == resource.RLIM_INFINITY:
+        return cap
+    return max(1, min(cap, int(soft * share)))
+
+
+def icmp_checksum(data):
+    """Internet checksum (RFC 1071) over ``data``"""
+    if len(data) % 2:
+        data += b'\x00'
+    total = sum(struct.unpack(f'!{len(data) // 2}H', data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def build_echo_request(identifier, sequence, payload=b'netsentinel'):
+    """Build an ICMP echo request packet"""
+    header = struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, 0, identifier, sequence)
+    checksum = icmp_checksum(header + payload)
+    header = struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, checksum, identifier, sequence)
+    return header + payload
+
+
+class ProbeSlots:
+    """Counting semaphore shared by coroutines on any number of event loops
+
+    A waiter parks on a future of its own loop and is woken with
+    ``call_soon_threadsafe`` when a slot is handed to it, so waiting costs
+    nothing. Slots are handed out in arrival order.
+    """
+
+    def __init__(self, value):
+        self.value = value
+        self.waiters = deque()
+        self.lock = threading.Lock()
+
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            if self.value and not self.waiters:
+                self.value -= 1
+                return
+            future = loop.create_future()
+            self.waiters.append((loop, future))
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self.lock:
+                try:
+                    self.waiters.remove((loop, future))
+                    handed = False
+                except ValueError:
+                    handed = True
+            # The slot was already handed over; pass it on
+            if handed and future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        with self.lock:
+            if not self.waiters:
+                self.value += 1
+                return
+            loop, future = self.waiters.popleft()
+        loop.call_soon_threadsafe(self._hand_over, future)
+
+    def _hand_over(self, future):
+        if future.done():
+            # Cancelled while the hand-over was scheduled
+            self.release()
+        else:
+            future.set_result(None)
+
+
+class ReachabilityProber:
+    """Concurrent liveness checks for whole host sets using asyncio
+
+    ICMP echo is used when the process can open an ICMP socket (raw socket as
+    root, or an unprivileged Linux ping socket); otherwise hosts are probed
+    with TCP connects, where a refused connection still counts as alive.
+
+    A probe holds one socket per TCP port plus one for ICMP, so the number
+    of hosts probed at once is derived from a socket budget (a share of
+    RLIMIT_NOFILE by default). The limit is shared by every caller in the
+    process, and a host's timeout only starts once it has its slot, so a
+    long queue never turns live hosts into timeouts.
+    """
+
+    def __init__(self, concurrency=256, timeout=1.0, cache_ttl=30, tcp_ports=DEFAULT_TCP_PORTS, max_sockets=None):
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self.tcp_ports = tuple(tcp_ports)
+        self.cache = {}
+        self.cache_lock = threading.Lock()
+        self.icmp_socket_type = self._detect_icmp_socket_type()
+        self.max_sockets = max_sockets or socket_budget()
+        sockets_per_host = len(self.tcp_ports) + (1 if self.icmp_available else 0)
+        self.concurrency = max(1, min(concurrency, self.max_sockets // sockets_per_host))
+        # Shared by probes from every event loop (tasks, sweeps) in the process
+        self.slots = ProbeSlots(self.concurrency)
+        self._sequence = 0
+        self._sequence_lock = threading.Lock()
+
+    def _detect_icmp_socket_type(self):
+        for sock_type in (socket.SOCK_DGRAM, socket.SOCK_RAW):
+            try:
+                sock = socket.socket(socket.AF_INET, sock_type, socket.IPPROTO_ICMP)
+                sock.close()
+                return sock_type
+            except (OSError, PermissionError):
+                continue
+        return None
+
+    @property
+    def icmp_available(self):
+        return self.icmp_socket_type is not None
+
+    def _next_sequence(self):
+        with self._sequence_lock:
+            self._sequence = (self._sequence + 1) & 0xFFFF
+            return self._sequence
+
+    # Cache
+    def get_cached(self, host):
+        """Return an unexpired cached result for ``host`` or None"""
+        with self.cache_lock:
+            entry = self.cache.get(host)
+            if entry and entry[0] > time.monotonic():
+                return entry[1]
+            return None
+
+    def _store(self, result):
+        with self.cache_lock:
+            self.cache[result['host']] = (time.monotonic() + self.cache_ttl, result)
+
+    def purge_cache(self):
+        """Drop expired cache entries"""
+        now = time.monotonic()
+        with self.cache_lock:
+            for host in [h for h, entry in self.cache.items() if entry[0] <= now]:
+                del self.cache[host]
+
+    # Public API
+    def probe_hosts(self, hosts, timeout=None, use_cache=True):
+        """Probe every host concurrently and return {host: result}
+
+        The whole set completes in roughly one ``timeout`` window as long as
+        it fits within the concurrency limit.
+        """
+        timeout = timeout or self.timeout
+        results = {}
+        pending = []
+
+        for host in dict.fromkeys(hosts):
+            cached = self.get_cached(host) if use_cache else None
+            if cached is not None:
+                results[host] = cached
+            else:
+                pending.append(host)
+
+        if pending:
+            probed = asyncio.run(self.probe_many(pending, timeout))
+            for result in probed:
+                self._store(result)
+                results[result['host']] = result
+
+        return results
+
+    def ping_hosts(self, hosts, timeout=None, port=53):
+        """``ping`` every host concurrently and return {host: result}, uncached"""
+        timeout = timeout or self.timeout
+
+        async def ping_all():
+            return await asyncio.gather(*(self.ping(host, timeout, port) for host in hosts))
+
+        return {result['host']: result for result in asyncio.run(ping_all())}
+
+    def is_alive(self, host, timeout=None, use_cache=True):
+        """Probe a single host and return whether it responded"""
+        return self.probe_hosts([host], timeout, use_cache)[host]['alive']
+
+    async def probe_many(self, hosts, timeout=None):
+        """Coroutine form of ``probe_hosts`` without the cache
+
+        A fixed pool of ``concurrency`` workers pulls hosts from the list, so
+        a large host set never turns into one waiting coroutine per host.
+        """
+        timeout = timeout or self.timeout
+        hosts = list(hosts)
+        results = [None] * len(hosts)
+        queue = iter(enumerate(hosts))
+
+        async def worker():
+            for index, host in queue:
+                results[index] = await self.probe(host, timeout)
+
+        await asyncio.gather(*(worker() for _ in range(min(self.concurrency, len(hosts)))))
+        return results
+
+    async def probe(self, host, timeout=None):
+        """Probe one host within a hard per-host deadline, once a probe slot is free"""
+        timeout = timeout or self.timeout
+        result = {'host': host, 'alive': False, 'rtt': None, 'method': None}
+
+        await self.slots.acquire()
+        try:
+            rtt, method = await asyncio.wait_for(self._probe(host, timeout), timeout)
+            if rtt is not None:
+                result.update(alive=True, rtt=rtt, method=method)
+        except asyncio.TimeoutError:
+            pass
+        except Exception as e:
+            print(f"Error probing {host}: {e}")
+        finally:
+            self.slots.release()
+
+        return result
+
+    async def ping(self, host, timeout=None, port=53):
+        """One RTT sample for an internet target: ICMP echo if available, else one TCP port
+
+        Unlike ``probe`` nothing races, so samples in a series share a method
+        and a remote host only ever sees echo requests or one well-known port.
+        """
+        timeout = timeout or self.timeout
+        result = {'host': host, 'alive': False, 'rtt': None, 'method': None}
+
+        await self.slots.acquire()
+        try:
+            if self.icmp_available and self._is_ipv4(host):
+                method, sample = 'icmp', self._safe_icmp_echo(host, timeout)
+            else:
+                method, sample = 'tcp', self._tcp_connect(host, port, timeout)
+            rtt = await asyncio.wait_for(sample, timeout)
+            if rtt is not None:
+                result.update(alive=True, rtt=rtt, method=method)
+        except asyncio.TimeoutError:
+            pass
+        except Exception as e:
+            print(f"Error pinging {host}: {e}")
+        finally:
+            self.slots.release()
+
+        return result
+
+    async def _probe(self, host, timeout):
+        # ICMP and TCP race each other so hosts that filter one still answer
+        # within the same window.
+        methods = {asyncio.ensure_future(self.tcp_probe(host, timeout)): 'tcp'}
+        if self.icmp_available and self._is_ipv4(host):
+            methods[asyncio.ensure_future(self._safe_icmp_echo(host, timeout))] = 'icmp'
+
+        pending = set(methods)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    rtt = task.result()
+                    if rtt is not None:
+                        return rtt, methods[task]
+            return None, None
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _safe_icmp_echo(self, host, timeout):
+        try:
+            return await self.icmp_echo(host, timeout)
+        except OSError:
+            return None
+
+    def _is_ipv4(self, host):
+        try:
+            return ipaddress.ip_address(host).version == 4
+        except ValueError:
+            return False
+
+    async def icmp_echo(self, host, timeout=None):
+        """Send one ICMP echo request and return the RTT in seconds, or None"""
+        timeout = timeout or self.timeout
+        loop = asyncio.get_running_loop()
+        sock = socket.socket(socket.AF_INET, self.icmp_socket_type, socket.IPPROTO_ICMP)
+        sock.setblocking(False)
+
+        try:
+            sock.connect((host, 0))
+            identifier = os.getpid() & 0xFFFF
+            sequence = self._next_sequence()
+            packet = build_echo_request(identifier, sequence)
+
+            started = time.perf_counter()
+            await loop.sock_sendall(sock, packet)
+
+            deadline = started + timeout
+            while True:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    return None
+                data = await asyncio.wait_for(loop.sock_recv(sock, 2048), remaining)
+                if self._is_echo_reply(data, identifier, sequence):
+                    return time.perf_counter() - started
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            sock.close()
+
+    def _is_echo_reply(self, data, identifier, sequence):
+        if self.icmp_socket_type == socket.SOCK_RAW:
+            # Raw sockets deliver the IP header as well
+            header_length = (data[0] & 0x0F) * 4
+            data = data[header_length:]
+        if len(data) < 8:
+            return False
+
+        icmp_type, _, _, reply_id, reply_sequence = struct.unpack('!BBHHH', data[:8])
+        if icmp_type != ICMP_ECHO_REPLY or reply_sequence != sequence:
+            return False
+        # Unprivileged ping sockets rewrite the identifier to the socket's port
+        return self.icmp_socket_type == socket.SOCK_DGRAM or reply_id == identifier
+
+    async def tcp_probe(self, host, timeout=None):
+        """Try all probe ports at once and return the first RTT, or None"""
+        timeout = timeout or self.timeout
+        tasks = [asyncio.ensure_future(self._tcp_connect(host, port, timeout)) for port in self.tcp_ports]
+
+        try:
+            for finished in asyncio.as_completed(tasks):
+                rtt = await finished
+                if rtt is not None:
+                    return rtt
+            return None
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _tcp_connect(self, host, port, timeout):
+        loop = asyncio.get_running_loop()
+        try:
+            family = socket.AF_INET6 if ':' in host else socket.AF_INET
+            sock = socket.socket(family, socket.SOCK_STREAM)
+        except OSError:
+            return None
+        sock.setblocking(False)
+
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(loop.sock_connect(sock, (host, port)), timeout)
+            return time.perf_counter() - started
+        except ConnectionRefusedError:
+            # The host answered with a RST, so it is up
+            return time.perf_counter() - started
+        except (OSError, asyncio.TimeoutError):
+            return None
+        finally:
+            sock.close()
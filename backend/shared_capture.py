@@ -0,0 +1,259 @@
+import itertools
+import multiprocessing
+import struct
+import time
+from multiprocessing import shared_memory
+
+from packet_capture import AfPacketSource, PacketCapture, decode_frame
+
+# Ring header: 64-bit counters, each written by only one side
+#   write_seq, produced, ring_dropped, kernel_dropped: worker
+#   read_seq: aggregator
+# They are accessed through a memoryview cast to 'Q', which stores each one
+# with a single aligned write. struct.pack_into would not do: it zeroes the
+# target before packing, so the other process can observe a counter at 0.
+HEADER_SIZE = 64
+WRITE_SEQ, READ_SEQ, PRODUCED, RING_DROPPED, KERNEL_DROPPED = range(5)
+
+# Packet summary: timestamp, wire length, ports, protocol, IP version, MACs,
+# addresses (IPv4 in the first 4 bytes), padded to 64 bytes
+RECORD = struct.Struct('<dIHHBB6s6s16s16s2x')
+
+# Linux SOL_PACKET / PACKET_STATISTICS, not exported by the socket module
+SOL_PACKET = 263
+PACKET_STATISTICS = 6
+TPACKET_STATS = struct.Struct('II')
+
+
+class PacketRing:
+    """Single-producer, single-consumer ring of packet summaries in shared memory
+
+    The worker process appends fixed-size records and advances ``write_seq``;
+    the aggregator reads records straight out of the buffer and advances
+    ``read_seq``. Each counter has one writer, so no lock is needed. When the
+    ring is full the worker drops the packet and counts it instead of
+    blocking the capture socket.
+    """
+
+    def __init__(self, capacity=65536, shm=None):
+        if capacity & (capacity - 1):
+            raise ValueError("Ring capacity must be a power of two")
+        self.capacity = capacity
+        self.mask = capacity - 1
+        self.owner = shm is None
+        self.shm = shm or shared_memory.SharedMemory(create=True, size=HEADER_SIZE + capacity * RECORD.size)
+        self.buf = self.shm.buf
+        self.header = self.buf[:HEADER_SIZE].cast('Q')
+        if self.owner:
+            self.buf[:HEADER_SIZE] = bytes(HEADER_SIZE)
+
+    def counters(self):
+        header = self.header
+        write_seq, read_seq = header[WRITE_SEQ], header[READ_SEQ]
+        produced, ring_dropped, kernel_dropped = header[PRODUCED], header[RING_DROPPED], header[KERNEL_DROPPED]
+        return {
+            'queued': write_seq - read_seq,
+            'produced': produced,
+            'ring_dropped': ring_dropped,
+            'kernel_dropped': kernel_dropped
+        }
+
+    def read_batch(self, max_records=4096):
+        """Records waiting in the ring, as memoryview segments, and the new read position
+
+        The caller must call ``release(read_seq)`` once it is done with the
+        segments; until then the worker won't overwrite them.
+        """
+        read_seq = self.header[READ_SEQ]
+        available = min(self.header[WRITE_SEQ] - read_seq, max_records)
+        if not available:
+            return [], read_seq
+
+        start = read_seq & self.mask
+        first = min(available, self.capacity - start)
+        base = HEADER_SIZE
+        segments = [self.buf[base + start * RECORD.size:base + (start + first) * RECORD.size]]
+        if first < available:
+            segments.append(self.buf[base:base + (available - first) * RECORD.size])
+        return segments, read_seq + available
+
+    def release(self, read_seq):
+        self.header[READ_SEQ] = read_seq
+
+    def __reduce__(self):
+        # Sent to the worker by name; the worker attaches to the same segment
+        return PacketRing, (self.capacity, shared_memory.SharedMemory(self.shm.name))
+
+    def close(self):
+        self.header.release()
+        self.header = None
+        self.buf = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _capture_worker(ring, source, stop_event):
+    """Worker process body: decode frame headers and append summaries to the ring"""
+    buf = ring.buf
+    header = ring.header
+    mask = ring.mask
+    capacity = ring.capacity
+    record_size = RECORD.size
+    pack_record = RECORD.pack_into
+    sock = getattr(source, 'sock', None)
+    if sock is not None:
+        # A socket received from the parent comes back without its timeout
+        sock.settimeout(source.timeout)
+
+    write_seq = produced = ring_dropped = kernel_dropped = frames = 0
+    read_seq = header[READ_SEQ]
+    next_publish = 0.0
+
+    try:
+        for timestamp, length, frame in source.packets():
+            # Publish counters every 1024 frames, once a second and on socket
+            # timeouts, whether or not the frame makes it into the ring
+            if frame is not None:
+                frames += 1
+            if frame is None or not frames & 0x3FF or timestamp >= next_publish:
+                next_publish = timestamp + 1.0 if frame is not None else 0.0
+                if sock is not None:
+                    try:
+                        # Reading the statistics resets them, so they accumulate here
+                        kernel_dropped += TPACKET_STATS.unpack(sock.getsockopt(SOL_PACKET, PACKET_STATISTICS, TPACKET_STATS.size))[1]
+                    except OSError:
+                        pass
+                header[PRODUCED] = produced
+                header[RING_DROPPED] = ring_dropped
+                header[KERNEL_DROPPED] = kernel_dropped
+                if stop_event.is_set():
+                    break
+            if frame is None:
+                continue
+            decoded = decode_frame(frame)
+            if decoded is None:
+                continue
+
+            if write_seq - read_seq >= capacity:
+                # Only re-read the consumer position when the ring looks full
+                read_seq = header[READ_SEQ]
+                if write_seq - read_seq >= capacity:
+                    ring_dropped += 1
+                    continue
+
+            pack_record(buf, HEADER_SIZE + (write_seq & mask) * record_size, timestamp, length, *decoded)
+            write_seq += 1
+            produced += 1
+            # Publish the record only after it is fully written
+            header[WRITE_SEQ] = write_seq
+    finally:
+        header[PRODUCED] = produced
+        header[RING_DROPPED] = ring_dropped
+        header[KERNEL_DROPPED] = kernel_dropped
+        source.close()
+
+
+class SharedMemoryCapture(PacketCapture):
+    """Packet capture with header decoding in a separate worker process
+
+    The worker owns the capture socket and writes fixed-size summaries into
+    a shared-memory ``PacketRing``. An aggregator thread in this process
+    drains the ring in batches with ``struct.iter_unpack`` (nothing is
+    pickled) and feeds the same per-IP/per-MAC counters and flow table as
+    ``PacketCapture``, so ``drain`` works unchanged. Decoding at line rate
+    therefore never holds the API process's GIL.
+    """
+
+    def __init__(self, source, flow_table=None, ring_capacity=65536, batch_size=4096, poll_interval=0.01):
+        super().__init__(source, flow_table)
+        self.ring_capacity = ring_capacity
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.ring = None
+        self.worker = None
+        self.stop_event = None
+        self.final_counters = {}
+
+    def start(self):
+        """Start the worker process and the aggregator thread"""
+        if self.running:
+            return
+
+        # forkserver, not fork: the API process already runs threads (write-behind,
+        # sampler, resolver) whose locks a forked child could inherit held. The
+        # ring travels by name and the socket as a passed descriptor. As with
+        # spawn, the server's entry module must guard its startup with
+        # `if __name__ == '__main__'`
+        context = multiprocessing.get_context('forkserver')
+        self.ring = PacketRing(self.ring_capacity)
+        self.stop_event = context.Event()
+        self.worker = context.Process(
+            target=_capture_worker,
+            args=(self.ring, self.source, self.stop_event),
+            name='packet-capture'
+        )
+        self.worker.daemon = True
+        self.worker.start()
+
+        # The worker received its own copy of the socket
+        if isinstance(self.source, AfPacketSource):
+            self.source.sock.close()
+
+        super().start()
+
+    def stop(self, timeout=2.0):
+        """Stop the worker, drain what it left in the ring and release the shared memory"""
+        self.running = False
+        if self.worker:
+            self.stop_event.set()
+            self.worker.join(timeout)
+            if self.worker.is_alive():
+                self.worker.terminate()
+                self.worker.join()
+            self.worker = None
+        if self.capture_thread:
+            self.capture_thread.join()
+            self.capture_thread = None
+        if self.ring:
+            self.run()
+            self.final_counters = self.ring.counters()
+            self.ring.close()
+            self.ring = None
+        if self.flow_table:
+            self.flow_table.expire_all()
+
+    def _capture_loop(self):
+        try:
+            while self.running:
+                if not self.run():
+                    if self.flow_table:
+                        # Idle link: idle flows still need to time out
+                        self.flow_table.expire(time.time())
+                    time.sleep(self.poll_interval)
+        except Exception as e:
+            print(f"Error in packet aggregation: {e}")
+        finally:
+            self.running = False
+
+    def run(self):
+        """Aggregate everything currently in the ring; returns the number of packets"""
+        total = 0
+        while True:
+            segments, read_seq = self.ring.read_batch(self.batch_size)
+            if not segments:
+                return total
+            total += self._aggregate(segments)
+            self.ring.release(read_seq)
+
+    def _aggregate(self, segments):
+        records = itertools.chain.from_iterable(RECORD.iter_unpack(segment) for segment in segments)
+        packets = self._count(records, self.flow_table.update if self.flow_table else None)
+        for segment in segments:
+            segment.release()
+        return packets
+
+    def get_stats(self):
+        """Packets aggregated and dropped, by the ring (full) or by the kernel"""
+        counters = self.ring.counters() if self.ring else self.final_counters
+        return dict(counters, packets_seen=self.packets_seen)
@@ -0,0 +1,75 @@
+import threading
+from collections import deque
+
+
+class StateStream:
+    """Versioned network status for the ``network_data`` Socket.IO event
+
+    Each ``publish`` compares the new status with the previous one and
+    produces a delta: devices added, changed (only the fields that changed)
+    and removed, plus the scalar metrics. Every delta carries a sequence
+    number one higher than the last. A client starts from ``snapshot()``
+    and applies deltas in order; when it sees a gap it asks for
+    ``resync(last_seq)``, which replays the missed deltas if they are still
+    in the history and otherwise returns a fresh snapshot.
+    """
+
+    def __init__(self, key='ip', history=120):
+        self.key = key
+        self.seq = 0
+        self.devices = {}
+        self.metrics = {}
+        self.history = deque(maxlen=history)
+        self.lock = threading.Lock()
+
+    def publish(self, status):
+        """Apply a full status dict and return the delta message for it"""
+        devices = {device[self.key]: device for device in status.get('devices', ())}
+        metrics = {name: value for name, value in status.items() if name != 'devices'}
+
+        with self.lock:
+            added = [device for key, device in devices.items() if key not in self.devices]
+            removed = [key for key in self.devices if key not in devices]
+            changed = []
+            for key, device in devices.items():
+                previous = self.devices.get(key)
+                if previous is None or previous == device:
+                    continue
+                fields = {name: value for name, value in device.items() if previous.get(name) != value}
+                fields.update({name: None for name in previous if name not in device})
+                fields[self.key] = key
+                changed.append(fields)
+
+            self.seq += 1
+            message = {
+                'type': 'delta',
+                'seq': self.seq,
+                'added': added,
+                'changed': changed,
+                'removed': removed,
+                'metrics': metrics
+            }
+            self.devices = devices
+            self.metrics = metrics
+            self.history.append(message)
+        return message
+
+    def snapshot(self):
+        """Full state, sent on connect and when a client can't catch up from deltas"""
+        with self.lock:
+            return {
+                'type': 'snapshot',
+                'seq': self.seq,
+                'devices': list(self.devices.values()),
+                'metrics': dict(self.metrics)
+            }
+
+    def resync(self, last_seq):
+        """Messages that bring a client at ``last_seq`` up to date"""
+        with self.lock:
+            if last_seq == self.seq:
+                return []
+            oldest = self.history[0]['seq'] if self.history else None
+            if oldest is not None and oldest <= last_seq + 1 and last_seq < self.seq:
+                return [message for message in self.history if message['seq'] > last_seq]
+        return [self.snapshot()]
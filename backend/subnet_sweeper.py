@@ -0,0 +1,157 @@
+import asyncio
+import ipaddress
+import time
+
+
+class RateLimiter:
+    """Spaces acquisitions at least 1/rate seconds apart (asyncio)"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.next_slot = 0.0
+
+    async def acquire(self):
+        if not self.interval:
+            return
+        now = time.monotonic()
+        slot = max(now, self.next_slot)
+        self.next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class SubnetSweeper:
+    """Active sweep of each local IPv4 subnet with the reachability prober
+
+    Addresses are generated lazily from the network, so a /16 never exists
+    as a list. Every subnet gets its own share of the concurrency limit and
+    its own probe rate, so a large subnet can't starve a small one or flood
+    its segment. Hosts that answered within ``recent_ttl`` seconds are
+    probed first, so a sweep cut short by its deadline still re-checks the
+    hosts most likely to be there. The rest of the range is walked from
+    where the previous sweep of that network stopped, wrapping at the end,
+    so successive time-limited sweeps cover all of it.
+
+    Every probe holds several sockets (one per TCP port plus ICMP), so the
+    concurrency limit is kept well below the prober's own.
+    """
+
+    def __init__(self, prober, concurrency=32, rate_per_subnet=200, max_hosts=65534,
+                 recent_ttl=3600, timeout=1.0):
+        self.prober = prober
+        self.concurrency = concurrency
+        self.rate_per_subnet = rate_per_subnet
+        self.max_hosts = max_hosts
+        self.recent_ttl = recent_ttl
+        self.timeout = timeout
+        # ip -> monotonic time it last answered
+        self.recent = {}
+        # network -> offset of the next host address to probe
+        self.resume = {}
+        self.last_sweep = {}
+
+    def sweepable(self, subnets):
+        """The (interface, network) pairs small enough to sweep, each network once
+
+        ``subnets`` comes from ``DiscoveryScope.subnets``; point-to-point
+        links and networks over ``max_hosts`` addresses are skipped.
+        """
+        selected = []
+        seen = set()
+        for interface, network in subnets:
+            if network.prefixlen >= 31 or network in seen:
+                continue
+            if network.num_addresses - 2 > self.max_hosts:
+                print(f"Skipping sweep of {network} on {interface}: larger than {self.max_hosts} hosts")
+                continue
+            seen.add(network)
+            selected.append((interface, network))
+        return selected
+
+    def sweep(self, subnets, deadline=None, stop_event=None):
+        """Probe every host of the (interface, network) pairs; returns {ip: result} for hosts that answered
+
+        ``deadline`` bounds the whole sweep in seconds; addresses not reached
+        by then are where the next sweep of that network starts. Setting
+        ``stop_event`` ends the sweep as soon as the probes in flight return.
+        """
+        if not subnets:
+            return {}
+        return asyncio.run(self._sweep(subnets, deadline, stop_event))
+
+    async def _sweep(self, subnets, deadline, stop_event):
+        started = time.monotonic()
+        alive = {}
+        workers_per_subnet = max(1, self.concurrency // len(subnets))
+
+        async def sweep_subnet(interface, network):
+            addresses = self._addresses(network)
+            limiter = RateLimiter(self.rate_per_subnet)
+            stats = {'subnet': str(network), 'interface': interface, 'probed': 0, 'alive': 0, 'complete': True}
+
+            def expired():
+                if (deadline is not None and time.monotonic() - started >= deadline) or \
+                        (stop_event is not None and stop_event.is_set()):
+                    stats['complete'] = False
+                    return True
+                return False
+
+            async def worker():
+                while not expired():
+                    await limiter.acquire()
+                    # Checked again after the rate wait, and before taking an
+                    # address, so every address taken is probed in time
+                    if expired():
+                        return
+                    address = next(addresses, None)
+                    if address is None:
+                        return
+                    result = await self.prober.probe(address, self.timeout)
+                    stats['probed'] += 1
+                    if result['alive']:
+                        stats['alive'] += 1
+                        alive[address] = result
+                        self.recent[address] = time.monotonic()
+
+            # The workers share one address generator, so nothing is materialized
+            await asyncio.gather(*(worker() for _ in range(workers_per_subnet)))
+            stats['duration'] = time.monotonic() - started
+            self.last_sweep[stats['subnet']] = stats
+
+        self._expire_recent()
+        await asyncio.gather(*(sweep_subnet(interface, network) for interface, network in subnets))
+        return alive
+
+    def _addresses(self, network):
+        """Recently alive hosts of ``network`` first, then the rest from the resume point
+
+        The resume point advances as addresses are handed out, so whatever
+        this sweep doesn't reach is where the next one starts.
+        """
+        recent = sorted(
+            (ip for ip in self.recent if ipaddress.IPv4Address(ip) in network),
+            key=lambda ip: self.recent[ip],
+            reverse=True
+        )
+        yield from recent
+        recent = set(recent)
+
+        # Host addresses exclude the network and broadcast addresses (prefixes < 31)
+        first = int(network.network_address) + 1
+        count = network.num_addresses - 2
+        start = self.resume.get(network, 0) % count
+        for step in range(count):
+            offset = (start + step) % count
+            self.resume[network] = (offset + 1) % count
+            address = str(ipaddress.IPv4Address(first + offset))
+            if address not in recent:
+                yield address
+
+    def _expire_recent(self):
+        cutoff = time.monotonic() - self.recent_ttl
+        for ip in [ip for ip, seen in self.recent.items() if seen < cutoff]:
+            del self.recent[ip]
+
+    def get_stats(self):
+        """Per-subnet results of the last sweep"""
+        return dict(self.last_sweep)
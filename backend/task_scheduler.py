@@ -0,0 +1,182 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ScheduledTask:
+    __slots__ = ('name', 'func', 'interval', 'jitter', 'timeout', 'priority',
+                 'next_due', 'running', 'started_at', 'timed_out', 'stats')
+
+    def __init__(self, name, func, interval, jitter, timeout, priority, next_due):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        self.timeout = timeout
+        self.priority = priority
+        self.next_due = next_due
+        self.running = False
+        self.started_at = None
+        self.timed_out = False
+        self.stats = {
+            'runs': 0,
+            'errors': 0,
+            'overruns': 0,
+            'timeouts': 0,
+            'last_duration': None,
+            'max_duration': 0.0,
+            'last_run': None
+        }
+
+
+class TaskScheduler:
+    """Runs periodic tasks at independent rates on monotonic-clock deadlines
+
+    Each task's deadlines are fixed multiples of its interval from its
+    start time, so run time never accumulates as drift; ``jitter`` spreads
+    a run randomly within that many seconds after its deadline without
+    moving the ones after it. Tasks run on a worker pool, so a slow task
+    only delays itself. When a task is still running at its next deadline
+    the run is skipped and counted as an overrun. A run that exceeds its
+    ``timeout`` is reported (threads can't be cancelled) and its task is not
+    started again until it returns. When several tasks are due at once,
+    lower ``priority`` values are dispatched first.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers
+        self.tasks = {}
+        self.queue = []
+        self.sequence = itertools.count()
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.running = False
+        self.thread = None
+        self.executor = None
+
+    def add(self, name, func, interval, jitter=0.0, timeout=None, priority=0, delay=0.0):
+        """Register ``func`` to run every ``interval`` seconds, first after ``delay``"""
+        task = ScheduledTask(name, func, interval, jitter, timeout, priority, time.monotonic() + delay)
+        with self.lock:
+            self.tasks[name] = task
+            self._push(task)
+        self.wakeup.set()
+        return task
+
+    def _push(self, task):
+        due = task.next_due + (random.uniform(0, task.jitter) if task.jitter else 0.0)
+        heapq.heappush(self.queue, (due, task.priority, next(self.sequence), task))
+
+    def start(self):
+        if self.running:
+            return
+
+        self.running = True
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.workers or max(len(self.tasks), 1),
+            thread_name_prefix='monitor-task'
+        )
+        self.thread = threading.Thread(target=self._run, name='task-scheduler')
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self, wait=True):
+        """Stop dispatching; with ``wait``, let running tasks finish"""
+        self.running = False
+        self.wakeup.set()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+        if self.executor:
+            self.executor.shutdown(wait=wait)
+            self.executor = None
+
+    def _run(self):
+        while self.running:
+            now = time.monotonic()
+            due = []
+            with self.lock:
+                while self.queue and self.queue[0][0] <= now:
+                    due.append(heapq.heappop(self.queue)[3])
+                for task in due:
+                    self._reschedule(task, now)
+                timeout = self.queue[0][0] - now if self.queue else 1.0
+
+            # Due tasks come off the heap ordered by deadline; dispatch by priority
+            for task in sorted(due, key=lambda task: task.priority):
+                self._dispatch(task, now)
+
+            # Also wake when a running task is due to time out
+            timeout = min(timeout, self._check_timeouts(now))
+            self.wakeup.wait(max(0.0, min(timeout, 1.0)))
+            self.wakeup.clear()
+
+    def _reschedule(self, task, now):
+        # Next deadline on the original grid; deadlines already missed are skipped
+        task.next_due += task.interval
+        if task.next_due <= now:
+            missed = int((now - task.next_due) // task.interval) + 1
+            task.stats['overruns'] += missed
+            task.next_due += missed * task.interval
+        self._push(task)
+
+    def _dispatch(self, task, now):
+        if task.running:
+            task.stats['overruns'] += 1
+            print(f"Task {task.name} still running after {now - task.started_at:.1f}s, skipping this run")
+            return
+
+        task.running = True
+        task.started_at = now
+        task.timed_out = False
+        try:
+            self.executor.submit(self._execute, task)
+        except RuntimeError:
+            # Executor already shut down
+            task.running = False
+
+    def _execute(self, task):
+        try:
+            task.func()
+        except Exception as e:
+            task.stats['errors'] += 1
+            print(f"Error in task {task.name}: {e}")
+        finally:
+            duration = time.monotonic() - task.started_at
+            stats = task.stats
+            stats['runs'] += 1
+            stats['last_duration'] = duration
+            stats['max_duration'] = max(stats['max_duration'], duration)
+            stats['last_run'] = time.time()
+            task.running = False
+
+    def _check_timeouts(self, now):
+        """Report runs past their timeout; returns seconds until the next one could be"""
+        next_check = 1.0
+        for task in list(self.tasks.values()):
+            if not (task.running and task.timeout and not task.timed_out):
+                continue
+            remaining = task.started_at + task.timeout - now
+            if remaining < 0:
+                task.timed_out = True
+                task.stats['timeouts'] += 1
+                print(f"Task {task.name} exceeded its {task.timeout}s timeout")
+            else:
+                next_check = min(next_check, remaining + 0.001)
+        return next_check
+
+    def get_stats(self):
+        """Per-task run, overrun, timeout and duration counters"""
+        now = time.monotonic()
+        return {
+            name: dict(
+                task.stats,
+                interval=task.interval,
+                running=task.running,
+                next_run_in=max(0.0, task.next_due - now)
+            )
+            for name, task in self.tasks.items()
+        }
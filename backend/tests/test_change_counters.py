@@ -0,0 +1,125 @@
+import sqlite3
+
+import pytest
+
+from database import DatabaseManager
+
+
+@pytest.fixture
+def db(tmp_path):
+    return DatabaseManager(str(tmp_path / 'network_monitor.db'))
+
+
+def _baseline_database(path):
+    """A database with the tables as they were before change tracking"""
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE devices (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ip_address TEXT UNIQUE NOT NULL,
+            mac_address TEXT,
+            vendor TEXT,
+            hostname TEXT,
+            connection_type TEXT,
+            is_blocked BOOLEAN DEFAULT 0,
+            first_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            total_bandwidth REAL DEFAULT 0,
+            is_online BOOLEAN DEFAULT 1
+        );
+        CREATE TABLE alerts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            alert_type TEXT NOT NULL,
+            message TEXT NOT NULL,
+            severity TEXT DEFAULT 'info',
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            is_read BOOLEAN DEFAULT 0,
+            device_ip TEXT,
+            additional_data TEXT
+        );
+        INSERT INTO devices (ip_address, mac_address) VALUES ('10.0.0.1', 'aa:bb:cc:dd:ee:01');
+        INSERT INTO devices (ip_address, mac_address) VALUES ('10.0.0.2', 'aa:bb:cc:dd:ee:02');
+        INSERT INTO alerts (alert_type, message) VALUES ('device_new', 'old alert');
+    ''')
+    conn.commit()
+    conn.close()
+
+
+def test_writes_bump_the_table_version(db):
+    before = db.get_table_versions()['alerts']['version']
+    db.add_alert('device_new', 'one')
+    db.add_alert('device_new', 'two')
+    db.flush_writes()
+
+    assert db.get_table_versions()['alerts']['version'] == before + 2
+
+
+def test_validators_change_only_with_the_table(db):
+    db.add_alert('device_new', 'one')
+    db.flush_writes()
+    alerts_etag = db.get_cache_validators('alerts')['etag']
+    devices_etag = db.get_cache_validators('devices')['etag']
+
+    db.add_alert('device_new', 'two')
+    db.flush_writes()
+
+    assert db.get_cache_validators('alerts')['etag'] != alerts_etag
+    assert db.get_cache_validators('devices')['etag'] == devices_etag
+
+
+def test_changes_page_without_skipping_rows(db):
+    for i in range(5):
+        db.add_alert('device_new', f'alert {i}')
+    db.flush_writes()
+
+    seen = []
+    version = 0
+    while True:
+        feed = db.get_changes_since('alerts', version, limit=2)
+        seen.extend(row['message'] for row in feed['rows'])
+        version = feed['version']
+        if not feed['has_more']:
+            break
+
+    assert seen == [f'alert {i}' for i in range(5)]
+    assert db.get_changes_since('alerts', version)['rows'] == []
+
+
+def test_updated_rows_come_back_once_with_their_new_version(db):
+    db.add_alert('device_new', 'first')
+    db.add_alert('device_new', 'second')
+    db.flush_writes()
+    version = db.get_changes_since('alerts', 0)['version']
+
+    first_id = db.get_alerts()['alerts'][-1]['id']
+    db.mark_alert_read(first_id)
+    feed = db.get_changes_since('alerts', version)
+
+    assert [row['id'] for row in feed['rows']] == [first_id]
+    assert feed['rows'][0]['row_version'] == feed['version']
+
+
+def test_feed_rows_match_the_regular_readers(db):
+    db.add_alert('device_new', 'new device', device_ip='10.0.0.5', additional_data={'mac': 'aa'})
+    db.flush_writes()
+
+    row = db.get_changes_since('alerts', 0)['rows'][0]
+    alert = db.get_alerts()['alerts'][0]
+
+    assert row.pop('row_version') > 0
+    assert row == alert
+    assert row['is_read'] is False
+
+
+def test_baseline_rows_are_backfilled_on_upgrade(tmp_path):
+    path = str(tmp_path / 'network_monitor.db')
+    _baseline_database(path)
+    db = DatabaseManager(path)
+
+    devices = db.get_changes_since('devices', 0)
+    alerts = db.get_changes_since('alerts', 0)
+
+    assert sorted(row['ip'] for row in devices['rows']) == ['10.0.0.1', '10.0.0.2']
+    assert [row['message'] for row in alerts['rows']] == ['old alert']
+    assert devices['version'] >= 1
+    assert db.get_changes_since('devices', devices['version'])['rows'] == []
@@ -0,0 +1,93 @@
+import sqlite3
+import threading
+
+import pytest
+
+from database import DatabaseManager
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / 'network_monitor.db'), pool_size=2, checkout_timeout=0.2)
+    yield manager
+    manager.close()
+
+
+class FakeApp:
+    """Records the hooks init_app registers, like a Flask app would"""
+
+    def __init__(self):
+        self.before = []
+        self.teardown = []
+
+    def before_request(self, function):
+        self.before.append(function)
+
+    def teardown_request(self, function):
+        self.teardown.append(function)
+
+
+def test_methods_use_the_checked_out_connection(db):
+    with db.checkout() as conn:
+        assert db.get_connection() is conn
+        with db.checkout() as inner:
+            assert inner is conn
+    assert db.get_connection() is not conn
+
+
+def test_pool_is_bounded(db):
+    with db.checkout():
+        # The second connection goes to another thread; a third caller times out
+        assert db._pool_opened == 1
+        held = threading.Event()
+        release = threading.Event()
+
+        def hold():
+            with db.checkout():
+                held.set()
+                release.wait()
+
+        worker = threading.Thread(target=hold)
+        worker.start()
+        held.wait()
+        errors = []
+
+        def third():
+            try:
+                with db.checkout():
+                    pass
+            except sqlite3.OperationalError as e:
+                errors.append(e)
+
+        blocked = threading.Thread(target=third)
+        blocked.start()
+        blocked.join()
+        release.set()
+        worker.join()
+
+    assert db._pool_opened == 2
+    assert len(errors) == 1
+
+
+def test_returned_connection_is_reused_without_open_transaction(db):
+    with db.checkout() as conn:
+        conn.execute('BEGIN')
+        conn.execute("INSERT INTO alerts (alert_type, message) VALUES ('x', 'uncommitted')")
+
+    with db.checkout() as again:
+        assert again is conn
+        assert not again.in_transaction
+        assert again.execute("SELECT COUNT(*) FROM alerts WHERE message = 'uncommitted'").fetchone()[0] == 0
+
+
+def test_init_app_checks_out_per_request(db):
+    app = FakeApp()
+    db.init_app(app)
+    [before], [teardown] = app.before, app.teardown
+
+    before()
+    conn = db.get_connection()
+    teardown(None)
+
+    assert db._pool.qsize() == 1
+    assert db.get_connection() is not conn
@@ -0,0 +1,53 @@
+import pytest
+
+from database import DatabaseManager
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / 'network_monitor.db'))
+    for i in range(7):
+        manager.add_alert('device_new', f'alert {i}', severity='warning' if i % 2 else 'info',
+                          device_ip=f'10.0.0.{i}')
+    manager.flush_writes()
+    return manager
+
+
+def test_cursor_pages_cover_every_alert_once(db):
+    seen = []
+    cursor = None
+    while True:
+        page = db.get_alerts(limit=3, cursor=cursor)
+        seen.extend(alert['message'] for alert in page['alerts'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+
+    assert seen == [f'alert {i}' for i in reversed(range(7))]
+
+
+def test_new_alerts_do_not_shift_later_pages(db):
+    first = db.get_alerts(limit=3)
+    db.add_alert('device_new', 'newer')
+    db.flush_writes()
+    second = db.get_alerts(limit=3, cursor=first['next_cursor'])
+
+    assert [alert['message'] for alert in second['alerts']] == ['alert 3', 'alert 2', 'alert 1']
+
+
+def test_filters_apply_across_pages(db):
+    page = db.get_alerts(limit=2, severity='warning')
+    rest = db.get_alerts(limit=2, severity='warning', cursor=page['next_cursor'])
+
+    messages = [alert['message'] for alert in page['alerts'] + rest['alerts']]
+    assert messages == ['alert 5', 'alert 3', 'alert 1']
+    assert rest['next_cursor'] is None
+
+
+def test_acknowledge_by_ids_and_by_filter(db):
+    alerts = db.get_alerts(limit=10)['alerts']
+
+    assert db.acknowledge_alerts(ids=[alerts[0]['id'], alerts[1]['id']]) == 2
+    assert db.acknowledge_alerts(severity='warning') == 2
+    unread = db.get_alerts(limit=10, is_read=False)['alerts']
+    assert [alert['message'] for alert in unread] == ['alert 4', 'alert 2', 'alert 0']
@@ -0,0 +1,72 @@
+import socket
+
+from flow_table import FlowTable, flow_key
+
+
+def _ip(text):
+    return socket.inet_aton(text)
+
+
+def _update(table, src, dst, src_port, timestamp, length=100):
+    src_ip, dst_ip = _ip(src), _ip(dst)
+    table.update(flow_key(src_ip, dst_ip, src_port, 80, 6), src_ip, dst_ip, length, timestamp)
+
+
+def test_idle_flows_are_exported_and_removed():
+    table = FlowTable(idle_timeout=30)
+    _update(table, '10.0.0.1', '10.0.0.2', 1000, timestamp=0)
+    _update(table, '10.0.0.3', '10.0.0.2', 1001, timestamp=20)
+
+    table.expire(now=35)
+
+    assert len(table) == 1
+    [record] = table.drain_exports()
+    assert record['reason'] == 'idle'
+    assert (record['src_ip'], record['dst_ip'], record['src_port'], record['dst_port']) == ('10.0.0.1', '10.0.0.2', 1000, 80)
+    assert (record['bytes'], record['packets']) == (100, 1)
+    assert table.drain_exports() == []
+
+
+def test_active_flows_export_deltas_and_stay():
+    table = FlowTable(idle_timeout=100, active_timeout=60)
+    table.expire(now=0)
+    for second in range(0, 60, 10):
+        _update(table, '10.0.0.1', '10.0.0.2', 1000, timestamp=second)
+    table.expire(now=60)
+    _update(table, '10.0.0.1', '10.0.0.2', 1000, timestamp=70)
+    table.expire(now=120)
+
+    assert len(table) == 1
+    exports = table.drain_exports()
+    assert [record['reason'] for record in exports] == ['active', 'active']
+    assert [record['packets'] for record in exports] == [6, 1]
+    assert table.stats['active_exports'] == 2
+
+
+def test_least_recently_used_flow_is_evicted():
+    table = FlowTable(max_flows=2, idle_timeout=100)
+    _update(table, '10.0.0.1', '10.0.0.9', 1, timestamp=0)
+    _update(table, '10.0.0.2', '10.0.0.9', 2, timestamp=1)
+    _update(table, '10.0.0.1', '10.0.0.9', 1, timestamp=2)
+    _update(table, '10.0.0.3', '10.0.0.9', 3, timestamp=3)
+
+    assert len(table) == 2
+    [record] = table.drain_exports()
+    assert (record['reason'], record['src_ip']) == ('evicted', '10.0.0.2')
+    assert table.stats['evicted'] == 1
+
+
+def test_export_queue_is_bounded():
+    table = FlowTable(max_flows=1, max_exports=3)
+    for port in range(10):
+        _update(table, '10.0.0.1', '10.0.0.2', port, timestamp=port)
+
+    assert [record['src_port'] for record in table.drain_exports()] == [6, 7, 8]
+
+
+def test_top_flows_orders_by_bytes():
+    table = FlowTable()
+    _update(table, '10.0.0.1', '10.0.0.2', 1, timestamp=0, length=50)
+    _update(table, '10.0.0.3', '10.0.0.2', 2, timestamp=0, length=500)
+
+    assert [flow['src_ip'] for flow in table.top_flows(limit=1)] == ['10.0.0.3']
@@ -0,0 +1,93 @@
+import threading
+import time
+
+import pytest
+
+from hostname_resolver import HostnameResolver
+
+
+class FakeLookup:
+    """Counts lookups; answers from ``names`` once ``release`` is set"""
+
+    def __init__(self, names):
+        self.names = names
+        self.calls = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, ip):
+        self.calls.append(ip)
+        self.release.wait(5)
+        return self.names.get(ip)
+
+
+@pytest.fixture
+def resolver():
+    resolver = HostnameResolver(timeout=1.0)
+    yield resolver
+    resolver.shutdown()
+
+
+@pytest.fixture
+def lookup(resolver, monkeypatch):
+    lookup = FakeLookup({'10.0.0.1': 'printer.lan'})
+    monkeypatch.setattr(resolver, '_lookup', lookup)
+    return lookup
+
+
+def test_answers_are_cached(resolver, lookup):
+    assert resolver.resolve('10.0.0.1') == 'printer.lan'
+    assert resolver.resolve('10.0.0.1') == 'printer.lan'
+
+    assert lookup.calls == ['10.0.0.1']
+
+
+def test_failures_are_cached_for_the_negative_ttl(resolver, lookup):
+    resolver.negative_ttl = 0.05
+    assert resolver.resolve('10.0.0.9') == '10.0.0.9'
+    assert resolver.resolve('10.0.0.9') == '10.0.0.9'
+    assert lookup.calls == ['10.0.0.9']
+
+    time.sleep(0.1)
+    resolver.resolve('10.0.0.9')
+
+    assert lookup.calls == ['10.0.0.9', '10.0.0.9']
+
+
+def test_concurrent_lookups_for_one_address_are_coalesced(resolver, lookup):
+    lookup.release.clear()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(resolver.resolve('10.0.0.1'))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    lookup.release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == ['printer.lan'] * 5
+    assert lookup.calls == ['10.0.0.1']
+
+
+def test_slow_lookup_returns_the_ip_and_lands_in_the_cache(resolver, lookup):
+    lookup.release.clear()
+
+    started = time.monotonic()
+    assert resolver.resolve('10.0.0.1', timeout=0.05) == '10.0.0.1'
+    assert time.monotonic() - started < 0.5
+
+    lookup.release.set()
+    deadline = time.monotonic() + 2
+    while '10.0.0.1' not in resolver.cache and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert resolver.resolve('10.0.0.1') == 'printer.lan'
+    assert lookup.calls == ['10.0.0.1']
+
+
+def test_cache_keeps_the_most_recently_used_entries(resolver, lookup):
+    resolver.max_entries = 2
+    resolver.resolve_many(['10.0.0.1', '10.0.0.2'])
+    resolver.resolve('10.0.0.1')
+    resolver.resolve('10.0.0.3')
+
+    assert list(resolver.cache) == ['10.0.0.1', '10.0.0.3']
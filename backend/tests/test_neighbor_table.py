@@ -0,0 +1,58 @@
+from neighbor_table import NeighborTable, diff_snapshots, parse_proc_net_arp
+
+PROC_NET_ARP = """\
+IP address       HW type     Flags       HW address            Mask     Device
+192.168.1.1      0x1         0x2         aa:bb:cc:dd:ee:01     *        eth0
+192.168.1.20     0x1         0x2         aa:bb:cc:dd:ee:14     *        eth0
+192.168.1.30     0x1         0x0         00:00:00:00:00:00     *        eth0
+10.10.0.5        0x1         0x6         aa:bb:cc:dd:ee:05     *        eth1
+"""
+
+
+def test_parse_skips_incomplete_entries():
+    entries = parse_proc_net_arp(PROC_NET_ARP)
+
+    assert set(entries) == {'192.168.1.1', '192.168.1.20', '10.10.0.5'}
+    assert entries['192.168.1.1'] == {
+        'ip': '192.168.1.1',
+        'mac': 'AA:BB:CC:DD:EE:01',
+        'interface': 'eth0',
+        'flags': 0x2
+    }
+    assert entries['10.10.0.5']['interface'] == 'eth1'
+
+
+def test_parse_ignores_malformed_lines():
+    text = PROC_NET_ARP + "garbage line\n192.168.1.40 0x1 zz aa:bb:cc:dd:ee:28 * eth0\n"
+    assert set(parse_proc_net_arp(text)) == {'192.168.1.1', '192.168.1.20', '10.10.0.5'}
+
+
+def test_diff_reports_added_removed_and_changed():
+    previous = parse_proc_net_arp(PROC_NET_ARP)
+    current = dict(previous)
+    del current['192.168.1.20']
+    current['192.168.1.1'] = dict(current['192.168.1.1'], mac='AA:BB:CC:DD:EE:99')
+    current['192.168.1.50'] = {'ip': '192.168.1.50', 'mac': 'AA:BB:CC:DD:EE:32', 'interface': 'eth0', 'flags': 2}
+
+    changes = diff_snapshots(previous, current)
+
+    assert [entry['ip'] for entry in changes['added']] == ['192.168.1.50']
+    assert [entry['ip'] for entry in changes['removed']] == ['192.168.1.20']
+    assert [entry['mac'] for entry in changes['changed']] == ['AA:BB:CC:DD:EE:99']
+
+
+def test_scan_only_returns_changes(tmp_path):
+    path = tmp_path / 'arp'
+    path.write_text(PROC_NET_ARP)
+    table = NeighborTable(str(path))
+
+    first = table.scan()
+    assert len(first['added']) == 3
+
+    second = table.scan()
+    assert second == {'added': [], 'removed': [], 'changed': []}
+
+    path.write_text(PROC_NET_ARP.splitlines()[0] + '\n')
+    third = table.scan()
+    assert len(third['removed']) == 3
+    assert table.get_entries() == {}
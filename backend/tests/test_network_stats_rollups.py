@@ -0,0 +1,98 @@
+import sqlite3
+import time
+
+import pytest
+
+from database import TIMESTAMP_FORMAT, DatabaseManager
+
+# Two hours ago, on an hour boundary
+HOUR = int(time.time()) // 3600 * 3600 - 7200
+
+
+def _format(epoch):
+    return time.strftime(TIMESTAMP_FORMAT, time.gmtime(epoch))
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / 'network_monitor.db'))
+    yield manager
+    manager.close()
+
+
+def _add_stats(db, monkeypatch, epoch, download, ping=None):
+    monkeypatch.setattr(db, '_timestamp', lambda: _format(epoch))
+    db.add_network_stats(download, 1.0, 3, 2, 0.5, ping)
+
+
+def _rollup(db, resolution, bucket_start):
+    db.flush_writes()
+    return db.get_connection().execute('''
+        SELECT samples, download_speed_min, download_speed_max, download_speed_sum, download_speed_count,
+               ping_latency_count
+        FROM network_stats_rollups WHERE resolution = ? AND bucket_start = ?
+    ''', (resolution, bucket_start)).fetchone()
+
+
+def test_rows_fold_into_every_resolution(db, monkeypatch):
+    _add_stats(db, monkeypatch, HOUR + 5, 10.0)
+    _add_stats(db, monkeypatch, HOUR + 30, 30.0)
+    _add_stats(db, monkeypatch, HOUR + 125, 50.0)
+
+    assert _rollup(db, 60, HOUR) == (2, 10.0, 30.0, 40.0, 2, 0)
+    assert _rollup(db, 60, HOUR + 120) == (1, 50.0, 50.0, 50.0, 1, 0)
+    assert _rollup(db, 3600, HOUR) == (3, 10.0, 50.0, 90.0, 3, 0)
+    assert _rollup(db, 86400, HOUR - HOUR % 86400)[0] == 3
+
+
+def test_missing_values_do_not_count_toward_the_average(db, monkeypatch):
+    _add_stats(db, monkeypatch, HOUR, 10.0, ping=20.0)
+    _add_stats(db, monkeypatch, HOUR + 1, 10.0, ping=None)
+
+    assert _rollup(db, 60, HOUR)[-1] == 1
+
+
+def test_prune_keeps_rollups_longer_than_raw_rows(db, monkeypatch):
+    old = HOUR - 40 * 86400
+    _add_stats(db, monkeypatch, old, 10.0)
+    _add_stats(db, monkeypatch, HOUR, 20.0)
+    db.flush_writes()
+
+    db.prune_network_stats()
+    conn = db.get_connection()
+
+    assert conn.execute('SELECT COUNT(*) FROM network_stats').fetchone()[0] == 1
+    assert _rollup(db, 60, old) is not None
+    db.prune_network_stats(rollup_retention_days={60: 30})
+    assert _rollup(db, 60, old) is None
+    assert _rollup(db, 3600, old - old % 3600) is not None
+
+
+def test_existing_history_is_backfilled_once(tmp_path):
+    path = str(tmp_path / 'network_monitor.db')
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE network_stats (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            download_speed REAL, upload_speed REAL, total_devices INTEGER,
+            active_devices INTEGER, network_usage REAL, ping_latency REAL
+        )
+    ''')
+    conn.executemany(
+        'INSERT INTO network_stats (timestamp, download_speed) VALUES (?, ?)',
+        [(_format(HOUR + 10), 4.0), (_format(HOUR + 20), 8.0)]
+    )
+    conn.commit()
+    conn.close()
+
+    db = DatabaseManager(path)
+    try:
+        assert _rollup(db, 60, HOUR) == (2, 4.0, 8.0, 12.0, 2, 0)
+    finally:
+        db.close()
+    db = DatabaseManager(path)
+    try:
+        assert _rollup(db, 60, HOUR)[0] == 2
+    finally:
+        db.close()
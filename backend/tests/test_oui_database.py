@@ -0,0 +1,40 @@
+import pytest
+
+from oui_database import OuiDatabase, mac_to_int
+
+HEADER = 'Registry,Assignment,Organization Name,Organization Address\n'
+
+
+@pytest.fixture
+def registry_dir(tmp_path):
+    (tmp_path / 'oui.csv').write_text(HEADER + 'MA-L,70B3D5,IEEE Registration Authority,US\nMA-L,B827EB,Raspberry Pi Foundation,GB\n')
+    (tmp_path / 'mam.csv').write_text(HEADER + 'MA-M,70B3D5E,Medium Vendor,DE\n')
+    (tmp_path / 'oui36.csv').write_text(HEADER + 'MA-S,70B3D5E12,Small Vendor,FR\n')
+    return tmp_path
+
+
+def test_longest_prefix_wins(registry_dir):
+    database = OuiDatabase.load(str(registry_dir))
+
+    assert database.lookup('70:B3:D5:E1:23:45') == 'Small Vendor'
+    assert database.lookup('70:B3:D5:E9:00:00') == 'Medium Vendor'
+    assert database.lookup('70:B3:D5:01:00:00') == 'IEEE Registration Authority'
+    assert database.lookup('00:00:00:00:00:01') is None
+    assert len(database) == 4
+
+
+@pytest.mark.parametrize('mac', ['b8:27:eb:12:34:56', 'B8-27-EB-12-34-56', 'b827.eb12.3456', 'B827EB123456'])
+def test_common_notations_are_accepted(registry_dir, mac):
+    assert OuiDatabase.load(str(registry_dir)).lookup(mac) == 'Raspberry Pi Foundation'
+
+
+def test_malformed_macs_are_rejected():
+    assert mac_to_int('b8:27:eb') is None
+    assert mac_to_int(None) is None
+    assert OuiDatabase.load('/nonexistent').lookup('not a mac') is None
+
+
+def test_builtin_table_without_registry_files(tmp_path):
+    database = OuiDatabase.load(str(tmp_path))
+
+    assert database.lookup('00:50:56:00:00:01') == 'VMware'
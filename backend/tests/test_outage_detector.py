@@ -0,0 +1,64 @@
+from outage_detector import DOWN, SUSPECT_DOWN, SUSPECT_UP, UP, OutageDetector
+
+
+def make_detector():
+    # observe() never touches the prober
+    return OutageDetector(None, down_hold=15, up_hold=10, flap_window=300)
+
+
+def test_short_drop_is_not_an_outage():
+    detector = make_detector()
+    assert detector.observe(False, now=100) == []
+    assert detector.state == SUSPECT_DOWN
+    assert detector.is_online
+
+    assert detector.observe(True, now=110) == []
+    assert detector.state == UP
+
+
+def test_outage_opens_after_down_hold_and_recovers_after_up_hold():
+    detector = make_detector()
+    detector.observe(False, now=100)
+    events = detector.observe(False, now=115)
+
+    assert [event['event'] for event in events] == ['down']
+    assert events[0]['incident']['started_at'] == 100
+    assert detector.state == DOWN
+    assert not detector.is_online
+
+    assert detector.observe(True, now=130) == []
+    assert detector.state == SUSPECT_UP
+    events = detector.observe(True, now=140)
+
+    assert [event['event'] for event in events] == ['up']
+    assert events[0]['incident']['downtime'] == 30
+    assert detector.state == UP
+
+
+def test_drop_within_flap_window_reuses_the_incident():
+    detector = make_detector()
+    detector.observe(False, now=100)
+    down = detector.observe(False, now=115)[0]
+    detector.observe(True, now=130)
+    detector.observe(True, now=140)
+
+    detector.observe(False, now=200)
+    flap = detector.observe(False, now=215)[0]
+
+    assert flap['event'] == 'flap'
+    assert flap['incident']['incident_id'] == down['incident']['incident_id']
+    assert flap['incident']['flaps'] == 1
+
+
+def test_drop_after_flap_window_opens_a_new_incident():
+    detector = make_detector()
+    detector.observe(False, now=100)
+    first = detector.observe(False, now=115)[0]
+    detector.observe(True, now=130)
+    detector.observe(True, now=140)
+
+    detector.observe(False, now=1000)
+    second = detector.observe(False, now=1015)[0]
+
+    assert second['event'] == 'down'
+    assert second['incident']['incident_id'] != first['incident']['incident_id']
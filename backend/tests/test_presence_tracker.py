@@ -0,0 +1,56 @@
+from presence_tracker import PresenceTracker
+
+
+def test_device_comes_online_on_first_sighting():
+    tracker = PresenceTracker()
+    opened, closed = tracker.update({'10.0.0.2'}, timestamp=100)
+
+    assert opened == [{'device_ip': '10.0.0.2', 'online_from': 100}]
+    assert closed == []
+    assert tracker.is_online('10.0.0.2')
+
+
+def test_single_miss_does_not_split_a_session():
+    tracker = PresenceTracker(offline_after_misses=3, offline_after_seconds=90)
+    tracker.update({'10.0.0.2'}, timestamp=100)
+
+    assert tracker.update(set(), timestamp=130) == ([], [])
+    opened, closed = tracker.update({'10.0.0.2'}, timestamp=160)
+
+    assert opened == [] and closed == []
+    assert tracker.get_online_devices() == {'10.0.0.2': 100}
+
+
+def test_offline_needs_misses_and_elapsed_time():
+    tracker = PresenceTracker(offline_after_misses=3, offline_after_seconds=90)
+    tracker.update({'10.0.0.2'}, timestamp=100)
+
+    # Three misses, but only 60s since the last sighting
+    for timestamp in (120, 140, 160):
+        assert tracker.update(set(), timestamp=timestamp) == ([], [])
+
+    _, closed = tracker.update(set(), timestamp=200)
+    assert closed == [{'device_ip': '10.0.0.2', 'online_from': 100, 'online_to': 100}]
+    assert not tracker.is_online('10.0.0.2')
+
+
+def test_online_after_hits():
+    tracker = PresenceTracker(online_after_hits=2)
+    assert tracker.update({'10.0.0.2'}, timestamp=100) == ([], [])
+    opened, _ = tracker.update({'10.0.0.2'}, timestamp=130)
+
+    assert opened == [{'device_ip': '10.0.0.2', 'online_from': 100}]
+
+
+def test_close_all_ends_sessions_at_last_sighting():
+    tracker = PresenceTracker()
+    tracker.update({'10.0.0.2', '10.0.0.3'}, timestamp=100)
+    tracker.update({'10.0.0.2'}, timestamp=130)
+
+    closed = sorted(tracker.close_all(), key=lambda session: session['device_ip'])
+
+    assert closed == [
+        {'device_ip': '10.0.0.2', 'online_from': 100, 'online_to': 130},
+        {'device_ip': '10.0.0.3', 'online_from': 100, 'online_to': 100}
+    ]
+    assert tracker.get_online_devices() == {}
@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import time
+
+from reachability_prober import ProbeSlots, ReachabilityProber, build_echo_request, icmp_checksum
+
+
+def make_prober(concurrency, probe):
+    prober = ReachabilityProber(concurrency=concurrency, max_sockets=10000)
+    prober._probe = probe
+    return prober
+
+
+def test_echo_request_checksum_verifies():
+    packet = build_echo_request(0x1234, 7)
+    # Summing a packet that carries its own checksum gives zero
+    assert icmp_checksum(packet) == 0
+
+
+def test_concurrency_limits_hosts_in_flight_and_keeps_order():
+    active = 0
+    peak = 0
+
+    async def probe(host, timeout):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return 0.001, 'tcp'
+
+    prober = make_prober(4, probe)
+    hosts = [f'10.0.0.{i}' for i in range(1, 21)]
+    results = asyncio.run(prober.probe_many(hosts))
+
+    assert peak == 4
+    assert [result['host'] for result in results] == hosts
+    assert all(result['alive'] and result['method'] == 'tcp' for result in results)
+
+
+def test_limit_is_shared_across_event_loops():
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+
+    async def probe(host, timeout):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        await asyncio.sleep(0.005)
+        with lock:
+            active -= 1
+        return None, None
+
+    prober = make_prober(3, probe)
+    threads = [
+        threading.Thread(target=prober.probe_hosts, args=([f'10.{n}.0.{i}' for i in range(30)],))
+        for n in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak <= 3
+    assert prober.slots.value == 3
+
+
+def test_slow_host_times_out_as_dead():
+    async def probe(host, timeout):
+        await asyncio.sleep(5)
+        return 0.001, 'tcp'
+
+    prober = make_prober(2, probe)
+    started = time.monotonic()
+    result = prober.probe_hosts(['10.0.0.1'], timeout=0.1)['10.0.0.1']
+
+    assert not result['alive']
+    assert time.monotonic() - started < 1
+    assert prober.slots.value == 2
+
+
+def test_cancelled_waiters_give_their_slots_back():
+    slots = ProbeSlots(1)
+
+    async def scenario():
+        await slots.acquire()
+        waiters = [asyncio.ensure_future(slots.acquire()) for _ in range(3)]
+        await asyncio.sleep(0)
+        waiters[0].cancel()
+        slots.release()
+        await asyncio.sleep(0.01)
+        # The slot skipped the cancelled waiter
+        assert waiters[1].done() and not waiters[2].done()
+        waiters[2].cancel()
+        slots.release()
+        await asyncio.gather(*waiters, return_exceptions=True)
+
+    asyncio.run(scenario())
+    assert slots.value == 1
+    assert not slots.waiters
+
+
+def test_results_are_cached():
+    calls = []
+
+    async def probe(host, timeout):
+        calls.append(host)
+        return 0.001, 'icmp'
+
+    prober = make_prober(2, probe)
+    prober.probe_hosts(['10.0.0.1'])
+    prober.probe_hosts(['10.0.0.1'])
+    prober.probe_hosts(['10.0.0.1'], use_cache=False)
+
+    assert calls == ['10.0.0.1', '10.0.0.1']
@@ -0,0 +1,99 @@
+import socket
+import struct
+import threading
+
+import pytest
+
+from packet_capture import PacketCapture, decode_frame
+from shared_capture import RECORD, PacketRing, _capture_worker
+
+
+def _frame(src_port, src='10.0.0.1', dst='10.0.0.2', vlan=False):
+    ethernet = bytes.fromhex('aabbccddee02') + bytes.fromhex('aabbccddee01')
+    if vlan:
+        ethernet += struct.pack('!HH', 0x8100, 10)
+    ethernet += struct.pack('!H', 0x0800)
+    ip = struct.pack('!BBHHHBBH4s4s', 0x45, 0, 40, 0, 0, 64, 6, 0, socket.inet_aton(src), socket.inet_aton(dst))
+    return ethernet + ip + struct.pack('!HH', src_port, 80) + bytes(16)
+
+
+class ListSource:
+    """Yields canned frames, calling ``between(i)`` after frame i"""
+
+    def __init__(self, frames, between=None):
+        self.frames = frames
+        self.between = between
+
+    def packets(self):
+        for i, frame in enumerate(self.frames):
+            yield float(i), len(frame), frame
+            if self.between:
+                self.between(i)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def ring():
+    ring = PacketRing(capacity=4)
+    yield ring
+    ring.close()
+
+
+def _ports(segments):
+    return [record[2] for segment in segments for record in RECORD.iter_unpack(segment)]
+
+
+def test_decode_frame_reads_vlan_tagged_ipv4():
+    src_port, dst_port, protocol, version, src_mac, dst_mac, src_ip, dst_ip = decode_frame(_frame(1234, vlan=True))
+
+    assert (src_port, dst_port, protocol, version) == (1234, 80, 6, 4)
+    assert (src_mac, dst_mac) == (bytes.fromhex('aabbccddee01'), bytes.fromhex('aabbccddee02'))
+    assert (src_ip, dst_ip) == (socket.inet_aton('10.0.0.1'), socket.inet_aton('10.0.0.2'))
+    assert decode_frame(bytes(10)) is None
+
+
+def test_full_ring_drops_and_counts(ring):
+    _capture_worker(ring, ListSource([_frame(port) for port in range(6)]), threading.Event())
+    segments, _ = ring.read_batch()
+
+    assert ring.counters() == {'queued': 4, 'produced': 4, 'ring_dropped': 2, 'kernel_dropped': 0}
+    assert _ports(segments) == [0, 1, 2, 3]
+    for segment in segments:
+        segment.release()
+
+
+def test_records_wrap_around_the_end_of_the_ring(ring):
+    seen = []
+
+    def consume(i):
+        # Free three slots after the third frame, so later ones wrap to the start
+        if i == 2:
+            segments, read_seq = ring.read_batch()
+            seen.extend(_ports(segments))
+            for segment in segments:
+                segment.release()
+            ring.release(read_seq)
+
+    _capture_worker(ring, ListSource([_frame(port) for port in range(6)], consume), threading.Event())
+    segments, read_seq = ring.read_batch()
+    seen.extend(_ports(segments))
+
+    assert len(segments) == 2
+    assert seen == [0, 1, 2, 3, 4, 5]
+    assert ring.counters()['ring_dropped'] == 0
+    for segment in segments:
+        segment.release()
+    ring.release(read_seq)
+
+
+def test_in_process_capture_counts_per_ip_and_mac():
+    capture = PacketCapture(ListSource([_frame(1), _frame(2), _frame(3, src='10.0.0.3')]))
+    capture.run()
+    ips, macs = capture.drain()
+
+    assert ips['10.0.0.2']['packets_received'] == 3
+    assert ips['10.0.0.1']['packets_sent'] == 2
+    assert macs['AA:BB:CC:DD:EE:01']['packets_sent'] == 3
+    assert capture.packets_seen == 3
@@ -0,0 +1,56 @@
+from state_stream import StateStream
+
+
+def status(*devices, **metrics):
+    return dict(metrics, devices=list(devices))
+
+
+def test_publish_produces_field_level_deltas():
+    stream = StateStream()
+    stream.publish(status({'ip': '10.0.0.2', 'hostname': 'a', 'is_online': True}, download_speed=1))
+    delta = stream.publish(status(
+        {'ip': '10.0.0.2', 'hostname': 'a', 'is_online': False},
+        {'ip': '10.0.0.3', 'hostname': 'b', 'is_online': True},
+        download_speed=2
+    ))
+
+    assert delta['seq'] == 2
+    assert delta['added'] == [{'ip': '10.0.0.3', 'hostname': 'b', 'is_online': True}]
+    assert delta['changed'] == [{'ip': '10.0.0.2', 'is_online': False}]
+    assert delta['removed'] == []
+    assert delta['metrics'] == {'download_speed': 2}
+
+
+def test_resync_replays_missed_deltas():
+    stream = StateStream(history=10)
+    for speed in range(5):
+        stream.publish(status({'ip': '10.0.0.2', 'speed': speed}))
+
+    messages = stream.resync(2)
+
+    assert [message['seq'] for message in messages] == [3, 4, 5]
+    assert all(message['type'] == 'delta' for message in messages)
+
+
+def test_resync_up_to_date_client_gets_nothing():
+    stream = StateStream()
+    stream.publish(status({'ip': '10.0.0.2'}))
+    assert stream.resync(1) == []
+
+
+def test_resync_falls_back_to_snapshot():
+    stream = StateStream(history=2)
+    for speed in range(5):
+        stream.publish(status({'ip': '10.0.0.2', 'speed': speed}, download_speed=speed))
+
+    # Deltas 2 and 3 have left the history
+    messages = stream.resync(1)
+    assert len(messages) == 1
+    snapshot = messages[0]
+    assert snapshot['type'] == 'snapshot'
+    assert snapshot['seq'] == 5
+    assert snapshot['devices'] == [{'ip': '10.0.0.2', 'speed': 4}]
+    assert snapshot['metrics'] == {'download_speed': 4}
+
+    # A client that never had state (seq -1) also gets a snapshot
+    assert stream.resync(-1)[0]['type'] == 'snapshot'
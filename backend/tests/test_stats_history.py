@@ -0,0 +1,71 @@
+import time
+
+import pytest
+
+from database import TIMESTAMP_FORMAT, DatabaseManager
+
+DAY = 86400
+# Two hours ago, on an hour boundary
+HOUR = int(time.time()) // 3600 * 3600 - 7200
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / 'network_monitor.db'))
+    yield manager
+    manager.close()
+
+
+def _add_stats(db, monkeypatch, epoch, download):
+    monkeypatch.setattr(db, '_timestamp', lambda: time.strftime(TIMESTAMP_FORMAT, time.gmtime(epoch)))
+    db.add_network_stats(download, 1.0, 3, 2, 0.5, None)
+
+
+@pytest.mark.parametrize('span, max_points, expected', [
+    (3600, 500, 0),
+    (7 * DAY, 500, 60),
+    (365 * DAY, 500, 3600),
+    (1000 * DAY, 100, 86400),
+])
+def test_coarsest_resolution_that_fills_max_points(db, span, max_points, expected):
+    now = time.time()
+
+    assert db._pick_stats_resolution(now - span, now, max_points) == expected
+
+
+def test_sources_past_retention_are_skipped(db):
+    now = time.time()
+
+    # Fine enough for raw rows, but they are only kept for 30 days
+    assert db._pick_stats_resolution(now - 40 * DAY, now - 40 * DAY + 3600, 500) == 60
+    # Minute rollups are kept for 90 days
+    assert db._pick_stats_resolution(now - 100 * DAY, now - 100 * DAY + 3600, 500) == 3600
+
+
+def test_raw_history_is_bucketed_in_sql(db, monkeypatch):
+    for offset, download in ((0, 10.0), (3, 30.0), (600, 50.0)):
+        _add_stats(db, monkeypatch, HOUR + offset, download)
+    db.flush_writes()
+
+    history = db.get_network_stats_history(HOUR, HOUR + 1199, max_points=200, metrics=['download_speed'])
+
+    assert history['resolution'] == 0
+    assert history['bucket_seconds'] == 6
+    assert history['timestamps'] == [HOUR, HOUR + 600]
+    assert history['download_speed'] == {'min': [10.0, 50.0], 'max': [30.0, 50.0], 'avg': [20.0, 50.0]}
+    assert 'upload_speed' not in history
+
+
+def test_rollup_history_weights_averages_by_samples(db, monkeypatch):
+    start = HOUR - 7 * DAY
+    _add_stats(db, monkeypatch, start, 10.0)
+    _add_stats(db, monkeypatch, start + 1, 10.0)
+    _add_stats(db, monkeypatch, start + 60, 40.0)
+    db.flush_writes()
+
+    history = db.get_network_stats_history(start, start + 7 * DAY, max_points=100, metrics=['download_speed'])
+
+    assert history['resolution'] == 3600
+    assert len(history['timestamps']) == 1
+    assert history['download_speed']['avg'] == [20.0]
+    assert history['download_speed']['max'] == [40.0]
@@ -0,0 +1,127 @@
+import asyncio
+import ipaddress
+import threading
+import time
+
+from subnet_sweeper import RateLimiter, SubnetSweeper
+
+
+class FakeProber:
+    def __init__(self, alive=(), delay=0.0):
+        self.alive = set(alive)
+        self.delay = delay
+        self.probed = []
+
+    async def probe(self, host, timeout):
+        self.probed.append(host)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return {'host': host, 'alive': host in self.alive, 'rtt': 0.001, 'method': 'tcp'}
+
+
+def subnet(cidr, interface='eth0'):
+    return interface, ipaddress.ip_network(cidr)
+
+
+def test_full_sweep_probes_every_host_once():
+    prober = FakeProber(alive={'10.0.0.7'})
+    sweeper = SubnetSweeper(prober, concurrency=8, rate_per_subnet=0)
+
+    alive = sweeper.sweep([subnet('10.0.0.0/27')])
+
+    assert sorted(prober.probed) == sorted(str(ip) for ip in ipaddress.ip_network('10.0.0.0/27').hosts())
+    assert list(alive) == ['10.0.0.7']
+    stats = sweeper.get_stats()['10.0.0.0/27']
+    assert stats['probed'] == 30 and stats['alive'] == 1 and stats['complete']
+
+
+def test_recently_alive_hosts_are_probed_first():
+    prober = FakeProber(alive={'10.0.0.20', '10.0.0.9'})
+    sweeper = SubnetSweeper(prober, concurrency=1, rate_per_subnet=0)
+    sweeper.sweep([subnet('10.0.0.0/27')])
+
+    prober.probed = []
+    sweeper.sweep([subnet('10.0.0.0/27')])
+
+    assert set(prober.probed[:2]) == {'10.0.0.20', '10.0.0.9'}
+    assert len(prober.probed) == 30
+
+
+def test_time_limited_sweeps_resume_and_cover_the_range():
+    prober = FakeProber(delay=0.01)
+    sweeper = SubnetSweeper(prober, concurrency=2, rate_per_subnet=0)
+    network = subnet('10.0.0.0/24')
+
+    sweeper.sweep([network], deadline=0.7)
+    first = list(prober.probed)
+    assert not sweeper.get_stats()['10.0.0.0/24']['complete']
+    assert 0 < len(first) < 254
+
+    resume = sweeper.resume[network[1]]
+    assert resume == len(first)
+
+    prober.probed = []
+    sweeper.sweep([network], deadline=2.0)
+    second = list(prober.probed)
+
+    # The second sweep starts where the first stopped
+    assert second[0] == f'10.0.0.{resume + 1}'
+    assert set(first) | set(second) == {str(ip) for ip in ipaddress.ip_network('10.0.0.0/24').hosts()}
+
+
+def test_resume_wraps_at_the_end_of_the_range():
+    prober = FakeProber()
+    sweeper = SubnetSweeper(prober, concurrency=1, rate_per_subnet=0)
+    network = ipaddress.ip_network('10.0.0.0/29')
+    sweeper.resume[network] = 4
+
+    sweeper.sweep([('eth0', network)])
+
+    assert prober.probed == ['10.0.0.5', '10.0.0.6', '10.0.0.1', '10.0.0.2', '10.0.0.3', '10.0.0.4']
+
+
+def test_stop_event_ends_the_sweep():
+    prober = FakeProber(delay=0.05)
+    sweeper = SubnetSweeper(prober, concurrency=4, rate_per_subnet=0)
+    stop = threading.Event()
+    threading.Timer(0.2, stop.set).start()
+
+    started = time.monotonic()
+    sweeper.sweep([subnet('10.0.0.0/16')], deadline=60, stop_event=stop)
+
+    assert time.monotonic() - started < 1
+    assert not sweeper.get_stats()['10.0.0.0/16']['complete']
+
+
+def test_rate_limiter_spaces_acquisitions():
+    limiter = RateLimiter(100)
+
+    async def acquire_all():
+        started = time.monotonic()
+        for _ in range(11):
+            await limiter.acquire()
+        return time.monotonic() - started
+
+    assert asyncio.run(acquire_all()) >= 0.1
+
+
+def test_per_subnet_rate_bounds_probe_count():
+    prober = FakeProber()
+    sweeper = SubnetSweeper(prober, concurrency=16, rate_per_subnet=50)
+
+    sweeper.sweep([subnet('10.0.0.0/24')], deadline=0.4)
+
+    # About 50/s for 0.4s, nowhere near the 254 hosts
+    assert 10 <= len(prober.probed) <= 30
+
+
+def test_sweepable_skips_point_to_point_oversized_and_duplicates():
+    sweeper = SubnetSweeper(FakeProber(), max_hosts=1024)
+    subnets = [
+        subnet('10.0.0.0/24'),
+        subnet('10.0.0.0/24', 'eth1'),
+        subnet('10.1.0.0/31'),
+        subnet('10.2.0.0/16')
+    ]
+
+    assert sweeper.sweepable(subnets) == [subnet('10.0.0.0/24')]
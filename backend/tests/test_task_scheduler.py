@@ -0,0 +1,85 @@
+import threading
+import time
+
+import pytest
+
+from task_scheduler import ScheduledTask, TaskScheduler
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = TaskScheduler()
+    yield scheduler
+    scheduler.stop()
+
+
+def test_runs_stay_on_the_interval_grid(scheduler):
+    runs = []
+
+    def task():
+        runs.append(time.monotonic())
+        # Run time must not push later deadlines back
+        time.sleep(0.02)
+
+    scheduler.add('tick', task, interval=0.05)
+    scheduler.start()
+    time.sleep(0.53)
+    scheduler.stop()
+
+    assert 9 <= len(runs) <= 12
+    drift = (runs[-1] - runs[0]) - (len(runs) - 1) * 0.05
+    assert abs(drift) < 0.03
+
+
+def test_missed_deadlines_are_skipped_and_counted():
+    scheduler = TaskScheduler()
+    task = ScheduledTask('slow', None, interval=1.0, jitter=0, timeout=None, priority=0, next_due=0.0)
+
+    scheduler._reschedule(task, now=3.5)
+
+    assert task.next_due == 4.0
+    assert task.stats['overruns'] == 3
+
+
+def test_slow_task_overruns_instead_of_overlapping(scheduler):
+    active = []
+    overlapped = threading.Event()
+
+    def slow():
+        if active:
+            overlapped.set()
+        active.append(True)
+        time.sleep(0.2)
+        active.pop()
+
+    scheduler.add('slow', slow, interval=0.05)
+    scheduler.start()
+    time.sleep(0.45)
+    scheduler.stop()
+    stats = scheduler.get_stats()['slow']
+
+    assert not overlapped.is_set()
+    assert stats['runs'] <= 3
+    assert stats['overruns'] >= 4
+
+
+def test_timeouts_are_reported_once_per_run(scheduler):
+    done = threading.Event()
+    scheduler.add('hang', lambda: done.wait(1), interval=10, timeout=0.05)
+    scheduler.start()
+    time.sleep(0.3)
+    done.set()
+
+    assert scheduler.get_stats()['hang']['timeouts'] == 1
+
+
+def test_lower_priority_values_dispatch_first():
+    scheduler = TaskScheduler(workers=1)
+    order = []
+    scheduler.add('low', lambda: order.append('low'), interval=10, priority=5)
+    scheduler.add('high', lambda: order.append('high'), interval=10, priority=0)
+    scheduler.start()
+    time.sleep(0.1)
+    scheduler.stop()
+
+    assert order == ['high', 'low']
@@ -0,0 +1,21 @@
+from throughput_sampler import COUNTER_32_MAX, COUNTER_64_MAX, counter_delta
+
+
+def test_counter_delta_increasing():
+    assert counter_delta(1000, 1500) == 500
+    assert counter_delta(1000, 1000) == 0
+
+
+def test_counter_delta_32_bit_wrap():
+    previous = COUNTER_32_MAX - 100
+    assert counter_delta(previous, 50) == 150
+
+
+def test_counter_delta_64_bit_wrap():
+    previous = COUNTER_64_MAX - 10
+    assert counter_delta(previous, 5) == 15
+
+
+def test_counter_delta_reset_counts_from_zero():
+    # Far from the top of either range: the interface was reset
+    assert counter_delta(5000, 200) == 200
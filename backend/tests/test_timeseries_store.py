@@ -0,0 +1,40 @@
+import os
+
+from timeseries_store import TimeSeriesStore
+
+
+def _fill(store, count, start=0):
+    for i in range(start, start + count):
+        store.append({'download_speed': float(i)}, timestamp=float(i))
+
+
+def test_old_chunks_spill_and_stay_queryable(tmp_path):
+    store = TimeSeriesStore(chunk_size=4, max_chunks=2, spill_dir=str(tmp_path))
+    _fill(store, 20)
+
+    timestamps, values = store.window(0, 19)
+
+    assert len(store.chunks) == 2
+    assert list(timestamps) == [float(i) for i in range(20)]
+    assert values[5, 0] == 5.0
+
+
+def test_restart_continues_numbering_and_sees_old_chunks(tmp_path):
+    _fill(TimeSeriesStore(chunk_size=4, max_chunks=1, spill_dir=str(tmp_path)), 12)
+    before = sorted(os.listdir(tmp_path))
+
+    store = TimeSeriesStore(chunk_size=4, max_chunks=1, spill_dir=str(tmp_path))
+    _fill(store, 12, start=100)
+
+    assert store.spill_sequence == len(before) + 2
+    assert set(before) <= set(os.listdir(tmp_path))
+    assert list(store.window(0, 7)[0]) == [float(i) for i in range(8)]
+
+
+def test_retention_applies_to_files_from_earlier_runs(tmp_path):
+    _fill(TimeSeriesStore(chunk_size=4, max_chunks=1, spill_dir=str(tmp_path)), 40)
+
+    store = TimeSeriesStore(chunk_size=4, max_chunks=1, spill_dir=str(tmp_path), max_spilled=3)
+
+    assert len(os.listdir(tmp_path)) == 3
+    assert [entry[0] for entry in store.spilled] == [24.0, 28.0, 32.0]
@@ -0,0 +1,113 @@
+import time
+
+import pytest
+
+from database import DatabaseManager
+from write_behind import WriteBehindBuffer
+
+
+class Recorder:
+    """write_batch stand-in that records batches and can be made to fail"""
+
+    def __init__(self):
+        self.batches = []
+        self.failing = False
+
+    def __call__(self, batch):
+        if self.failing:
+            raise OSError("disk unavailable")
+        self.batches.append(batch)
+
+
+def test_flushes_once_flush_rows_are_pending():
+    recorder = Recorder()
+    buffer = WriteBehindBuffer(recorder, flush_rows=3)
+    buffer.put('alerts', 1)
+    buffer.put('alerts', 2)
+    assert recorder.batches == []
+
+    buffer.put('network_stats', 3)
+
+    assert recorder.batches == [{'alerts': [1, 2], 'network_stats': [3]}]
+    assert buffer.stats['rows_written'] == 3
+
+
+def test_failed_flush_requeues_in_front_of_newer_rows():
+    recorder = Recorder()
+    buffer = WriteBehindBuffer(recorder, flush_rows=100)
+    buffer.put('alerts', 1)
+    recorder.failing = True
+    assert buffer.flush() == 0
+
+    buffer.put('alerts', 2)
+    recorder.failing = False
+    buffer.flush()
+
+    assert recorder.batches == [{'alerts': [1, 2]}]
+    assert buffer.stats['failed_flushes'] == 1
+
+
+def test_overflow_drops_the_oldest_rows_across_kinds():
+    recorder = Recorder()
+    buffer = WriteBehindBuffer(recorder, max_rows=3, flush_rows=100)
+    buffer.put('network_stats', 'old stats')
+    buffer.put('alerts', 'old alert')
+    recorder.failing = True
+    buffer.flush()
+    buffer.put('alerts', 'new alert')
+    buffer.put('network_stats', 'new stats')
+    buffer.flush()
+
+    recorder.failing = False
+    buffer.flush()
+
+    assert recorder.batches == [{'network_stats': ['new stats'], 'alerts': ['old alert', 'new alert']}]
+
+
+def test_in_flight_rows_stay_readable():
+    seen = []
+    buffer = WriteBehindBuffer(lambda batch: seen.append(buffer.get_pending('alerts')), flush_rows=100)
+    buffer.put('alerts', 1)
+    buffer.flush()
+
+    assert seen == [[1]]
+    assert buffer.get_pending('alerts') == []
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / 'network_monitor.db'))
+    yield manager
+    manager.close()
+
+
+def test_unflushed_stats_are_readable(db):
+    db.add_network_stats(10.0, 1.0, 5, 4, 0.5, 12.0)
+
+    [row] = db.get_recent_network_stats()
+
+    assert row['download_speed'] == 10.0
+
+
+def test_flush_during_read_neither_loses_nor_repeats_rows(db, monkeypatch):
+    db.add_network_stats(10.0, 1.0, 5, 4, 0.5, 12.0)
+    db.flush_writes()
+    db.add_network_stats(20.0, 2.0, 5, 4, 0.5, 12.0)
+    db.open_device_sessions([{'device_ip': '10.0.0.1', 'online_from': time.time()}])
+    get_connection = db.get_connection
+    flushed = []
+
+    def flush_then_connect():
+        # The buffer commits between the pending snapshot and the query
+        # (once: the flush itself asks for a connection too)
+        if not flushed:
+            flushed.append(True)
+            db.write_buffer.flush()
+        return get_connection()
+
+    monkeypatch.setattr(db, 'get_connection', flush_then_connect)
+
+    assert sorted(row['download_speed'] for row in db.get_recent_network_stats()) == [10.0, 20.0]
+    flushed.clear()
+    db.open_device_sessions([{'device_ip': '10.0.0.2', 'online_from': time.time()}])
+    assert [session['device_ip'] for session in db.get_device_sessions(0)] == ['10.0.0.1', '10.0.0.2']
@@ -0,0 +1,179 @@
+import psutil
+import threading
+import time
+
+# psutil reports raw kernel counters; on some platforms (and 32-bit NIC
+# drivers) these are 32-bit values that wrap, everywhere else they are 64-bit.
+COUNTER_32_MAX = 2 ** 32
+COUNTER_64_MAX = 2 ** 64
+
+COUNTER_FIELDS = ('bytes_sent', 'bytes_recv', 'packets_sent', 'packets_recv')
+
+
+def counter_delta(previous, current):
+    """Difference between two counter readings, tolerating wraparound and resets"""
+    if current >= previous:
+        return current - previous
+
+    # A counter that went backwards either wrapped or was reset. A wrap only
+    # makes sense if the previous value was near the top of its range.
+    for width in (COUNTER_32_MAX, COUNTER_64_MAX):
+        if previous < width and previous > width * 3 // 4:
+            return current + width - previous
+
+    # Interface was reset (driver reload, interface re-created): the new value
+    # is everything counted since the reset.
+    return current
+
+
+class CounterRing:
+    """Fixed-size ring of cumulative counter readings for one interface
+
+    Each slot stores the sample time and running totals that never wrap, so
+    the rate over any window is a difference of two slots.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.timestamps = [0.0] * size
+        self.totals = [[0] * size for _ in COUNTER_FIELDS]
+        self.count = 0
+        self.head = -1
+        self.cumulative = [0] * len(COUNTER_FIELDS)
+        self.last_raw = None
+
+    def add(self, timestamp, raw):
+        """Record a raw counter reading taken at ``timestamp``"""
+        if self.last_raw is not None:
+            for i, value in enumerate(raw):
+                self.cumulative[i] += counter_delta(self.last_raw[i], value)
+        self.last_raw = raw
+
+        self.head = (self.head + 1) % self.size
+        self.timestamps[self.head] = timestamp
+        for i, value in enumerate(self.cumulative):
+            self.totals[i][self.head] = value
+        if self.count < self.size:
+            self.count += 1
+
+    def rate(self, slots_back):
+        """Per-second rates between the newest slot and ``slots_back`` slots earlier"""
+        slots_back = min(slots_back, self.count - 1)
+        if slots_back < 1:
+            return None
+
+        newest = self.head
+        oldest = (self.head - slots_back) % self.size
+        elapsed = self.timestamps[newest] - self.timestamps[oldest]
+        if elapsed <= 0:
+            return None
+
+        return {
+            field: (self.totals[i][newest] - self.totals[i][oldest]) / elapsed
+            for i, field in enumerate(COUNTER_FIELDS)
+        }
+
+    def latest_raw(self):
+        if self.last_raw is None:
+            return None
+        return dict(zip(COUNTER_FIELDS, self.last_raw))
+
+
+class ThroughputSampler:
+    """Samples interface counters in the background so speed reads never block"""
+
+    TOTAL = '__total__'
+
+    def __init__(self, interval=0.25, history_seconds=300):
+        self.interval = interval
+        self.history_seconds = history_seconds
+        self.ring_size = max(2, int(history_seconds / interval) + 1)
+        self.rings = {}
+        self.lock = threading.Lock()
+        self.running = False
+        self.sampler_thread = None
+
+    def start(self):
+        """Start the background sampling thread"""
+        if self.running:
+            return
+
+        self.running = True
+        self.sample()
+        self.sampler_thread = threading.Thread(target=self._sample_loop)
+        self.sampler_thread.daemon = True
+        self.sampler_thread.start()
+
+    def stop(self):
+        """Stop the background sampling thread"""
+        self.running = False
+        if self.sampler_thread:
+            self.sampler_thread.join()
+            self.sampler_thread = None
+
+    def sample(self):
+        """Take one reading of the total and per-interface counters"""
+        now = time.monotonic()
+        total = psutil.net_io_counters()
+        per_nic = psutil.net_io_counters(pernic=True)
+
+        with self.lock:
+            self._add(self.TOTAL, now, total)
+            for interface, counters in per_nic.items():
+                self._add(interface, now, counters)
+
+    def _add(self, name, timestamp, counters):
+        ring = self.rings.get(name)
+        if ring is None:
+            ring = self.rings[name] = CounterRing(self.ring_size)
+        ring.add(timestamp, tuple(getattr(counters, field) for field in COUNTER_FIELDS))
+
+    def _sample_loop(self):
+        next_deadline = time.monotonic()
+        while self.running:
+            next_deadline += self.interval
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"Error sampling network counters: {e}")
+
+            delay = next_deadline - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # Fell behind (suspended host, overloaded box): resync rather
+                # than firing a burst of catch-up samples.
+                next_deadline = time.monotonic()
+
+    def _slots_for(self, seconds):
+        return max(1, int(round(seconds / self.interval)))
+
+    def get_speed(self, seconds=1.0, interface=None):
+        """Average rates over the last ``seconds`` for one interface or the total"""
+        name = interface or self.TOTAL
+        with self.lock:
+            ring = self.rings.get(name)
+            if ring is None:
+                return None
+            rates = ring.rate(self._slots_for(seconds))
+            raw = ring.latest_raw()
+
+        if rates is None:
+            rates = {field: 0.0 for field in COUNTER_FIELDS}
+
+        return {
+            'download_speed': rates['bytes_recv'],
+            'upload_speed': rates['bytes_sent'],
+            'packets_recv_rate': rates['packets_recv'],
+            'packets_sent_rate': rates['packets_sent'],
+            'bytes_sent': raw['bytes_sent'],
+            'bytes_recv': raw['bytes_recv'],
+            'packets_sent': raw['packets_sent'],
+            'packets_recv': raw['packets_recv']
+        }
+
+    def get_interface_speeds(self, seconds=1.0):
+        """Average rates over the last ``seconds`` for every interface"""
+        with self.lock:
+            names = [name for name in self.rings if name != self.TOTAL]
+        return {name: self.get_speed(seconds, name) for name in names}
@@ -0,0 +1,231 @@
+import os
+import threading
+import time
+
+import numpy as np
+
+METRICS = ('download_speed', 'upload_speed', 'total_devices', 'active_devices', 'ping_latency')
+
+
+class TimeSeriesStore:
+    """In-memory, array-backed store for the monitor's recent metrics
+
+    Samples go into preallocated chunks of ``chunk_size`` rows: one float64
+    timestamp column plus one float64 column per metric (NaN for missing
+    values). When more than ``max_chunks`` full chunks are held, the oldest
+    is written to ``spill_dir`` as an .npz file (or dropped if no spill
+    directory is configured), so memory stays bounded. At most
+    ``max_spilled`` files are kept on disk; files spilled by an earlier run
+    are picked up again at startup and count toward that limit.
+    """
+
+    def __init__(self, metrics=METRICS, chunk_size=4096, max_chunks=16, spill_dir=None, max_spilled=256):
+        self.metrics = tuple(metrics)
+        self.column_index = {metric: i for i, metric in enumerate(self.metrics)}
+        self.chunk_size = chunk_size
+        self.max_chunks = max_chunks
+        self.spill_dir = spill_dir
+        self.max_spilled = max_spilled
+        self.chunks = []
+        self.spilled = []
+        self.spill_sequence = 0
+        self.lock = threading.Lock()
+        self._new_chunk()
+        self._load_spilled()
+
+    def _load_spilled(self):
+        """Index chunk files left by a previous run and continue their numbering"""
+        if not self.spill_dir or not os.path.isdir(self.spill_dir):
+            return
+        found = []
+        for name in os.listdir(self.spill_dir):
+            if not (name.startswith('chunk_') and name.endswith('.npz')):
+                continue
+            try:
+                sequence = int(name[len('chunk_'):-len('.npz')])
+            except ValueError:
+                continue
+            found.append((sequence, os.path.join(self.spill_dir, name)))
+        found.sort()
+        if found:
+            self.spill_sequence = found[-1][0] + 1
+
+        for _, path in found:
+            try:
+                with np.load(path) as data:
+                    timestamps = data['timestamps']
+                    columns = data['values'].shape[1]
+            except Exception as e:
+                print(f"Error loading spilled time-series chunk: {e}")
+                continue
+            # Chunks written with a different metric list can't be merged
+            if len(timestamps) and columns == len(self.metrics):
+                self.spilled.append((timestamps[0], timestamps[-1], path))
+        self._trim_spilled()
+
+    def _new_chunk(self):
+        self.chunks.append({
+            'timestamps': np.empty(self.chunk_size, dtype=np.float64),
+            'values': np.full((self.chunk_size, len(self.metrics)), np.nan, dtype=np.float64),
+            'size': 0
+        })
+
+    def append(self, values, timestamp=None):
+        """Add one sample; ``values`` maps metric name to value"""
+        timestamp = time.time() if timestamp is None else timestamp
+        with self.lock:
+            chunk = self.chunks[-1]
+            if chunk['size'] == self.chunk_size:
+                self._new_chunk()
+                chunk = self.chunks[-1]
+                if len(self.chunks) > self.max_chunks:
+                    self._spill(self.chunks.pop(0))
+
+            row = chunk['size']
+            chunk['timestamps'][row] = timestamp
+            for metric, value in values.items():
+                column = self.column_index.get(metric)
+                if column is not None and value is not None:
+                    chunk['values'][row, column] = value
+            chunk['size'] = row + 1
+
+    def _spill(self, chunk):
+        if not self.spill_dir:
+            return
+        try:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            path = os.path.join(self.spill_dir, f'chunk_{self.spill_sequence:08d}.npz')
+            self.spill_sequence += 1
+            np.savez(path, timestamps=chunk['timestamps'], values=chunk['values'])
+            self.spilled.append((chunk['timestamps'][0], chunk['timestamps'][-1], path))
+            self._trim_spilled()
+        except Exception as e:
+            print(f"Error spilling time-series chunk: {e}")
+
+    def _trim_spilled(self):
+        while len(self.spilled) > self.max_spilled:
+            os.remove(self.spilled.pop(0)[2])
+
+    def window(self, start=None, end=None):
+        """Timestamps and values (rows x metrics) between start and end
+
+        Only chunks that overlap the range are read; spilled chunks are
+        loaded from disk when the range reaches back that far.
+        """
+        end = time.time() if end is None else end
+        start = -np.inf if start is None else start
+        parts_ts = []
+        parts_values = []
+
+        with self.lock:
+            spilled = [entry for entry in self.spilled if entry[1] >= start and entry[0] <= end]
+            in_memory = []
+            for chunk in self.chunks:
+                size = chunk['size']
+                if size and chunk['timestamps'][size - 1] >= start and chunk['timestamps'][0] <= end:
+                    # Copy under the lock; the live chunk keeps being written
+                    in_memory.append((chunk['timestamps'][:size].copy(), chunk['values'][:size].copy()))
+
+        from_disk = []
+        for _, _, path in spilled:
+            try:
+                with np.load(path) as data:
+                    from_disk.append((data['timestamps'], data['values']))
+            except Exception as e:
+                print(f"Error loading spilled time-series chunk: {e}")
+
+        for timestamps, values in from_disk + in_memory:
+            lo = np.searchsorted(timestamps, start, side='left')
+            hi = np.searchsorted(timestamps, end, side='right')
+            if hi > lo:
+                parts_ts.append(timestamps[lo:hi])
+                parts_values.append(values[lo:hi])
+
+        if not parts_ts:
+            return np.empty(0), np.empty((0, len(self.metrics)))
+        return np.concatenate(parts_ts), np.concatenate(parts_values)
+
+    def _series(self, metric, seconds):
+        timestamps, values = self.window(time.time() - seconds)
+        return timestamps, values[:, self.column_index[metric]]
+
+    # Vectorized queries over the recent window
+    def percentiles(self, metric, seconds=3600, q=(50, 90, 95, 99)):
+        _, series = self._series(metric, seconds)
+        series = series[~np.isnan(series)]
+        if not series.size:
+            return {f'p{p}': None for p in q}
+        return {f'p{p}': float(v) for p, v in zip(q, np.percentile(series, q))}
+
+    def moving_average(self, metric, seconds=3600, points=12):
+        """Trailing mean over ``points`` samples, aligned with the returned timestamps"""
+        timestamps, series = self._series(metric, seconds)
+        if series.size < points:
+            return {'timestamps': [], 'values': []}
+        filled = np.nan_to_num(series)
+        valid = (~np.isnan(series)).astype(np.float64)
+        sums = np.convolve(filled, np.ones(points), 'valid')
+        counts = np.convolve(valid, np.ones(points), 'valid')
+        with np.errstate(invalid='ignore', divide='ignore'):
+            averages = sums / counts
+        return {
+            'timestamps': timestamps[points - 1:].tolist(),
+            'values': [None if np.isnan(v) else float(v) for v in averages]
+        }
+
+    def rate_of_change(self, metric, seconds=3600):
+        """Per-second change between consecutive samples"""
+        timestamps, series = self._series(metric, seconds)
+        if series.size < 2:
+            return {'timestamps': [], 'values': []}
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rates = np.diff(series) / np.diff(timestamps)
+        return {
+            'timestamps': timestamps[1:].tolist(),
+            'values': [None if not np.isfinite(v) else float(v) for v in rates]
+        }
+
+    def top_intervals(self, metric, seconds=3600, interval=60, k=5):
+        """The ``k`` intervals with the highest mean value"""
+        timestamps, series = self._series(metric, seconds)
+        mask = ~np.isnan(series)
+        if not mask.any():
+            return []
+        buckets = (timestamps[mask] // interval).astype(np.int64)
+        first = buckets.min()
+        offsets = buckets - first
+        sums = np.bincount(offsets, weights=series[mask])
+        counts = np.bincount(offsets)
+        occupied = np.nonzero(counts)[0]
+        means = sums[occupied] / counts[occupied]
+        top = occupied[np.argsort(means)[::-1][:k]]
+        return [
+            {
+                'start': float((first + offset) * interval),
+                'mean': float(sums[offset] / counts[offset]),
+                'samples': int(counts[offset])
+            }
+            for offset in top
+        ]
+
+    def summary(self, seconds=3600):
+        """min/max/mean and percentiles for every metric over the window"""
+        timestamps, values = self.window(time.time() - seconds)
+        result = {'seconds': seconds, 'samples': int(timestamps.size), 'metrics': {}}
+        for metric, column in self.column_index.items():
+            series = values[:, column]
+            series = series[~np.isnan(series)]
+            if not series.size:
+                result['metrics'][metric] = None
+                continue
+            p50, p90, p95, p99 = np.percentile(series, (50, 90, 95, 99))
+            result['metrics'][metric] = {
+                'min': float(series.min()),
+                'max': float(series.max()),
+                'mean': float(series.mean()),
+                'p50': float(p50),
+                'p90': float(p90),
+                'p95': float(p95),
+                'p99': float(p99)
+            }
+        return result
@@ -0,0 +1,101 @@
+import heapq
+import threading
+import time
+from collections import deque
+
+# name: (window length, slot length) in seconds
+DEFAULT_WINDOWS = {
+    '1m': (60, 5),
+    '15m': (900, 60),
+    '1h': (3600, 300),
+    '24h': (86400, 900)
+}
+
+
+class SlidingWindow:
+    """Per-device byte totals over a sliding window made of fixed time slots
+
+    Each slot holds the bytes counted during it. Totals for the whole window
+    are kept alongside and adjusted as slots are added and expire, so an
+    update only touches the devices it names.
+    """
+
+    def __init__(self, length, slot):
+        self.length = length
+        self.slot = slot
+        self.slots = deque()
+        self.totals = {}
+
+    def add(self, ip, bytes_sent, bytes_received, timestamp):
+        slot_start = timestamp - timestamp % self.slot
+        if not self.slots or self.slots[-1][0] < slot_start:
+            self.slots.append((slot_start, {}))
+        counters = self.slots[-1][1].setdefault(ip, [0, 0])
+        counters[0] += bytes_sent
+        counters[1] += bytes_received
+        totals = self.totals.setdefault(ip, [0, 0])
+        totals[0] += bytes_sent
+        totals[1] += bytes_received
+
+    def expire(self, now):
+        cutoff = now - self.length
+        while self.slots and self.slots[0][0] + self.slot <= cutoff:
+            _, counters = self.slots.popleft()
+            for ip, (sent, received) in counters.items():
+                totals = self.totals[ip]
+                totals[0] -= sent
+                totals[1] -= received
+                if not totals[0] and not totals[1]:
+                    del self.totals[ip]
+
+    def top(self, k):
+        return heapq.nlargest(k, self.totals.items(), key=lambda item: item[1][0] + item[1][1])
+
+
+class TopTalkers:
+    """Top-K devices by traffic over 1 minute, 15 minutes, 1 hour and 24 hours
+
+    Per-device byte counts are fed in once per monitor tick. Every window
+    is a ring of time slots with running per-device totals, and after each
+    tick the top ``k`` of every window is recomputed with a bounded heap
+    (O(devices * log k)). Queries return that cached ranking, so their
+    cost does not depend on how many devices are tracked.
+    """
+
+    def __init__(self, k=10, windows=None):
+        self.k = k
+        windows = windows or DEFAULT_WINDOWS
+        self.windows = {name: SlidingWindow(length, slot) for name, (length, slot) in windows.items()}
+        self.rankings = {name: [] for name in self.windows}
+        self.updated_at = None
+        self.lock = threading.Lock()
+
+    def record(self, usage, timestamp=None):
+        """Add one tick of traffic, ``usage`` mapping ip to a bandwidth usage dict"""
+        timestamp = time.time() if timestamp is None else timestamp
+        rankings = {}
+        with self.lock:
+            for name, window in self.windows.items():
+                window.expire(timestamp)
+                for ip, counters in usage.items():
+                    if counters['bytes_sent'] or counters['bytes_received']:
+                        window.add(ip, counters['bytes_sent'], counters['bytes_received'], timestamp)
+                rankings[name] = [
+                    {
+                        'device_ip': ip,
+                        'bytes_sent': sent,
+                        'bytes_received': received,
+                        'total_bytes': sent + received
+                    }
+                    for ip, (sent, received) in window.top(self.k)
+                ]
+            # Swapped in whole so readers never see a half-updated ranking
+            self.rankings = rankings
+            self.updated_at = timestamp
+
+    def get_top_talkers(self, window='1m', limit=None):
+        """Cached top-K ranking for ``window``"""
+        ranking = self.rankings.get(window)
+        if ranking is None:
+            raise ValueError(f"Unknown window {window!r}, expected one of {', '.join(self.windows)}")
+        return ranking[:limit] if limit else list(ranking)
@@ -0,0 +1,160 @@
+import threading
+import time
+
+
+class WriteBehindBuffer:
+    """Accumulates rows in memory and writes them in one transaction per flush
+
+    A flush happens when ``flush_rows`` rows are pending, when the oldest row
+    has waited ``flush_interval`` seconds, or when a caller asks for it.
+    Memory is bounded by ``max_rows``: a producer that finds the buffer full
+    flushes it inline, so a slow disk pushes back on the writer instead of
+    growing the queue. Rows are only dropped when flushes keep failing and
+    the requeued backlog exceeds the bound, oldest first across all kinds.
+    """
+
+    def __init__(self, write_batch, max_rows=5000, flush_rows=500, flush_interval=2.0):
+        self.write_batch = write_batch
+        self.max_rows = max_rows
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.pending = {}
+        # Kind of each pending row in arrival order, so drops go by age
+        self.pending_order = []
+        self.pending_count = 0
+        self.oldest_pending = None
+        self.urgent_pending = False
+        # Rows taken for the current flush stay readable until they commit
+        self.in_flight = {}
+        self.condition = threading.Condition()
+        self.flush_lock = threading.Lock()
+        self.running = False
+        self.flush_thread = None
+        self.stats = {
+            'flushes': 0,
+            'rows_written': 0,
+            'backpressure_flushes': 0,
+            'failed_flushes': 0
+        }
+
+    def start(self):
+        """Start the background flush thread"""
+        if self.running:
+            return
+
+        self.running = True
+        self.flush_thread = threading.Thread(target=self._flush_loop)
+        self.flush_thread.daemon = True
+        self.flush_thread.start()
+
+    def stop(self):
+        """Stop the flush thread and write everything still pending"""
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        if self.flush_thread:
+            self.flush_thread.join()
+            self.flush_thread = None
+        self.flush()
+
+    def put(self, kind, row, urgent=False):
+        """Queue one row; ``urgent`` rows are flushed as soon as possible"""
+        with self.condition:
+            full = self.pending_count >= self.max_rows
+
+        if full:
+            self.stats['backpressure_flushes'] += 1
+            self.flush()
+
+        with self.condition:
+            self.pending.setdefault(kind, []).append(row)
+            self.pending_order.append(kind)
+            self.pending_count += 1
+            if self.oldest_pending is None:
+                self.oldest_pending = time.monotonic()
+            if urgent:
+                self.urgent_pending = True
+            if urgent or self.pending_count >= self.flush_rows:
+                self.condition.notify_all()
+
+        if not self.running and (urgent or self.pending_count >= self.flush_rows):
+            self.flush()
+
+    def get_pending(self, kind):
+        """Rows of ``kind`` that have been queued but not yet committed"""
+        with self.condition:
+            return list(self.in_flight.get(kind, ())) + list(self.pending.get(kind, ()))
+
+    def flush(self):
+        """Write all pending rows in one transaction"""
+        with self.flush_lock:
+            with self.condition:
+                if not self.pending_count:
+                    return 0
+                batch = self.pending
+                order = self.pending_order
+                count = self.pending_count
+                self.in_flight = batch
+                self.pending = {}
+                self.pending_order = []
+                self.pending_count = 0
+                self.oldest_pending = None
+                self.urgent_pending = False
+
+            try:
+                self.write_batch(batch)
+                self.stats['flushes'] += 1
+                self.stats['rows_written'] += count
+            except Exception as e:
+                print(f"Error flushing buffered writes: {e}")
+                self.stats['failed_flushes'] += 1
+                self._requeue(batch, order, count)
+                count = 0
+            finally:
+                with self.condition:
+                    self.in_flight = {}
+
+            return count
+
+    def _requeue(self, batch, order, count):
+        # Put the failed batch back in front of newer rows, within the bound
+        with self.condition:
+            for kind, rows in batch.items():
+                self.pending[kind] = rows + self.pending.get(kind, [])
+            self.pending_order = order + self.pending_order
+            self.pending_count += count
+            if self.pending_count > self.max_rows:
+                self._drop_oldest(self.pending_count - self.max_rows)
+            if self.oldest_pending is None:
+                self.oldest_pending = time.monotonic()
+
+    def _drop_oldest(self, excess):
+        print(f"Write-behind buffer full after failed flush, dropping {excess} rows")
+        dropped = {}
+        for kind in self.pending_order[:excess]:
+            dropped[kind] = dropped.get(kind, 0) + 1
+        for kind, count in dropped.items():
+            del self.pending[kind][:count]
+        del self.pending_order[:excess]
+        self.pending_count -= excess
+
+    def _flush_loop(self):
+        while True:
+            with self.condition:
+                while self.running and not self._flush_due():
+                    self.condition.wait(self._time_to_deadline())
+                if not self.running:
+                    return
+            self.flush()
+
+    def _flush_due(self):
+        if not self.pending_count:
+            return False
+        if self.urgent_pending or self.pending_count >= self.flush_rows:
+            return True
+        return time.monotonic() - self.oldest_pending >= self.flush_interval
+
+    def _time_to_deadline(self):
+        if self.oldest_pending is None:
+            return self.flush_interval
+        return max(0.0, self.flush_interval - (time.monotonic() - self.oldest_pending))
@@ -9,6 +9,7 @@ import { Progress } from '@/components/ui/progress';
 import { Alert, AlertDescription } from '@/components/ui/alert';
 import { LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer, PieChart, Pie, Cell } from 'recharts';
 import { useSocket } from '@/hooks/useSocket';
+import { useNetworkStream } from '@/hooks/useNetworkStream';
 
 interface NetworkData {
   is_online: boolean;
@@ -30,12 +31,12 @@ interface NetworkStats {
 }
 
 export default function DashboardPage() {
-  const [networkData, setNetworkData] = useState<NetworkData | null>(null);
   const [networkStats, setNetworkStats] = useState<NetworkStats[]>([]);
   const [alerts, setAlerts] = useState<any[]>([]);
   const [loading, setLoading] = useState(true);
   const router = useRouter();
   const { socket } = useSocket('http://localhost:5000');
+  const { networkData, setNetworkData } = useNetworkStream<NetworkData>(socket);
 
   useEffect(() => {
     const token = localStorage.getItem('token');
@@ -49,18 +50,6 @@ export default function DashboardPage() {
     fetchAlerts();
   }, [router]);
 
-  useEffect(() => {
-    if (socket) {
-      socket.on('network_data', (data: NetworkData) => {
-        setNetworkData(data);
-      });
-
-      return () => {
-        socket.off('network_data');
-      };
-    }
-  }, [socket]);
-
   const fetchData = async () => {
     try {
       const token = localStorage.getItem('token');
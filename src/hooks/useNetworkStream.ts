@@ -0,0 +1,105 @@
+'use client';
+
+import { useEffect, useRef, useState } from 'react';
+import { Socket } from 'socket.io-client';
+
+type Device = Record<string, any> & { ip: string };
+
+interface SnapshotMessage {
+  type: 'snapshot';
+  seq: number;
+  devices: Device[];
+  metrics: Record<string, any>;
+}
+
+interface DeltaMessage {
+  type: 'delta';
+  seq: number;
+  added: Device[];
+  changed: Device[];
+  removed: string[];
+  metrics: Record<string, any>;
+}
+
+type StreamMessage = SnapshotMessage | DeltaMessage;
+
+// Applies the backend's network_data snapshot + delta stream and asks for a
+// resync whenever a sequence number is skipped. The server acknowledges
+// network_resync with the messages the client missed (replayed deltas or one
+// snapshot), which are applied in order like live ones.
+export function useNetworkStream<T>(socket: Socket | null) {
+  const [networkData, setNetworkData] = useState<T | null>(null);
+  const devicesRef = useRef<Map<string, Device>>(new Map());
+  const seqRef = useRef<number | null>(null);
+  // Set while a network_resync request is outstanding, so a gap asks only once
+  const resyncPendingRef = useRef(false);
+
+  useEffect(() => {
+    if (!socket) {
+      return;
+    }
+
+    const publish = (metrics: Record<string, any>) => {
+      setNetworkData({ ...metrics, devices: Array.from(devicesRef.current.values()) } as T);
+    };
+
+    const requestResync = (seq: number) => {
+      resyncPendingRef.current = true;
+      socket.emit('network_resync', { seq }, (messages: StreamMessage[]) => {
+        resyncPendingRef.current = false;
+        messages.forEach(handleMessage);
+      });
+    };
+
+    const handleMessage = (message: StreamMessage) => {
+      if (message.type === 'snapshot') {
+        devicesRef.current = new Map(message.devices.map((device) => [device.ip, device]));
+        seqRef.current = message.seq;
+        resyncPendingRef.current = false;
+        publish(message.metrics);
+        return;
+      }
+
+      if (seqRef.current === null || message.seq <= seqRef.current) {
+        return;
+      }
+      if (message.seq !== seqRef.current + 1) {
+        // Missed at least one delta; the ack replays them or carries a snapshot
+        if (!resyncPendingRef.current) {
+          requestResync(seqRef.current);
+        }
+        return;
+      }
+
+      const devices = new Map(devicesRef.current);
+      message.removed.forEach((ip) => devices.delete(ip));
+      message.added.forEach((device) => devices.set(device.ip, device));
+      message.changed.forEach((fields) => {
+        devices.set(fields.ip, { ...devices.get(fields.ip), ...fields });
+      });
+      devicesRef.current = devices;
+      seqRef.current = message.seq;
+      // In-order deltas again: the replay (or the live stream) has caught up
+      resyncPendingRef.current = false;
+      publish(message.metrics);
+    };
+
+    const handleConnect = () => {
+      seqRef.current = null;
+      requestResync(-1);
+    };
+
+    socket.on('network_data', handleMessage);
+    socket.on('connect', handleConnect);
+    if (socket.connected) {
+      handleConnect();
+    }
+
+    return () => {
+      socket.off('network_data', handleMessage);
+      socket.off('connect', handleConnect);
+    };
+  }, [socket]);
+
+  return { networkData, setNetworkData };
+}